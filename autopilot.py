@@ -0,0 +1,396 @@
+"""
+Pathfinding autopilot
+Steers toward the nearest good fruit along the shortest safe path and checks
+that a route back to its own tail remains, so it does not box itself in.
+
+A distance field from every good fruit (walls and apples as obstacles) is kept
+between ticks and patched when fruit appears or is eaten. It is the A*
+heuristic for planning around the snake's body, and a planned path is followed
+tick by tick until the fruit layout changes, so a typical tick is O(1).
+
+Work per tick is bounded, so large boards stay within the tick budget.
+Building and patching the field runs as resumable jobs of at most
+FIELD_BUDGET cells per tick. Until the field is ready the snake takes greedy
+safe steps. A* and the tail checks stop after SEARCH_BUDGET cells; a region
+that large counts as open.
+"""
+
+import heapq
+from collections import deque
+
+from snake_engine import OPPOSITE_DIRECTIONS, Direction, FruitType
+
+UNREACHABLE = 1 << 30
+FIELD_BUDGET = 10000     # Field cells updated per tick; a 40x30 rebuild fits in one
+SEARCH_BUDGET = 20000    # Cells one A* plan or tail check may visit
+PLAN_RETRY_TICKS = 10    # Greedy ticks after a plan runs over budget
+
+class Autopilot:
+    """Callable policy: autopilot(engine, rng=None) -> Direction or None"""
+
+    def __init__(self):
+        self.width = None
+        self.height = None
+        self.neighbors = []
+
+        self.path = deque()  # Planned cells, next step first
+        self.stats = {"plans": 0, "field_rebuilds": 0, "field_patches": 0, "fallbacks": 0, "greedy": 0}
+
+        self._snake = None  # Snake object the caches were built for
+        self._level = None
+        self._score = None
+        self._apples = set()
+        self._goods = set()
+        self.dist = []
+        self.source = []
+        self._jobs = deque()      # Field work still to do, oldest first
+        self._rebuilding = False  # A full rebuild is among the jobs
+        self._plan_wait = 0
+
+    def __call__(self, engine, rng=None):
+        self._sync(engine)
+        if not self._run_jobs(FIELD_BUDGET):
+            self.stats["greedy"] += 1
+            return self._greedy(engine)
+        return self._next_direction(engine)
+
+    def drive(self, engine):
+        # Steer the engine's snake for the coming tick
+        direction = self(engine)
+        if direction is not None:
+            engine.snake.change_direction(direction)
+        return direction
+
+    def replan(self):
+        # The snake moved without us (a rewind): drop the planned path
+        self.path.clear()
+
+    # Geometry
+
+    def _resize(self, width, height):
+        self.width, self.height = width, height
+        self._step_direction = {-width: Direction.UP, width: Direction.DOWN, -1: Direction.LEFT, 1: Direction.RIGHT}
+        self.neighbors = []
+        self._jobs.append(self._build_neighbors())
+
+    def _build_neighbors(self):
+        # A job: one row per step, in Direction order (up, down, left, right)
+        width, height, neighbors = self.width, self.height, self.neighbors
+        for y in range(height):
+            for cell in range(y * width, (y + 1) * width):
+                cells = []
+                if y > 0:
+                    cells.append(cell - width)
+                if y < height - 1:
+                    cells.append(cell + width)
+                if cell % width > 0:
+                    cells.append(cell - 1)
+                if cell % width < width - 1:
+                    cells.append(cell + 1)
+                neighbors.append(cells)
+            yield width
+
+    def _flat(self, cell):
+        return cell[1] * self.width + cell[0]
+
+    # Fruit distance field
+
+    def _sync(self, engine):
+        # Fruit only changes on a reset, a level change or when fruit is eaten
+        if engine.snake is not self._snake or engine.level != self._level:
+            self._jobs.clear()
+            self._rebuilding = False
+            if (engine.width, engine.height) != (self.width, self.height) or len(self.neighbors) < engine.width * engine.height:
+                self._resize(engine.width, engine.height)
+            self._snake = engine.snake
+            self._level = engine.level
+            self._start_rebuild(engine)
+            self.path.clear()
+            self._plan_wait = 0
+        elif engine.score != self._score:
+            goods = self._good_cells(engine)
+            if self._rebuilding:
+                self._start_rebuild(engine)
+            else:
+                for cell in self._goods - goods:
+                    self._jobs.append(self._remove_source(cell))
+                for cell in goods - self._goods:
+                    self._jobs.append(self._add_source(cell))
+                self._goods = goods
+                self.stats["field_patches"] += 1
+            self.path.clear()
+            self._plan_wait = 0
+        self._score = engine.score
+
+    def _run_jobs(self, budget=None):
+        # Field work for this tick; False while some is left for later ticks
+        jobs = self._jobs
+        while jobs:
+            for units in jobs[0]:
+                if budget is not None:
+                    budget -= units
+                    if budget <= 0:
+                        return False
+            jobs.popleft()
+        return True
+
+    def _good_cells(self, engine):
+        return {self._flat(cell) for cell, fruit in engine.fruit_at.items() if fruit.type != FruitType.APPLE}
+
+    def _start_rebuild(self, engine):
+        # Replaces a rebuild still in progress; the neighbor table job stays
+        if self._rebuilding:
+            self._jobs.pop()
+        self._apples = {self._flat(cell) for cell, fruit in engine.fruit_at.items() if fruit.type == FruitType.APPLE}
+        self._goods = self._good_cells(engine)
+        self._jobs.append(self._rebuild_field())
+        self._rebuilding = True
+
+    def _rebuild_field(self):
+        self.dist = [UNREACHABLE] * (self.width * self.height)
+        self.source = [-1] * (self.width * self.height)
+        for cell in self._goods:
+            self.dist[cell] = 0
+            self.source[cell] = cell
+        yield from self._relax(deque(self._goods))
+        self._rebuilding = False
+        self.stats["field_rebuilds"] += 1
+
+    def _relax(self, queue):
+        # BFS outward, only where it shortens the known distance
+        dist, source, apples, neighbors = self.dist, self.source, self._apples, self.neighbors
+        while queue:
+            cell = queue.popleft()
+            d = dist[cell] + 1
+            for n in neighbors[cell]:
+                if d < dist[n] and n not in apples:
+                    dist[n] = d
+                    source[n] = source[cell]
+                    queue.append(n)
+            yield 1
+
+    def _add_source(self, cell):
+        if self.dist[cell] == 0:
+            return
+        self.dist[cell] = 0
+        self.source[cell] = cell
+        yield from self._relax(deque([cell]))
+
+    def _remove_source(self, removed):
+        # Only the eaten fruit's region changes: clear it, then refill from its border
+        dist, source, neighbors = self.dist, self.source, self.neighbors
+        region = [removed]
+        source[removed] = -1
+        for cell in region:
+            for n in neighbors[cell]:
+                if source[n] == removed:
+                    source[n] = -1
+                    region.append(n)
+            yield 1
+
+        heap = []
+        for cell in region:
+            dist[cell] = UNREACHABLE
+        for cell in region:
+            for n in neighbors[cell]:
+                if source[n] != -1:
+                    heap.append((dist[n] + 1, cell, source[n]))
+            yield 1
+        heapq.heapify(heap)
+
+        apples = self._apples
+        while heap:
+            d, cell, src = heapq.heappop(heap)
+            yield 1
+            if d >= dist[cell]:
+                continue
+            dist[cell] = d
+            source[cell] = src
+            for n in neighbors[cell]:
+                if d + 1 < dist[n] and n not in apples:
+                    heapq.heappush(heap, (d + 1, n, src))
+
+    # Planning
+
+    def _next_direction(self, engine):
+        head = self._flat(engine.snake.body[0])
+
+        if self.path and (self.path[0] not in self.neighbors[head] or not self._path_still_free(engine)):
+            self.path.clear()
+        if not self.path:
+            if self._plan_wait:
+                self._plan_wait -= 1
+                self.stats["greedy"] += 1
+                return self._greedy(engine)
+            self._plan(engine, head)
+        if self.path:
+            return self._step_direction[self.path.popleft() - head]
+
+        self.stats["fallbacks"] += 1
+        return self._stall(engine, head)
+
+    def _path_still_free(self, engine):
+        # Nothing new can block the plan except the body, which only shrinks ahead of us
+        x, y = self.path[0] % self.width, self.path[0] // self.width
+        return not engine.snake.occupies((x, y)) or (x, y) == engine.snake.body[-1]
+
+    def _vacate_times(self, snake):
+        # Moves until each body cell is free; the tail waits while growth is pending
+        length = len(snake.body)
+        return {self._flat(cell): length - i + snake.grow_pending for i, cell in enumerate(snake.body)}
+
+    def _plan(self, engine, head):
+        self.stats["plans"] += 1
+        if not self._goods:
+            return
+
+        snake = engine.snake
+        vacate = self._vacate_times(snake)
+        reverse = -self._flat_step(snake.direction)
+        dist, neighbors, goods = self.dist, self.neighbors, self._goods
+
+        # A* with the fruit field as an exact-if-unobstructed heuristic
+        best = {head: 0}
+        came_from = {head: None}
+        heap = [(dist[head], 0, head)]
+        budget = SEARCH_BUDGET
+        while heap:
+            budget -= 1
+            if budget < 0:
+                self._plan_wait = PLAN_RETRY_TICKS  # The fruit is far or walled off: step greedily for a while
+                return
+            _, negative_g, cell = heapq.heappop(heap)
+            g = -negative_g
+            if g > best[cell]:
+                continue
+            if cell in goods:
+                path = self._unwind(came_from, cell)
+                if self._is_safe(snake, path):
+                    self.path.extend(path)
+                return
+            for n in neighbors[cell]:
+                if dist[n] >= UNREACHABLE:
+                    continue  # Apple, or cut off from every fruit
+                if cell == head and n - head == reverse:
+                    continue
+                ng = g + 1
+                if vacate.get(n, 0) > ng or ng >= best.get(n, UNREACHABLE):
+                    continue
+                best[n] = ng
+                came_from[n] = cell
+                heapq.heappush(heap, (ng + dist[n], -ng, n))
+
+    def _flat_step(self, direction):
+        dx, dy = direction.value
+        return dy * self.width + dx
+
+    def _unwind(self, came_from, cell):
+        path = []
+        while came_from[cell] is not None:
+            path.append(cell)
+            cell = came_from[cell]
+        path.reverse()
+        return path
+
+    def _is_safe(self, snake, path):
+        # After eating, the head must still be able to reach the tail
+        body = [self._flat(cell) for cell in snake.body]
+        length = len(body) + min(len(path), snake.grow_pending)
+        future = (path[::-1] + body)[:length]
+        return self._reaches(future[0], future[-1], set(future))
+
+    def _reaches(self, start, target, blocked):
+        return self._distance(start, target, blocked) is not None
+
+    def _distance(self, start, target, blocked):
+        # Capped at SEARCH_BUDGET cells; a region that large counts as reaching the target
+        if start == target:
+            return 0
+        seen = {start}
+        frontier = [start]
+        steps = 0
+        apples, neighbors = self._apples, self.neighbors
+        while frontier:
+            steps += 1
+            next_frontier = []
+            for cell in frontier:
+                for n in neighbors[cell]:
+                    if n == target:
+                        return steps
+                    if n in seen or n in blocked or n in apples:
+                        continue
+                    seen.add(n)
+                    next_frontier.append(n)
+            frontier = next_frontier
+            if len(seen) > SEARCH_BUDGET:
+                return steps
+        return None
+
+    def _stall(self, engine, head):
+        # No safe fruit path: take the legal move that keeps the tail reachable
+        # and is farthest from it, buying time for the board to open up
+        snake = engine.snake
+        body = [self._flat(cell) for cell in snake.body]
+        growing = snake.grow_pending > 0
+        reverse = -self._flat_step(snake.direction)
+
+        best = None
+        for n in self.neighbors[head]:
+            if n - head == reverse or n in self._apples:
+                continue
+            future = [n] + (body if growing else body[:-1])
+            if n in future[1:]:
+                continue
+            distance = self._distance(n, future[-1], set(future))
+            score = (distance is not None, distance or 0)
+            if best is None or score > best[0]:
+                best = (score, n)
+        if best is None:
+            return None
+        return self._step_direction[best[1] - head]
+
+    def _greedy(self, engine):
+        # Without the field: a step toward the nearest good fruit with room behind it
+        snake = engine.snake
+        head_x, head_y = snake.body[0]
+        goods = [cell for cell, fruit in engine.fruit_at.items() if fruit.type != FruitType.APPLE]
+        need = min(len(snake.body) + 1, SEARCH_BUDGET)
+
+        best = None
+        for direction in Direction:
+            if direction is OPPOSITE_DIRECTIONS[snake.direction]:
+                continue
+            x, y = head_x + direction.value[0], head_y + direction.value[1]
+            if not self._open(engine, (x, y)):
+                continue
+            room = self._room(engine, (x, y), need)
+            near = min((abs(x - fx) + abs(y - fy) for fx, fy in goods), default=0)
+            score = (room >= need, -near, room)
+            if best is None or score > best[0]:
+                best = (score, direction)
+        return None if best is None else best[1]
+
+    def _open(self, engine, cell):
+        x, y = cell
+        if not (0 <= x < engine.width and 0 <= y < engine.height):
+            return False
+        fruit = engine.fruit_at.get(cell)
+        if fruit is not None and fruit.type == FruitType.APPLE:
+            return False
+        snake = engine.snake
+        return not snake.occupies(cell) or (cell == snake.body[-1] and not snake.grow_pending)
+
+    def _room(self, engine, start, limit):
+        # Free cells reachable from start, counting no further than limit
+        seen = {start}
+        frontier = [start]
+        while frontier and len(seen) < limit:
+            next_frontier = []
+            for x, y in frontier:
+                for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+                    cell = (x + dx, y + dy)
+                    if cell not in seen and self._open(engine, cell):
+                        seen.add(cell)
+                        next_frontier.append(cell)
+            frontier = next_frontier
+        return len(seen)
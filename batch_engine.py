@@ -0,0 +1,314 @@
+"""
+Batched Snake engine
+Steps many boards at once with NumPy, following the SnakeEngine rules exactly
+"""
+
+import random
+from collections import namedtuple
+
+import numpy as np
+
+from snake_engine import GRID_WIDTH, GRID_HEIGHT, DEFAULT_RULES, GOOD_FRUITS, Direction, FruitType
+
+# Direction codes follow Direction's declaration order, so code ^ 1 is the reverse
+DIRECTIONS = list(Direction)
+DIRECTION_CODES = {direction: i for i, direction in enumerate(DIRECTIONS)}
+NO_ACTION = -1
+_DX = np.array([direction.value[0] for direction in DIRECTIONS])
+_DY = np.array([direction.value[1] for direction in DIRECTIONS])
+
+# Fruit grid codes, 0 is an empty cell
+NO_FRUIT = 0
+FRUIT_CODES = {
+    FruitType.APPLE: 1,
+    FruitType.ORANGE: 2,
+    FruitType.GRAPEFRUIT: 3,
+    FruitType.BERRY: 4,
+}
+FRUIT_TYPES = {code: fruit_type for fruit_type, code in FRUIT_CODES.items()}
+APPLE = FRUIT_CODES[FruitType.APPLE]
+# Same order as SnakeEngine's GOOD_FRUITS so rng.choice picks the same type
+GOOD_FRUIT_CODES = [FRUIT_CODES[t] for t in GOOD_FRUITS]
+
+BatchState = namedtuple(
+    "BatchState",
+    ["score", "level", "speed", "fruits_eaten_this_level", "length", "game_over", "game_won"],
+)
+
+class BatchSnakeEngine:
+    """
+    N independent boards stored as NumPy arrays, one row per board.
+
+    Cells are flat row-major indices (y * width + x). Movement,
+    collisions, growth and free-cell bookkeeping are vectorized across
+    boards. Fruit spawns draw from a per-board random.Random seeded like
+    SnakeEngine, so board i reproduces SnakeEngine(seeds[i]) tick for tick,
+    including the seeds of games started by later resets.
+    """
+
+    def __init__(self, seeds, rules=DEFAULT_RULES, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.cell_count = width * height
+        self.size = len(seeds)
+        self.rules = rules
+        self.fruits_needed_per_level = rules.fruits_needed_per_level
+        self.seed_sources = [random.Random(seed) for seed in seeds]
+        self.seeds = [None] * self.size
+        self.rngs = [None] * self.size
+
+        n, cells = self.size, self.cell_count
+        # Snake: occupancy counts, body ring buffer and head/tail pointers
+        self.occupancy = np.zeros((n, cells), np.int8)
+        self.body = np.zeros((n, cells), np.int32)
+        self.head_ptr = np.zeros(n, np.int64)
+        self.tail_ptr = np.zeros(n, np.int64)
+        self.head_x = np.zeros(n, np.int64)
+        self.head_y = np.zeros(n, np.int64)
+        self.length = np.zeros(n, np.int64)
+        self.grow_pending = np.zeros(n, np.int64)
+        self.direction = np.zeros(n, np.int64)
+        # Fruit type grid and free-cell index (list of cells plus cell -> slot)
+        self.fruit = np.zeros((n, cells), np.int8)
+        self.free_cells = np.zeros((n, cells), np.int32)
+        self.free_slot = np.zeros((n, cells), np.int32)
+        self.free_count = np.zeros(n, np.int64)
+        # Per-board progress
+        self.score = np.zeros(n, np.int64)
+        self.level = np.zeros(n, np.int64)
+        self.speed = np.zeros(n, np.int64)
+        self.fruits_eaten_this_level = np.zeros(n, np.int64)
+        self.game_over = np.zeros(n, bool)
+        self.game_won = np.zeros(n, bool)
+
+        self._all_cells = np.arange(cells, dtype=np.int32)
+        for board, seed in enumerate(seeds):
+            self._reset_board(board, seed)
+
+    def reset(self, mask=None):
+        # Start new games on every board, or only those selected by a boolean mask
+        boards = range(self.size) if mask is None else np.flatnonzero(mask).tolist()
+        for board in boards:
+            self._reset_board(board)
+
+    def state(self):
+        return BatchState(
+            self.score,
+            self.level,
+            self.speed,
+            self.fruits_eaten_this_level,
+            self.length,
+            self.game_over,
+            self.game_won,
+        )
+
+    def fruits(self, board):
+        # {(x, y): FruitType} for one board, mainly for inspection and tests
+        grid = self.fruit[board]
+        return {
+            (int(cell) % self.width, int(cell) // self.width): FRUIT_TYPES[int(grid[cell])]
+            for cell in np.flatnonzero(grid)
+        }
+
+    def snake_body(self, board):
+        # Head-first list of (x, y) for one board
+        ptr, cells = int(self.head_ptr[board]), self.cell_count
+        ring = self.body[board]
+        return [
+            (int(ring[(ptr - i) % cells]) % self.width, int(ring[(ptr - i) % cells]) // self.width)
+            for i in range(int(self.length[board]))
+        ]
+
+    def step(self, actions=None):
+        """Apply one action per board (Direction, code or None) and advance every live board."""
+        live = ~(self.game_over | self.game_won)
+
+        if actions is not None:
+            actions = self._action_codes(actions)
+            turn = live & (actions != NO_ACTION) & (actions != (self.direction ^ 1))
+            self.direction[turn] = actions[turn]
+
+        boards = np.flatnonzero(live)
+        if boards.size == 0:
+            return self.state()
+
+        direction = self.direction[boards]
+        head_x = self.head_x[boards] + _DX[direction]
+        head_y = self.head_y[boards] + _DY[direction]
+        self.head_x[boards] = head_x
+        self.head_y[boards] = head_y
+
+        # Wall collision
+        wall = (head_x < 0) | (head_x >= self.width) | (head_y < 0) | (head_y >= self.height)
+        self.game_over[boards[wall]] = True
+        inside = ~wall
+        boards = boards[inside]
+        head = head_y[inside] * self.width + head_x[inside]
+
+        # Self collision; moving into the cell the tail is leaving is safe
+        growing = self.grow_pending[boards] > 0
+        tail = self.body[boards, self.tail_ptr[boards]]
+        hit_self = (self.occupancy[boards, head] > 0) & (growing | (head != tail))
+        self.game_over[boards[hit_self]] = True
+        alive = ~hit_self
+        boards, head, growing, tail = boards[alive], head[alive], growing[alive], tail[alive]
+
+        # Move: push the head, then pop the tail unless growing
+        head_ptr = (self.head_ptr[boards] + 1) % self.cell_count
+        self.head_ptr[boards] = head_ptr
+        self.body[boards, head_ptr] = head
+
+        shrinking = boards[~growing]
+        vacated = tail[~growing]
+        self.occupancy[shrinking, vacated] -= 1
+        self.tail_ptr[shrinking] = (self.tail_ptr[shrinking] + 1) % self.cell_count
+        self.occupancy[boards, head] += 1
+
+        grown = boards[growing]
+        self.grow_pending[grown] -= 1
+        self.length[grown] += 1
+
+        # Free-cell index: same order as SnakeEngine.update (head out, then tail in)
+        self._discard_free_many(boards, head)
+        emptied = self.occupancy[shrinking, vacated] == 0
+        self._add_free_many(shrinking[emptied], vacated[emptied])
+
+        # Fruit collision
+        fruit = self.fruit[boards, head]
+        apple = fruit == APPLE
+        self.game_over[boards[apple]] = True
+        ate = (fruit != NO_FRUIT) & ~apple
+
+        # Eating draws from the board's RNG, so it runs per board
+        for board, cell in zip(boards[ate].tolist(), head[ate].tolist()):
+            self._eat(board, cell)
+
+        return self.state()
+
+    def _action_codes(self, actions):
+        if isinstance(actions, np.ndarray):
+            return actions.astype(np.int64, copy=False)
+        return np.array(
+            [NO_ACTION if a is None else DIRECTION_CODES.get(a, a) for a in actions],
+            np.int64,
+        )
+
+    def _reset_board(self, board, seed=None):
+        if seed is None:
+            seed = self.seed_sources[board].getrandbits(63)
+        self.seeds[board] = seed
+        self.rngs[board] = random.Random(seed)
+
+        self.occupancy[board] = 0
+        self.fruit[board] = NO_FRUIT
+        self.free_cells[board] = self._all_cells
+        self.free_slot[board] = self._all_cells
+        self.free_count[board] = self.cell_count
+
+        x, y = self.width // 2, self.height // 2
+        cell = y * self.width + x
+        self.head_x[board] = x
+        self.head_y[board] = y
+        self.body[board, 0] = cell
+        self.head_ptr[board] = 0
+        self.tail_ptr[board] = 0
+        self.length[board] = 1
+        self.grow_pending[board] = 0
+        self.direction[board] = DIRECTION_CODES[Direction.RIGHT]
+        self.occupancy[board, cell] = 1
+        self._discard_free(board, cell)
+
+        self.level[board] = 0
+        self.score[board] = 0
+        self.game_over[board] = False
+        self.game_won[board] = False
+        self.speed[board] = self.rules.start_speed
+        self.fruits_eaten_this_level[board] = 0
+
+        self._spawn_fruits(board)
+
+    def _eat(self, board, cell):
+        self.fruit[board, cell] = NO_FRUIT
+        self.grow_pending[board] += 1
+        self.score[board] += 10
+        self.fruits_eaten_this_level[board] += 1
+
+        self._spawn_fruit(board, self.rngs[board].choice(GOOD_FRUIT_CODES))
+
+        if self.fruits_eaten_this_level[board] >= self.fruits_needed_per_level:
+            self.level[board] += 1
+            self.fruits_eaten_this_level[board] = 0
+
+            if self.level[board] > self.rules.last_level:
+                self.game_won[board] = True
+                return
+
+            self.speed[board] = min(self.speed[board] + self.rules.speed_step, self.rules.max_speed)
+            self._spawn_fruits(board)
+
+    def _spawn_fruits(self, board):
+        for cell in np.flatnonzero(self.fruit[board]).tolist():
+            self._add_free(board, cell)
+        self.fruit[board] = NO_FRUIT
+
+        level = int(self.level[board])
+        apple_count = min(self.rules.base_apples + level, self.rules.max_apples)
+        good_fruit_count = self.rules.base_good_fruits + level
+
+        # Mirror FreeCellIndex.take: draw every cell first, then the fruit types
+        count = min(apple_count + good_fruit_count, int(self.free_count[board]))
+        cells = [self._pop_random_free(board) for _ in range(count)]
+        rng = self.rngs[board]
+        for i, cell in enumerate(cells):
+            self.fruit[board, cell] = APPLE if i < apple_count else rng.choice(GOOD_FRUIT_CODES)
+
+    def _spawn_fruit(self, board, code):
+        cell = self._pop_random_free(board)
+        if cell is not None:
+            self.fruit[board, cell] = code
+
+    def _pop_random_free(self, board):
+        count = int(self.free_count[board])
+        if count == 0:
+            return None  # Board is full
+        cell = int(self.free_cells[board, self.rngs[board].randrange(count)])
+        self._discard_free(board, cell)
+        return cell
+
+    def _add_free(self, board, cell):
+        if self.free_slot[board, cell] >= 0:
+            return
+        count = self.free_count[board]
+        self.free_cells[board, count] = cell
+        self.free_slot[board, cell] = count
+        self.free_count[board] = count + 1
+
+    def _discard_free(self, board, cell):
+        slot = self.free_slot[board, cell]
+        if slot < 0:
+            return
+        count = self.free_count[board] - 1
+        last = self.free_cells[board, count]
+        self.free_cells[board, slot] = last
+        self.free_slot[board, last] = slot
+        self.free_slot[board, cell] = -1
+        self.free_count[board] = count
+
+    def _add_free_many(self, boards, cells):
+        # Vacated tail cells are never already free
+        count = self.free_count[boards]
+        self.free_cells[boards, count] = cells
+        self.free_slot[boards, cells] = count
+        self.free_count[boards] = count + 1
+
+    def _discard_free_many(self, boards, cells):
+        # Cells under a fruit are already out of the index
+        slot = self.free_slot[boards, cells]
+        present = slot >= 0
+        boards, cells, slot = boards[present], cells[present], slot[present]
+        count = self.free_count[boards] - 1
+        last = self.free_cells[boards, count]
+        self.free_cells[boards, slot] = last
+        self.free_slot[boards, last] = slot
+        self.free_slot[boards, cells] = -1
+        self.free_count[boards] = count
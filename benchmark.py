@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Retro Snake Benchmarks
+Times the engine, spawning, long-snake and rendering hot paths and writes JSON results
+
+Example:
+    python benchmark.py --json baseline.json
+    python benchmark.py --compare baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from bots import greedy_policy
+from hamiltonian import HamiltonianSolver
+from replay import ReplayRecorder, load_replay, play_replay
+from snake_engine import DEFAULT_RULES, Direction, FreeCellIndex, FruitType, Snake, SnakeEngine
+
+SNAKE_LENGTHS = (10, 100, 1000, 10000, 100000)
+FILL_RATIOS = (0.10, 0.50, 0.90, 0.99)
+
+def result(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+def best_of(repeat, run):
+    # run() returns the seconds it measured; the fastest run is the least noisy
+    return min(run() for _ in range(repeat))
+
+def clock(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+def bench_move_collision(lengths=SNAKE_LENGTHS, moves=20000, repeat=3):
+    """Snake.move plus check_collision, per call, for straight snakes of each length"""
+    results = {}
+    for length in lengths:
+        # Wide enough that the head never reaches the wall
+        snake = Snake(width=length + moves * repeat + 1, height=1)
+        snake.body = [(x, 0) for x in range(length - 1, -1, -1)]
+        snake.direction = Direction.RIGHT
+        move, check_collision = snake.move, snake.check_collision
+
+        def run():
+            for _ in range(moves):
+                move()
+                if check_collision():
+                    raise RuntimeError("Benchmark snake crashed")
+
+        seconds = best_of(repeat, lambda: clock(run))
+        results[f"move_collision/length={length}"] = result(seconds / moves * 1e9, "ns/op", "lower")
+    return results
+
+def bench_spawn(fill_ratios=FILL_RATIOS, width=200, height=200, spawns=20000, repeat=3):
+    """SnakeEngine.spawn_fruit, per call, with the given share of the board occupied"""
+    results = {}
+    for fill in fill_ratios:
+        engine = SnakeEngine(0, width=width, height=height)
+        engine.fruit_at.clear()
+        engine.free_cells = FreeCellIndex(width, height)
+        engine.free_cells.take(int(fill * width * height), random.Random(1))
+        spawn_fruit, fruit_at, free_cells = engine.spawn_fruit, engine.fruit_at, engine.free_cells
+
+        def run():
+            # Put each fruit's cell back so the fill ratio stays fixed
+            for _ in range(spawns):
+                fruit = spawn_fruit(FruitType.BERRY)
+                cell = (fruit.x, fruit.y)
+                del fruit_at[cell]
+                free_cells.add(cell)
+
+        seconds = best_of(repeat, lambda: clock(run))
+        results[f"spawn_fruit/fill={fill:.0%}"] = result(seconds / spawns * 1e9, "ns/op", "lower")
+    return results
+
+def record_greedy_games(games, seed=0, max_ticks=20000):
+    replays = []
+    for game_seed in range(seed, seed + games):
+        engine = SnakeEngine(game_seed)
+        recorder = ReplayRecorder().attach(engine)
+        rng = random.Random(game_seed)
+        while not (engine.game_over or engine.game_won) and len(recorder.ticks) < max_ticks:
+            direction = greedy_policy(engine, rng)
+            if direction is not None:
+                engine.snake.change_direction(direction)
+            engine.update()
+        replays.append(load_replay(recorder.to_bytes()))
+    return replays
+
+def bench_update(games=20, seed=0, repeat=3):
+    """SnakeEngine.update throughput, re-simulating recorded greedy games"""
+    # Recording once keeps bot decisions out of the timed loop
+    replays = record_greedy_games(games, seed)
+    ticks = sum(len(replay.ticks) for replay in replays)
+
+    def run():
+        for replay in replays:
+            play_replay(replay)
+
+    seconds = best_of(repeat, lambda: clock(run))
+    return {"update/ticks_per_second": result(ticks / seconds, "ticks/s", "higher")}
+
+def bench_long_snake(width=40, height=30, seed=0, repeat=3, max_ticks=1_000_000):
+    """Solver and engine ticks per second, one endless level until the snake fills the board"""
+    rules = DEFAULT_RULES._replace(fruits_needed_per_level=width * height, last_level=0)
+    ticks = 0
+
+    def run():
+        nonlocal ticks
+        engine = SnakeEngine(seed, rules, width, height)
+        solver = HamiltonianSolver()
+        started = time.perf_counter()
+        ticks = 0
+        while engine.free_cells and not engine.game_over and ticks < max_ticks:
+            solver.drive(engine)
+            engine.update()
+            ticks += 1
+        return time.perf_counter() - started
+
+    seconds = best_of(repeat, run)
+    return {"long_snake/ticks_per_second": result(ticks / seconds, "ticks/s", "higher")}
+
+def bench_draw(frames=600, seed=1, repeat=3):
+    """SnakeGame.draw frames per second, full and incremental, on SDL's dummy driver"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from snake_game import SnakeGame
+
+    results = {}
+    for mode, incremental in (("full", False), ("incremental", True)):
+        # The autopilot plays so the frames match a real game
+        game = SnakeGame(seed=seed, incremental=incremental, autopilot=True)
+
+        def run():
+            drawing = 0.0
+            for _ in range(frames):
+                game.update()
+                started = time.perf_counter()
+                game.draw()
+                drawing += time.perf_counter() - started
+            return drawing
+
+        seconds = best_of(repeat, run)
+        results[f"draw/{mode}"] = result(frames / seconds, "fps", "higher")
+    pygame.quit()
+    return results
+
+def run_benchmarks(quick=False, only=()):
+    """Run every benchmark whose name starts with one of only (all if empty)"""
+    suites = {
+        "move_collision": lambda: bench_move_collision(
+            SNAKE_LENGTHS[:4] if quick else SNAKE_LENGTHS, moves=5000 if quick else 20000),
+        "spawn_fruit": lambda: bench_spawn(spawns=5000 if quick else 20000),
+        "update": lambda: bench_update(games=5 if quick else 20),
+        "long_snake": lambda: bench_long_snake(*((20, 20) if quick else (40, 30))),
+        "draw": lambda: bench_draw(frames=200 if quick else 600),
+    }
+    results = {}
+    for name, suite in suites.items():
+        if only and not any(name.startswith(prefix) or prefix.startswith(name) for prefix in only):
+            continue
+        for key, value in suite().items():
+            if not only or any(key.startswith(prefix) for prefix in only):
+                results[key] = value
+    return {"meta": environment(), "results": results}
+
+def environment():
+    try:
+        from importlib.metadata import version
+        pygame_version = version("pygame")
+    except Exception:
+        pygame_version = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "pygame": pygame_version,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def compare(results, baseline, tolerance=0.15):
+    """Rows of (name, baseline value, current value, slowdown, regressed)
+
+    slowdown is the fractional loss against the baseline (0.2 = 20% slower),
+    whichever direction is better for that benchmark.
+    """
+    rows = []
+    for name, current in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        if current["better"] == "higher":
+            slowdown = previous["value"] / current["value"] - 1
+        else:
+            slowdown = current["value"] / previous["value"] - 1
+        rows.append((name, previous["value"], current["value"], slowdown, slowdown > tolerance))
+    return rows
+
+def format_value(entry):
+    return f"{entry['value']:,.1f} {entry['unit']}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Snake engine, spawning and rendering")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for CI")
+    parser.add_argument("--only", action="append", default=[], metavar="PREFIX",
+                        help="run only benchmarks starting with PREFIX (repeatable)")
+    parser.add_argument("--json", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare with a stored JSON run")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="slowdown that counts as a regression (default 0.15 = 15%%)")
+    args = parser.parse_args()
+
+    print("🐍 Running benchmarks" + (" (quick)" if args.quick else ""))
+    results = run_benchmarks(args.quick, args.only)
+    for name, entry in results["results"].items():
+        print(f"  {name:<32}{format_value(entry):>24}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.tolerance)
+        print(f"\n📊 Compared with {args.compare} (tolerance {args.tolerance:.0%})")
+        for name, previous, current, slowdown, regressed in rows:
+            flag = "❌ REGRESSION" if regressed else "✅"
+            change = f"{abs(slowdown):.1%} {'slower' if slowdown > 0 else 'faster'}"
+            print(f"  {name:<32}{previous:>14,.1f} -> {current:>14,.1f}  {change:>14}  {flag}")
+        regressions = sum(row[4] for row in rows)
+        if regressions:
+            print(f"\n❌ {regressions} benchmark(s) regressed")
+            return 1
+        print("\n🎉 No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
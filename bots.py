@@ -0,0 +1,55 @@
+"""
+Bot policies for headless play
+A policy is called once per tick as policy(engine, rng) and returns a
+Direction to steer, or None to keep going straight.
+"""
+
+import importlib
+
+from autopilot import Autopilot
+from hamiltonian import HamiltonianSolver
+from snake_engine import Direction, FruitType
+
+DIRECTIONS = list(Direction)
+
+def random_policy(engine, rng):
+    # Turn at random about a third of the time
+    if rng.random() < 0.3:
+        return rng.choice(DIRECTIONS)
+    return None
+
+def greedy_policy(engine, rng):
+    # Step toward the nearest good fruit, never into a wall, apple or the body
+    head_x, head_y = engine.snake.body[0]
+    targets = [(f.x, f.y) for f in engine.fruits if f.type != FruitType.APPLE]
+    best = None
+    for direction in DIRECTIONS:
+        x, y = head_x + direction.value[0], head_y + direction.value[1]
+        if not (0 <= x < engine.width and 0 <= y < engine.height) or engine.snake.occupies((x, y)):
+            continue
+        fruit = engine.fruit_at.get((x, y))
+        if fruit is not None and fruit.type == FruitType.APPLE:
+            continue
+        distance = min((abs(x - tx) + abs(y - ty) for tx, ty in targets), default=0)
+        option = (distance, rng.random(), direction)
+        if best is None or option < best:
+            best = option
+    return best[2] if best is not None else None
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "autopilot": Autopilot,  # A class: each worker gets its own cached state
+    "hamiltonian": HamiltonianSolver,
+}
+
+def load_policy(spec):
+    """Resolve a built-in name or "module:attribute"; classes are instantiated"""
+    if spec in POLICIES:
+        policy = POLICIES[spec]
+    elif ":" in spec:
+        module_name, attribute = spec.split(":", 1)
+        policy = getattr(importlib.import_module(module_name), attribute)
+    else:
+        raise ValueError(f"Unknown policy {spec!r}; use one of {sorted(POLICIES)} or module:attribute")
+    return policy() if isinstance(policy, type) else policy
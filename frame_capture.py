@@ -0,0 +1,137 @@
+"""
+Background frame capture
+Copies each drawn frame into one of a few preallocated buffers and hands it
+to a writer thread, which converts it to RGB and streams it out as raw
+video or a PNG sequence. When every buffer is still waiting to be written
+the frame is dropped and counted, so the game loop never waits on the disk.
+
+Raw output plays back with, e.g.:
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600 -r 10 -i frames.rgb highlights.mp4
+"""
+
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+import pygame
+
+FORMATS = ("raw", "png")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+class FrameCapture:
+    """grab(surface) on the game thread; everything else happens on the writer thread"""
+
+    def __init__(self, directory, size, image_format="raw", pool_size=8, png_level=1):
+        if image_format not in FORMATS:
+            raise ValueError(f"Unknown capture format {image_format!r}; use one of {FORMATS}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.width, self.height = size
+        self.image_format = image_format
+        self.png_level = png_level  # zlib level; 1 keeps the writer ahead of 60 FPS
+        self.grabbed = 0
+        self.dropped = 0
+        self.written = 0
+        self.started = time.perf_counter()
+
+        # 32-bit pixels as the surface stores them; the writer sorts out channels
+        self.buffers = [np.empty((self.height, self.width), np.uint32) for _ in range(pool_size)]
+        self._free = queue.Queue()
+        for index in range(pool_size):
+            self._free.put(index)
+        self._filled = queue.Queue()
+        self._channels = None  # Byte offsets of R, G and B, from the first surface
+
+        # Writer-side scratch: PNG rows start with a filter byte (0, none)
+        if image_format == "png":
+            self._rows = np.zeros((self.height, 1 + self.width * 3), np.uint8)
+            self._rgb = self._rows[:, 1:].reshape(self.height, self.width, 3)
+            self._video = None
+        else:
+            self._rgb = np.empty((self.height, self.width, 3), np.uint8)
+            self._video = open(os.path.join(directory, "frames.rgb"), "wb")
+        self._index = open(os.path.join(directory, "frames.csv"), "w")
+        self._index.write("frame,seconds\n")
+        self._writer = threading.Thread(target=self._write_frames, name="frame-capture", daemon=True)
+        self._writer.start()
+
+    def grab(self, surface):
+        """Copy surface into a free buffer; False if the frame was dropped"""
+        number = self.grabbed + self.dropped
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        if self._channels is None:
+            self._channels = self._channel_offsets(surface)
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        np.copyto(self.buffers[index], pixels.T)
+        del pixels  # Unlocks the surface for the next draw
+        self._filled.put((index, number, time.perf_counter() - self.started))
+        self.grabbed += 1
+        return True
+
+    @staticmethod
+    def _channel_offsets(surface):
+        if surface.get_bytesize() != 4:
+            raise ValueError("Frame capture needs a 32-bit surface")
+        offsets = [shift // 8 for shift in surface.get_shifts()[:3]]
+        if sys.byteorder == "big":
+            offsets = [3 - offset for offset in offsets]
+        return offsets
+
+    def _write_frames(self):
+        while True:
+            item = self._filled.get()
+            if item is None:
+                return
+            index, number, seconds = item
+            channels = self.buffers[index].view(np.uint8).reshape(self.height, self.width, 4)
+            for channel, offset in enumerate(self._channels):
+                np.copyto(self._rgb[:, :, channel], channels[:, :, offset])
+            self._free.put(index)  # The scratch copy is all the writer needs now
+
+            if self._video is not None:
+                self._video.write(self._rgb)
+            else:
+                self._write_png(os.path.join(self.directory, f"frame_{number:06d}.png"))
+            self._index.write(f"{number},{seconds:.6f}\n")
+            self.written += 1
+
+    def _write_png(self, path):
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)  # 8-bit RGB
+        with open(path, "wb") as f:
+            f.write(PNG_SIGNATURE)
+            f.write(png_chunk(b"IHDR", header))
+            f.write(png_chunk(b"IDAT", zlib.compress(self._rows, self.png_level)))
+            f.write(png_chunk(b"IEND", b""))
+
+    def close(self):
+        """Finish writing the queued frames; returns the capture stats"""
+        self._filled.put(None)
+        self._writer.join()
+        if self._video is not None:
+            self._video.close()
+        self._index.close()
+        stats = {
+            "format": self.image_format,
+            "width": self.width,
+            "height": self.height,
+            "pix_fmt": "rgb24",
+            "frames": self.written,
+            "dropped": self.dropped,
+        }
+        with open(os.path.join(self.directory, "capture.json"), "w") as f:
+            json.dump(stats, f, indent=2)
+        return stats
@@ -0,0 +1,138 @@
+"""
+Per-phase frame profiler
+Times each phase of a frame (events, update, draw, draw_ui, flip, and the
+wait until the next frame) into fixed-size ring buffers for rolling p50,
+p99 and max. Every frame can also be streamed to a CSV file or a Chrome
+trace-event file (chrome://tracing, Perfetto) for offline analysis.
+
+Nothing here touches pygame; SnakeGame wraps its own methods with wrap().
+"""
+
+import json
+from array import array
+from time import perf_counter
+
+PHASES = ("events", "update", "draw", "draw_ui", "flip", "wait")
+WAIT = PHASES.index("wait")  # Time inside no other phase, mostly clock.tick sleeping
+
+class FrameProfiler:
+    """Exclusive time per phase: a nested phase's time is not counted in its parent"""
+
+    def __init__(self, size=600, export_path=None, clock=perf_counter):
+        self.size = size  # Frames kept for the rolling statistics
+        self.frames = 0
+        self.samples = [array("d", bytes(8 * size)) for _ in PHASES]  # Seconds per phase
+        self.totals = array("d", bytes(8 * size))  # Seconds per whole frame
+        self.clock = clock
+
+        self._current = [0.0] * len(PHASES)
+        self._stack = [WAIT]
+        self._entered = []
+        self._mark = None  # Last phase switch
+        self._frame_started = None
+
+        self.export_path = export_path
+        self._export = None
+        self._trace = export_path is not None and export_path.endswith(".json")
+        self._trace_events = []  # (phase, start, duration) within the current frame
+        if export_path is not None:
+            self._open_export(export_path)
+
+    def wrap(self, phase, function):
+        """Return function timed as phase"""
+        enter, leave, index = self.enter, self.leave, PHASES.index(phase)
+
+        def timed(*args, **kwargs):
+            enter(index)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                leave()
+
+        return timed
+
+    def enter(self, phase):
+        now = self.clock()
+        if self._mark is not None:
+            self._current[self._stack[-1]] += now - self._mark
+        self._stack.append(phase)
+        self._entered.append(now)
+        self._mark = now
+
+    def leave(self):
+        now = self.clock()
+        phase = self._stack.pop()
+        entered = self._entered.pop()
+        if self._mark is not None:
+            self._current[phase] += now - self._mark
+        self._mark = now
+        if self._trace:
+            self._trace_events.append((phase, entered, now - entered))
+
+    def next_frame(self):
+        """Close the frame in progress and start the next; call once per loop"""
+        now = self.clock()
+        if self._frame_started is not None:
+            current = self._current
+            current[self._stack[-1]] += now - self._mark
+            slot = self.frames % self.size
+            for phase, seconds in enumerate(current):
+                self.samples[phase][slot] = seconds
+                current[phase] = 0.0
+            self.totals[slot] = now - self._frame_started
+            if self._export is not None:
+                self._write_frame(slot, now)
+            self.frames += 1
+        self._trace_events.clear()
+        self._frame_started = self._mark = now
+
+    def stats(self):
+        """{name: (p50, p99, max)} in seconds over the buffered frames; "frame" is the whole frame"""
+        count = min(self.frames, self.size)
+        if not count:
+            return {}
+        result = {}
+        for name, samples in zip(("frame",) + PHASES, [self.totals] + self.samples):
+            values = sorted(samples[:count])
+            result[name] = (values[count // 2], values[min(int(count * 0.99), count - 1)], values[-1])
+        return result
+
+    def summary(self):
+        lines = [f"{'phase':<8}{'p50':>8}{'p99':>8}{'max':>8}  ms"]
+        for name, (p50, p99, peak) in self.stats().items():
+            lines.append(f"{name:<8}{p50 * 1000:8.2f}{p99 * 1000:8.2f}{peak * 1000:8.2f}")
+        return lines
+
+    # Export
+
+    def _open_export(self, path):
+        self._export = open(path, "w")
+        if self._trace:
+            self._export.write("[\n")
+            self._first_event = True
+        else:
+            self._export.write("frame,start_ms,total_ms," + ",".join(f"{p}_ms" for p in PHASES) + "\n")
+
+    def _write_frame(self, slot, now):
+        started = self._frame_started
+        if not self._trace:
+            phases = ",".join(f"{self.samples[p][slot] * 1000:.4f}" for p in range(len(PHASES)))
+            self._export.write(f"{self.frames},{started * 1000:.4f},{self.totals[slot] * 1000:.4f},{phases}\n")
+            return
+
+        # Complete ("X") events in microseconds: the frame, then every timed call in it
+        events = [{"name": "frame", "ph": "X", "ts": started * 1e6, "dur": (now - started) * 1e6,
+                   "pid": 0, "tid": 0, "args": {"frame": self.frames}}]
+        for phase, start, duration in self._trace_events:
+            events.append({"name": PHASES[phase], "ph": "X", "ts": start * 1e6, "dur": duration * 1e6,
+                           "pid": 0, "tid": 0})
+        for event in events:
+            self._export.write(("" if self._first_event else ",\n") + json.dumps(event))
+            self._first_event = False
+
+    def close(self):
+        if self._export is not None:
+            if self._trace:
+                self._export.write("\n]\n")
+            self._export.close()
+            self._export = None
@@ -0,0 +1,469 @@
+"""
+Hamiltonian-cycle solver
+Follows a cycle through every cell that is not an apple, so the snake can
+grow until it fills the cycle. This gives a deterministic long-snake
+workload for demos and soak tests.
+
+Cycles are built once per board size and apple layout and kept in an LRU
+cache. The apples stay put for a whole level, so later ticks, level
+restarts and replays of the same seed all reuse the cached cycle. A new
+cycle is built a bounded number of cells per tick, with the pathfinding
+autopilot driving meanwhile, so a large board never stalls a tick. Steering
+is then O(1) per tick: a lookup of the head's cycle position and of its
+four neighbours.
+
+Shortcuts toward good fruit follow the usual safe-shortcut rule. The body
+always lies, in order, on the stretch of cycle from the tail to the head.
+A move may skip ahead along the cycle but never past the tail. It must
+also leave more free cells ahead than the growth still to come: pending
+growth plus every good fruit on the board. Past half the board the solver
+stops taking shortcuts and just follows the cycle.
+
+Fruit on a cell the cycle misses would never be reached that way. Once every
+good fruit is on such cells, the solver detours through free off-cycle cells
+to one and rejoins the cycle under the same rule.
+"""
+
+from collections import OrderedDict, deque, namedtuple
+from itertools import islice
+
+from autopilot import Autopilot
+from snake_engine import OPPOSITE_DIRECTIONS, Direction, FruitType
+
+SHORTCUT_FILL = 0.5  # Fraction of the cycle the snake may fill and still take shortcuts
+BUILD_BUDGET = 20000  # Cycle cells built per tick; a 40x30 cycle takes one
+
+# order: flat cells in cycle order; position: flat cell -> index in order, -1 if off the cycle
+Cycle = namedtuple("Cycle", ["order", "position"])
+
+def build_cycle(width, height, apples=frozenset()):
+    """Cycle through as many non-apple cells as possible; apples are flat cells
+
+    2x2 blocks without apples each start as a small loop, and the loops are
+    joined along a spanning tree of the blocks. Then pairs of cells next to
+    a cycle edge are spliced in. That picks up the free cells in apple
+    blocks and an odd last row or column. A few cells may stay off the
+    cycle, for example one cell per apple by parity.
+    """
+    return finish(cycle_steps(width, height, apples))
+
+def finish(job):
+    # Run a job to the end and return its result
+    while True:
+        try:
+            next(job)
+        except StopIteration as done:
+            return done.value
+
+def cycle_steps(width, height, apples=frozenset()):
+    """build_cycle as a job: yields the cells of work done so far, returns the Cycle"""
+    size = width * height
+    blocked = [False] * size
+    for cell in apples:
+        blocked[cell] = True
+
+    # Blocks are numbered row by row, block_width to a row
+    block_width, block_height = width // 2, height // 2
+    free = bytearray(block_width * block_height)
+    for by in range(block_height):
+        for bx in range(block_width):
+            top_left = 2 * by * width + 2 * bx
+            free[by * block_width + bx] = not (blocked[top_left] or blocked[top_left + 1]
+                                               or blocked[top_left + width] or blocked[top_left + width + 1])
+        yield 2 * width
+
+    # Spanning tree (depth first) of the largest connected group of free blocks;
+    # edges holds pairs of blocks flattened, parent first
+    blocks, edges = [], []
+    seen = bytearray(len(free))
+    for start in range(len(free)):
+        if not free[start] or seen[start]:
+            continue
+        seen[start] = True
+        group, group_edges, stack = [start], [], [start]
+        while stack:
+            block = stack.pop()
+            bx, by = block % block_width, block // block_width
+            for ok, other in ((bx + 1 < block_width, block + 1), (by + 1 < block_height, block + block_width),
+                              (bx > 0, block - 1), (by > 0, block - block_width)):
+                if ok and free[other] and not seen[other]:
+                    seen[other] = True
+                    group.append(other)
+                    group_edges += (block, other)
+                    stack.append(other)
+            yield 4
+        if len(group) > len(blocks):
+            blocks, edges = group, group_edges
+
+    successor = [-1] * size
+    for block in blocks:
+        cell = 2 * (block // block_width) * width + 2 * (block % block_width)  # Clockwise from the top-left corner
+        successor[cell] = cell + 1
+        successor[cell + 1] = cell + 1 + width
+        successor[cell + 1 + width] = cell + width
+        successor[cell + width] = cell
+        yield 4
+    for index in range(0, len(edges), 2):
+        a, b = edges[index], edges[index + 1]
+        ax, ay = a % block_width, a // block_width
+        bx, by = b % block_width, b // block_width
+        if ay == by:
+            # Side by side: swap the left block's down edge and the right block's up edge
+            cell = 2 * ay * width + 2 * min(ax, bx) + 1  # Left block's top-right
+            successor[cell] = cell + 1
+            successor[cell + 1 + width] = cell + width
+        else:
+            # Stacked: swap the top block's left edge and the bottom block's right edge
+            cell = (2 * min(ay, by) + 1) * width + 2 * ax  # Top block's bottom-left
+            successor[cell + 1] = cell + 1 + width
+            successor[cell + width] = cell
+        yield 4
+
+    # Splice a -> b into a -> c -> d -> b wherever c and d are free, side by side with a and b.
+    # Only a splice makes new edges, so those are the only ones to try again
+    pending = deque()
+    for y in range(height):
+        pending.extend(cell for cell in range(y * width, (y + 1) * width) if successor[cell] >= 0)
+        yield width
+    while pending:
+        a = pending.popleft()
+        b = successor[a]
+        if b - a in (1, -1):
+            offsets = [offset for offset in (-width, width) if 0 <= a + offset < size]
+        else:
+            offsets = [offset for offset in (-1, 1) if 0 <= a % width + offset < width]
+        for offset in offsets:
+            c, d = a + offset, b + offset
+            if successor[c] < 0 and successor[d] < 0 and not blocked[c] and not blocked[d]:
+                successor[a], successor[c], successor[d] = c, d, b
+                pending.extend((a, c, d))
+                break
+        yield 1
+
+    order = []
+    position = [-1] * size
+    start = next((cell for cell in range(size) if successor[cell] >= 0), -1)
+    cell = start
+    while cell >= 0 and position[cell] < 0:
+        position[cell] = len(order)
+        order.append(cell)
+        cell = successor[cell]
+        yield 1
+    return Cycle(order, position)
+
+class CycleCache:
+    """Cycles keyed by (width, height, apples), least recently used evicted first"""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cycles = OrderedDict()
+
+    def __len__(self):
+        return len(self._cycles)
+
+    def get(self, width, height, apples):
+        cycle = self.lookup(width, height, apples)
+        if cycle is None:
+            cycle = finish(self.build(width, height, apples))
+        return cycle
+
+    def lookup(self, width, height, apples):
+        # The cached cycle, or None
+        key = (width, height, apples)
+        cycle = self._cycles.get(key)
+        if cycle is not None:
+            self._cycles.move_to_end(key)
+            self.hits += 1
+        return cycle
+
+    def build(self, width, height, apples):
+        """Job that builds a cycle a few cells per step and caches it; returns the cycle"""
+        self.misses += 1
+        cycle = yield from cycle_steps(width, height, apples)
+        self._cycles[(width, height, apples)] = cycle
+        if len(self._cycles) > self.maxsize:
+            self._cycles.popitem(last=False)
+        return cycle
+
+CYCLES = CycleCache()  # Shared by every solver in the process
+
+class HamiltonianSolver:
+    """Callable policy: solver(engine, rng=None) -> Direction or None
+
+    A cycle missing from the cache is built over several ticks, at most
+    BUILD_BUDGET cells per tick, while the pathfinding autopilot drives.
+
+    When a level changes the apples, the body is usually not yet in cycle
+    order. Until it is, the solver follows the new cycle wherever the next
+    cell is clear, and otherwise hands that tick to the autopilot.
+    """
+
+    def __init__(self, cache=CYCLES):
+        self.cache = cache
+        self.cycle = None
+        self.fallback = Autopilot()
+        self.stats = {"cycles": 0, "shortcuts": 0, "detours": 0, "resync_ticks": 0, "fallbacks": 0, "build_ticks": 0}
+
+        self.width = None
+        self.height = None
+        self._snake = None  # Snake object the cycle was chosen for
+        self._job = None    # Cycle still being built, a few cells per tick
+        self._level = None
+        self._score = None
+        self._ordered = False  # Body in cycle order, tail to head
+        self._target = -1      # Nearest good fruit ahead on the cycle
+        self._goods = 0
+        self._stranded = False  # Every good fruit is off the cycle
+        self._detour = deque()  # Off-cycle cells still to walk, then the cycle cell to rejoin at
+
+    def __call__(self, engine, rng=None):
+        self._sync(engine)
+        if self.cycle is None:
+            self.stats["build_ticks"] += 1
+            return self.fallback(engine, rng)
+        if not self._ordered:
+            if not self._in_cycle_order(engine.snake):
+                return self._resync(engine, rng)
+            self._ordered = True
+            self._choose_target(engine)
+        return self._next_direction(engine)
+
+    def drive(self, engine):
+        # Steer the engine's snake for the coming tick
+        direction = self(engine)
+        if direction is not None:
+            engine.snake.change_direction(direction)
+        return direction
+
+    def replan(self):
+        # The snake moved without us (a rewind): check the body order again
+        self._ordered = False
+        self._score = None
+        self._detour.clear()
+        self.fallback.replan()
+
+    def _resize(self, width, height):
+        self.width, self.height = width, height
+        self._step_direction = {-width: Direction.UP, width: Direction.DOWN, -1: Direction.LEFT, 1: Direction.RIGHT}
+
+    def _neighbors(self, cell):
+        # (cell, direction) pairs in Direction order; only ever needed near the head
+        width = self.width
+        x = cell % width
+        cells = []
+        if cell >= width:
+            cells.append((cell - width, Direction.UP))
+        if cell < width * (self.height - 1):
+            cells.append((cell + width, Direction.DOWN))
+        if x > 0:
+            cells.append((cell - 1, Direction.LEFT))
+        if x < width - 1:
+            cells.append((cell + 1, Direction.RIGHT))
+        return cells
+
+    def _flat(self, cell):
+        return cell[1] * self.width + cell[0]
+
+    def _sync(self, engine):
+        # Apples only change on a reset or a level change
+        if engine.snake is not self._snake or engine.level != self._level:
+            if (engine.width, engine.height) != (self.width, self.height):
+                self._resize(engine.width, engine.height)
+            apples = frozenset(self._flat(cell) for cell, fruit in engine.fruit_at.items()
+                               if fruit.type == FruitType.APPLE)
+            self.cycle = self.cache.lookup(engine.width, engine.height, apples)
+            self._job = None if self.cycle is not None else self.cache.build(engine.width, engine.height, apples)
+            self.stats["cycles"] += 1
+            self._snake = engine.snake
+            self._level = engine.level
+            self._detour.clear()
+            self._ordered = self.cycle is not None and self._in_cycle_order(engine.snake)
+            self._score = None
+        if self._job is not None:
+            budget = BUILD_BUDGET
+            try:
+                while budget > 0:
+                    budget -= next(self._job)
+                return
+            except StopIteration as done:
+                self.cycle = done.value
+                self._job = None
+                self._ordered = self._in_cycle_order(engine.snake)
+        if engine.score != self._score:
+            self._choose_target(engine)
+            self._score = engine.score
+
+    def _in_cycle_order(self, snake):
+        # Each segment further behind the head along the cycle than the one before it
+        order, position = self.cycle
+        length = len(order)
+        head = position[self._flat(snake.body[0])]
+        if head < 0:
+            return False
+        previous = 0
+        for segment in islice(snake.body, 1, None):
+            cell = position[self._flat(segment)]
+            if cell < 0:
+                continue  # Left by a detour; the head never goes back there
+            if (head - cell) % length <= previous:
+                return False
+            previous = (head - cell) % length
+        return True
+
+    def _choose_target(self, engine):
+        order, position = self.cycle
+        head = position[self._flat(engine.snake.body[0])]
+        self._target = -1
+        self._goods = 0
+        best = None
+        for cell, fruit in engine.fruit_at.items():
+            if fruit.type == FruitType.APPLE:
+                continue
+            self._goods += 1
+            flat = self._flat(cell)
+            if head < 0 or position[flat] < 0:
+                continue  # Off the cycle: only eaten on a detour
+            ahead = (position[flat] - head) % len(order)
+            if best is None or ahead < best:
+                best, self._target = ahead, flat
+        self._stranded = head >= 0 and self._goods > 0 and self._target < 0
+
+    def _next_direction(self, engine):
+        snake = engine.snake
+        order, position = self.cycle
+        length = len(order)
+        head_cell = self._flat(snake.body[0])
+        head = position[head_cell]
+        reverse = OPPOSITE_DIRECTIONS[snake.direction]
+
+        # Cells ahead up to and including the tail; all of them when the snake is one cell
+        if head >= 0:
+            gap = (self._tail_position(snake) - head) % length or length
+            if self._stranded and not self._detour:
+                self._plan_detour(engine, head_cell, head, gap)
+        if self._detour:
+            following = self._detour.popleft()
+            for cell, direction in self._neighbors(head_cell):
+                if cell == following:
+                    return direction
+            self._detour.clear()  # Moved off the planned detour
+        if head < 0:
+            return self._resync(engine, None)
+
+        growth = snake.grow_pending
+        limit = 1
+        if len(snake.body) + growth <= length * SHORTCUT_FILL:
+            limit = gap - 1 - growth - self._goods
+            if self._target >= 0:
+                limit = min(limit, (position[self._target] - head) % length)
+
+        # The furthest skip ahead within the limit; the next cell on the cycle always qualifies
+        best, best_ahead = None, 0
+        for cell, direction in self._neighbors(head_cell):
+            if direction is reverse or position[cell] < 0:
+                continue
+            ahead = (position[cell] - head) % length
+            if best_ahead < ahead <= max(limit, 1):
+                best, best_ahead = direction, ahead
+        if best is None:
+            return self._resync(engine, None)  # A one-cell snake facing away from the cycle
+        if best_ahead > 1:
+            self.stats["shortcuts"] += 1
+        return best
+
+    def _tail_position(self, snake):
+        # Cycle position of the last segment on the cycle; cells left by detours don't count
+        position = self.cycle.position
+        for segment in reversed(snake.body):
+            if position[self._flat(segment)] >= 0:
+                return position[self._flat(segment)]
+        return -1
+
+    def _plan_detour(self, engine, head_cell, head, gap):
+        # Good fruit off the cycle never comes up on it: walk through free off-cycle cells
+        # to one and back onto the cycle. The rejoin may skip ahead as far as a shortcut
+        # may, or as far as following the cycle for the same number of moves would get
+        position = self.cycle.position
+        length = len(self.cycle.order)
+        reverse = OPPOSITE_DIRECTIONS[engine.snake.direction]
+        behind = {cell for cell, direction in self._neighbors(head_cell) if direction is reverse}
+        for cell, fruit in engine.fruit_at.items():
+            if fruit.type == FruitType.APPLE:
+                continue
+            target = self._flat(cell)
+            to_fruit = self._off_cycle_path(engine, head_cell, behind, lambda n, moves: n == target)
+            if to_fruit is None:
+                continue
+
+            def rejoins(n, moves):
+                ahead = (position[n] - head) % length
+                moves += len(to_fruit)
+                slack = gap - engine.snake.grow_pending - self._goods + moves - 2
+                return position[n] >= 0 and n != head_cell and 2 <= ahead < gap and ahead <= max(slack, moves)
+
+            back = self._off_cycle_path(engine, target, behind | {head_cell, *to_fruit}, rejoins)
+            if back is not None:
+                self._detour.extend(to_fruit + back)
+                self.stats["detours"] += 1
+                return
+
+    def _off_cycle_path(self, engine, start, avoid, accept):
+        # Shortest path from start (excluded) through free off-cycle cells, apples aside,
+        # to a cell accept(cell, moves) takes; None if there is none
+        position = self.cycle.position
+        came_from = {start: None}
+        frontier = [start]
+        moves = 0
+        while frontier:
+            moves += 1
+            next_frontier = []
+            for cell in frontier:
+                for n, _ in self._neighbors(cell):
+                    if n in came_from or n in avoid:
+                        continue
+                    came_from[n] = cell
+                    if accept(n, moves):
+                        path = []
+                        while n != start:
+                            path.append(n)
+                            n = came_from[n]
+                        return path[::-1]
+                    xy = (n % self.width, n // self.width)
+                    fruit = engine.fruit_at.get(xy)
+                    if position[n] < 0 and not engine.snake.occupies(xy) \
+                            and (fruit is None or fruit.type != FruitType.APPLE):
+                        next_frontier.append(n)
+            frontier = next_frontier
+        return None
+
+    def _resync(self, engine, rng):
+        # Follow the cycle while that cannot run into the body, until the body is back in order
+        self.stats["resync_ticks"] += 1
+        snake = engine.snake
+        order, position = self.cycle
+        head_cell = self._flat(snake.body[0])
+        head = position[head_cell]
+        if head >= 0:
+            following = order[(head + 1) % len(order)]
+            direction = self._step_direction.get(following - head_cell)
+            if direction is not None and direction is not OPPOSITE_DIRECTIONS[snake.direction]:
+                if self._cycle_clear(snake, head):
+                    return direction
+        self.stats["fallbacks"] += 1
+        self.fallback.replan()  # Its path was planned from where the snake was before the cycle moved it
+        return self.fallback(engine, rng)
+
+    def _cycle_clear(self, snake, head):
+        # Every segment on the cycle ahead must be gone before the head gets there,
+        # even if each good fruit on the board is eaten on the way
+        order, position = self.cycle
+        length = len(order)
+        body = snake.body
+        delay = len(body) + snake.grow_pending + self._goods
+        for index, segment in enumerate(islice(body, 1, None), 1):
+            cell = position[self._flat(segment)]
+            if cell >= 0 and (cell - head) % length < delay - index:
+                return False
+        return True
@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Authoritative multiplayer server
+Runs the Snake rules for many snakes on one board at a fixed tick rate and
+broadcasts binary delta frames over TCP. Clients send only direction
+changes, one byte each, coded as in replays (1 + index of the Direction).
+
+Example:
+    python multiplayer.py serve --port 7777 --tick-rate 10
+    python multiplayer.py bots --port 7777 --count 200 --seconds 30
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import struct
+import sys
+import time
+from collections import deque
+
+from replay import DIRECTION_BYTES, DIRECTIONS
+from snake_engine import DEFAULT_RULES, GOOD_FRUITS, Direction, FreeCellIndex, Fruit, FruitType, Snake
+
+# Delta events, (kind, a, x, y) packed as EVENT
+HEAD = 0    # Snake a grew a new head at (x, y)
+TAIL = 1    # Snake a lost its tail segment
+SPAWN = 2   # Snake a appeared, one segment at (x, y); replaces any snake a
+DIE = 3     # Snake a left the board
+FRUIT = 4   # Fruit of type FRUIT_TYPES[a] appeared at (x, y)
+EAT = 5     # Snake a ate the fruit at (x, y), scoring 10
+SCORE = 6   # Snake a has score x * 65536 + y (snapshots only)
+
+FRUIT_TYPES = list(FruitType)
+FRUIT_CODES = {fruit_type: i for i, fruit_type in enumerate(FRUIT_TYPES)}
+
+# Messages from the server, each prefixed with its LENGTH
+WELCOME = 0   # WELCOME_BODY: your snake id, board width and height, ticks per second
+SNAPSHOT = 1  # FRAME then events: the whole board; clear before applying
+DELTA = 2     # FRAME then events: changes since the previous tick
+
+LENGTH = struct.Struct("<I")
+FRAME = struct.Struct("<BII")  # message kind, tick, event count; a big board's snapshot needs 32 bits
+WELCOME_BODY = struct.Struct("<BIHHH")
+EVENT = struct.Struct("<BIHH")  # Snake ids only go up, so they get 32 bits
+
+class MultiSnakeEngine:
+    """Any number of snakes on one board, all moved by each tick()
+
+    Snakes move at once: every tail leaves before any head arrives, so a
+    snake may follow a tail into the cell it vacates. A head on a wall, an
+    apple or any body (including another head) kills. Dead snakes respawn
+    after respawn_ticks until removed.
+    """
+
+    def __init__(self, seed=None, rules=DEFAULT_RULES, width=80, height=60, respawn_ticks=20):
+        self.rules = rules
+        self.width = width
+        self.height = height
+        self.respawn_ticks = respawn_ticks
+        self.rng = random.Random(seed)
+        self.snakes = {}     # id -> Snake
+        self.scores = {}     # id -> score, alive or waiting to respawn
+        self.respawning = {}  # id -> ticks left
+        self.occupied = {}   # cell -> segments of any snake there
+        self.free_cells = FreeCellIndex(width, height)
+        self.fruit_at = {}
+        self.apple_count = 0
+        self.good_fruit_count = 0
+        self.tick_count = 0
+        self.events = []  # Since the last take_events()
+        self._next_id = 0
+
+    def take_events(self):
+        events, self.events = self.events, []
+        return events
+
+    def add_snake(self):
+        snake_id = self._next_id
+        self._next_id += 1
+        self.scores[snake_id] = 0
+        self._spawn(snake_id)
+        self._top_up_fruit()
+        return snake_id
+
+    def remove_snake(self, snake_id):
+        if snake_id in self.snakes:
+            self._kill(snake_id)
+        self.respawning.pop(snake_id, None)
+        self.scores.pop(snake_id, None)
+
+    def steer(self, snake_id, direction):
+        snake = self.snakes.get(snake_id)
+        if snake is not None:
+            snake.change_direction(direction)
+
+    def tick(self):
+        self.tick_count += 1
+        events, snakes = self.events, self.snakes
+
+        for snake_id, snake in snakes.items():
+            tail = snake.move()
+            if tail is not None:
+                events.append((TAIL, snake_id, 0, 0))
+                self._vacate(tail)
+        crashed = []
+        for snake_id, snake in snakes.items():
+            x, y = head = snake.body[0]
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                crashed.append(snake_id)
+                continue
+            events.append((HEAD, snake_id, x, y))
+            self._occupy(head)
+
+        for snake_id, snake in snakes.items():
+            head = snake.body[0]
+            count = self.occupied.get(head)
+            if count is None:
+                continue  # Off the board, already crashed
+            fruit = self.fruit_at.get(head)
+            if count > 1 or (fruit is not None and fruit.type is FruitType.APPLE):
+                crashed.append(snake_id)
+        for snake_id in crashed:
+            self._kill(snake_id)
+            self.respawning[snake_id] = self.respawn_ticks
+
+        for snake_id, snake in snakes.items():
+            head = snake.body[0]
+            fruit = self.fruit_at.pop(head, None)
+            if fruit is not None:
+                snake.grow()
+                self.scores[snake_id] += 10
+                self.good_fruit_count -= 1
+                events.append((EAT, snake_id, head[0], head[1]))
+
+        for snake_id in list(self.respawning):
+            self.respawning[snake_id] -= 1
+            if self.respawning[snake_id] <= 0:
+                del self.respawning[snake_id]
+                self.scores[snake_id] = 0
+                self._spawn(snake_id)
+        self._top_up_fruit()
+
+    def snapshot_events(self):
+        # Events that build the current board from nothing
+        events = []
+        for snake_id, snake in self.snakes.items():
+            # Grown again from the tail; the body is a deque, so walk it rather than index it
+            segments = reversed(snake.body)
+            tail_x, tail_y = next(segments)
+            events.append((SPAWN, snake_id, tail_x, tail_y))
+            for x, y in segments:
+                events.append((HEAD, snake_id, x, y))
+        for snake_id, score in self.scores.items():
+            events.append((SCORE, snake_id, score >> 16, score & 0xFFFF))
+        for (x, y), fruit in self.fruit_at.items():
+            events.append((FRUIT, FRUIT_CODES[fruit.type], x, y))
+        return events
+
+    # Board bookkeeping
+
+    def _occupy(self, cell):
+        count = self.occupied.get(cell, 0)
+        if not count:
+            self.free_cells.discard(cell)
+        self.occupied[cell] = count + 1
+
+    def _vacate(self, cell):
+        count = self.occupied[cell] - 1
+        if count:
+            self.occupied[cell] = count
+            return
+        del self.occupied[cell]
+        if cell not in self.fruit_at:  # An apple stays where a snake died on it
+            self.free_cells.add(cell)
+
+    def _spawn(self, snake_id):
+        cell = self.free_cells.pop_random(self.rng)
+        if cell is None:
+            self.respawning[snake_id] = self.respawn_ticks  # Board full, try later
+            return
+        snake = Snake(self.width, self.height)
+        snake.body = [cell]
+        # Head for the far side of the board
+        x, y = cell
+        if abs(x - self.width // 2) > abs(y - self.height // 2):
+            snake.direction = Direction.LEFT if x > self.width // 2 else Direction.RIGHT
+        else:
+            snake.direction = Direction.UP if y > self.height // 2 else Direction.DOWN
+        self.snakes[snake_id] = snake
+        self._occupy(cell)
+        self.events.append((SPAWN, snake_id, x, y))
+
+    def _kill(self, snake_id):
+        snake = self.snakes.pop(snake_id)
+        for index, (x, y) in enumerate(snake.body):
+            # A head off the board was never occupied
+            if index == 0 and not (0 <= x < self.width and 0 <= y < self.height):
+                continue
+            self._vacate((x, y))
+        self.events.append((DIE, snake_id, 0, 0))
+
+    def _top_up_fruit(self):
+        # A fixed number of apples, and one good fruit per snake on top of the base count
+        wanted = [(FruitType.APPLE, self.rules.max_apples - self.apple_count),
+                  (None, self.rules.base_good_fruits + len(self.scores) - self.good_fruit_count)]
+        for fruit_type, missing in wanted:
+            for _ in range(missing):
+                cell = self.free_cells.pop_random(self.rng)
+                if cell is None:
+                    return
+                kind = fruit_type or self.rng.choice(GOOD_FRUITS)
+                self.fruit_at[cell] = Fruit(kind, *cell)
+                if fruit_type is None:
+                    self.good_fruit_count += 1
+                else:
+                    self.apple_count += 1
+                self.events.append((FRUIT, FRUIT_CODES[kind], cell[0], cell[1]))
+
+# Wire format
+
+def encode_frame(kind, tick, events):
+    body = bytearray(LENGTH.size + FRAME.size + EVENT.size * len(events))
+    FRAME.pack_into(body, LENGTH.size, kind, tick, len(events))
+    offset = LENGTH.size + FRAME.size
+    for event in events:
+        EVENT.pack_into(body, offset, *event)
+        offset += EVENT.size
+    LENGTH.pack_into(body, 0, len(body) - LENGTH.size)
+    return bytes(body)
+
+def encode_welcome(snake_id, width, height, tick_rate):
+    body = WELCOME_BODY.pack(WELCOME, snake_id, width, height, tick_rate)
+    return LENGTH.pack(len(body)) + body
+
+def decode_frame(payload):
+    """(kind, tick, events) for SNAPSHOT and DELTA, (WELCOME, None, fields) for WELCOME"""
+    if payload[0] == WELCOME:
+        return WELCOME, None, WELCOME_BODY.unpack(payload)[1:]
+    kind, tick, count = FRAME.unpack_from(payload)
+    return kind, tick, list(EVENT.iter_unpack(payload[FRAME.size:FRAME.size + count * EVENT.size]))
+
+class BoardView:
+    """A client's copy of the board, kept from snapshot and delta frames"""
+
+    def __init__(self):
+        self.tick = 0
+        self.snakes = {}    # id -> deque of cells, head first
+        self.scores = {}    # id -> score, kept after the snake dies
+        self.fruit_at = {}  # cell -> FruitType
+        self.occupied = {}  # cell -> segments of any snake there
+
+    def apply(self, kind, tick, events):
+        if kind == SNAPSHOT:
+            self.snakes.clear()
+            self.fruit_at.clear()
+            self.occupied.clear()
+        self.tick = tick
+        snakes, occupied = self.snakes, self.occupied
+        for event, a, x, y in events:
+            if event == HEAD:
+                snakes[a].appendleft((x, y))
+                occupied[(x, y)] = occupied.get((x, y), 0) + 1
+            elif event == TAIL:
+                self._vacate(snakes[a].pop())
+            elif event == SPAWN:
+                self._remove(a)
+                snakes[a] = deque([(x, y)])
+                occupied[(x, y)] = occupied.get((x, y), 0) + 1
+                self.scores[a] = 0
+            elif event == DIE:
+                self._remove(a)
+            elif event == FRUIT:
+                self.fruit_at[(x, y)] = FRUIT_TYPES[a]
+            elif event == EAT:
+                del self.fruit_at[(x, y)]
+                self.scores[a] = self.scores.get(a, 0) + 10
+            elif event == SCORE:
+                self.scores[a] = (x << 16) | y
+
+    def _remove(self, snake_id):
+        # SPAWN and DIE may repeat what a snapshot already showed
+        for cell in self.snakes.pop(snake_id, ()):
+            self._vacate(cell)
+
+    def _vacate(self, cell):
+        count = self.occupied[cell] - 1
+        if count:
+            self.occupied[cell] = count
+        else:
+            del self.occupied[cell]
+
+# Server
+
+class Client:
+    __slots__ = ("snake_id", "writer", "lagging")
+
+    def __init__(self, snake_id, writer):
+        self.snake_id = snake_id
+        self.writer = writer
+        self.lagging = False  # Missed deltas, waiting for a snapshot
+
+class SnakeServer:
+    """Ticks a MultiSnakeEngine and fans each tick's delta frame out to every client
+
+    Writes never wait: a client whose unsent data exceeds max_buffer bytes
+    skips deltas until it has drained to half that, then gets a snapshot.
+    A slow client therefore costs at most max_buffer plus one snapshot of
+    memory and never delays the tick.
+    """
+
+    def __init__(self, engine, tick_rate=10, max_buffer=64 * 1024):
+        self.engine = engine
+        self.tick_rate = tick_rate
+        self.max_buffer = max_buffer
+        self.clients = {}  # snake id -> Client
+        self.turns = {}    # snake id -> Direction for the next tick; the last one sent wins
+        self.stats = {"ticks": 0, "frames_skipped": 0, "resyncs": 0, "slowest_tick": 0.0,
+                      "failed_ticks": 0, "dropped_clients": 0}
+        self._snapshot = None  # (tick, frame), built at most once per tick
+
+    async def start(self, host="127.0.0.1", port=7777):
+        # Port 0 picks a free port, found in self.port
+        server = await asyncio.start_server(self.handle_client, host, port, backlog=1024)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    async def serve(self, host="127.0.0.1", port=7777):
+        async with await self.start(host, port):
+            await self.run_ticks()
+
+    async def handle_client(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        engine = self.engine
+        snake_id = None
+        try:
+            snake_id = engine.add_snake()
+            self.clients[snake_id] = Client(snake_id, writer)
+            writer.write(encode_welcome(snake_id, engine.width, engine.height, self.tick_rate))
+            writer.write(encode_frame(SNAPSHOT, engine.tick_count, engine.snapshot_events()))
+            while True:
+                data = await reader.read(256)
+                if not data:
+                    break
+                for code in data:
+                    if 1 <= code <= len(DIRECTIONS):
+                        self.turns[snake_id] = DIRECTIONS[code - 1]
+        except ConnectionError:
+            pass
+        finally:
+            if snake_id is not None:
+                self.clients.pop(snake_id, None)
+                self.turns.pop(snake_id, None)
+                engine.remove_snake(snake_id)
+            writer.close()
+
+    async def run_ticks(self, ticks=None):
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        next_tick = loop.time()
+        while ticks is None or self.stats["ticks"] < ticks:
+            started = time.perf_counter()
+            try:
+                self.tick()
+            except Exception as error:
+                # One bad tick must not take the server down with it
+                self.stats["failed_ticks"] += 1
+                print(f"⚠️  Tick {self.engine.tick_count} failed: {error!r}", file=sys.stderr)
+            self.stats["slowest_tick"] = max(self.stats["slowest_tick"], time.perf_counter() - started)
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    def tick(self):
+        engine = self.engine
+        for snake_id, direction in self.turns.items():
+            engine.steer(snake_id, direction)
+        self.turns.clear()
+        engine.tick()
+        self.stats["ticks"] += 1
+        self.broadcast(encode_frame(DELTA, engine.tick_count, engine.take_events()))
+
+    def broadcast(self, frame):
+        # One encoded frame for everyone; writes only queue on the transport
+        for client in list(self.clients.values()):
+            try:
+                buffered = client.writer.transport.get_write_buffer_size()
+                if buffered > self.max_buffer or (client.lagging and buffered > self.max_buffer // 2):
+                    client.lagging = True
+                    self.stats["frames_skipped"] += 1
+                elif client.lagging:
+                    # The snapshot already includes this tick's changes
+                    client.writer.write(self.snapshot())
+                    client.lagging = False
+                    self.stats["resyncs"] += 1
+                else:
+                    client.writer.write(frame)
+            except (OSError, RuntimeError, struct.error) as error:
+                # Only this client is lost; handle_client removes its snake once the connection closes
+                self.stats["dropped_clients"] += 1
+                print(f"⚠️  Dropping client {client.snake_id}: {error!r}", file=sys.stderr)
+                self.clients.pop(client.snake_id, None)
+                client.writer.close()
+
+    def snapshot(self):
+        engine = self.engine
+        if self._snapshot is None or self._snapshot[0] != engine.tick_count:
+            self._snapshot = (engine.tick_count, encode_frame(SNAPSHOT, engine.tick_count, engine.snapshot_events()))
+        return self._snapshot[1]
+
+# Client
+
+class SnakeClient:
+    """Connects, keeps a BoardView up to date and sends direction changes"""
+
+    def __init__(self, reader, writer, snake_id, width, height, tick_rate):
+        self.reader = reader
+        self.writer = writer
+        self.snake_id = snake_id
+        self.width = width
+        self.height = height
+        self.tick_rate = tick_rate
+        self.view = BoardView()
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=7777):
+        reader, writer = await asyncio.open_connection(host, port)
+        kind, _, fields = decode_frame(await cls._read_payload(reader))
+        if kind != WELCOME:
+            raise ConnectionError("Expected a welcome message")
+        return cls(reader, writer, *fields)
+
+    @staticmethod
+    async def _read_payload(reader):
+        (length,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+        return await reader.readexactly(length)
+
+    async def receive(self):
+        """Apply the next frame; returns its tick"""
+        kind, tick, events = decode_frame(await self._read_payload(self.reader))
+        self.view.apply(kind, tick, events)
+        return tick
+
+    def steer(self, direction):
+        self.writer.write(bytes((DIRECTION_BYTES[direction],)))
+
+    @property
+    def body(self):
+        return self.view.snakes.get(self.snake_id)
+
+    def safe_directions(self):
+        # Moves whose next cell is not a wall, a body or an apple
+        body = self.body
+        if not body:
+            return []
+        head_x, head_y = body[0]
+        options = []
+        for direction in DIRECTIONS:
+            x, y = head_x + direction.value[0], head_y + direction.value[1]
+            if len(body) > 1 and (x, y) == body[1]:
+                continue
+            if not (0 <= x < self.width and 0 <= y < self.height) or (x, y) in self.view.occupied:
+                continue
+            if self.view.fruit_at.get((x, y)) is FruitType.APPLE:
+                continue
+            options.append(direction)
+        return options
+
+    def close(self):
+        self.writer.close()
+
+async def run_bots(host, port, count, seconds, seed=0):
+    """count clients that each wander safely; returns (frames received, snakes seen at the end)"""
+    clients = []
+    for _ in range(count):
+        try:
+            clients.append(await SnakeClient.connect(host, port))
+        except (OSError, asyncio.IncompleteReadError) as error:
+            print(f"⚠️  Bot could not connect: {error!r}", file=sys.stderr)
+    frames = 0
+
+    async def play(client, rng):
+        # Keep heading the same way while it is safe, turning now and then
+        nonlocal frames
+        heading = None
+        while True:
+            await client.receive()
+            frames += 1
+            body = client.body
+            if body and len(body) > 1:
+                heading = Direction((body[0][0] - body[1][0], body[0][1] - body[1][1]))
+            options = client.safe_directions()
+            if options and (heading not in options or rng.random() < 0.1):
+                heading = rng.choice(options)
+                client.steer(heading)
+
+    tasks = [asyncio.create_task(play(client, random.Random(seed + i))) for i, client in enumerate(clients)]
+    await asyncio.sleep(seconds)
+    for task in tasks:
+        task.cancel()
+    snakes = len(clients[0].view.snakes) if clients else 0
+    for client in clients:
+        client.close()
+    return frames, snakes
+
+def main():
+    parser = argparse.ArgumentParser(description="Multiplayer Snake server and load-test bots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the authoritative server")
+    serve.add_argument("--width", type=int, default=80)
+    serve.add_argument("--height", type=int, default=60)
+    serve.add_argument("--tick-rate", type=int, default=10, help="ticks per second")
+    serve.add_argument("--max-buffer", type=int, default=64 * 1024,
+                       help="bytes queued for one client before it skips frames")
+    serve.add_argument("--seed", type=int)
+    bots = commands.add_parser("bots", help="connect bot clients to a server")
+    bots.add_argument("--count", type=int, default=100)
+    bots.add_argument("--seconds", type=float, default=10)
+    for command in (serve, bots):
+        command.add_argument("--host", default="127.0.0.1")
+        command.add_argument("--port", type=int, default=7777)
+    args = parser.parse_args()
+
+    if args.command == "bots":
+        frames, snakes = asyncio.run(run_bots(args.host, args.port, args.count, args.seconds))
+        print(f"🐍 {args.count} bots received {frames} frames; {snakes} snakes on the board")
+        return 0
+
+    server = SnakeServer(MultiSnakeEngine(args.seed, width=args.width, height=args.height),
+                         args.tick_rate, args.max_buffer)
+    print(f"🐍 Serving a {args.width}x{args.height} board on {args.host}:{args.port} "
+          f"at {args.tick_rate} ticks per second")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        stats = server.stats
+        print(f"\n{stats['ticks']} ticks, slowest {stats['slowest_tick'] * 1000:.1f} ms, "
+              f"{stats['frames_skipped']} frames skipped, {stats['resyncs']} resyncs")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
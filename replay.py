@@ -0,0 +1,98 @@
+"""
+Compact binary replays
+A replay is a header (magic, version, grid size, seed) followed by one byte
+per tick: 0 for no direction change, or 1 + the index of the new Direction.
+Replaying re-simulates the game headlessly with SnakeEngine.
+"""
+
+import struct
+from collections import namedtuple
+
+from snake_engine import DEFAULT_RULES, Direction, SnakeEngine
+
+MAGIC = b"SNKR"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHQ")  # magic, version, width, height, seed
+
+DIRECTIONS = list(Direction)
+DIRECTION_BYTES = {direction: i + 1 for i, direction in enumerate(DIRECTIONS)}
+NO_TURN = 0
+
+Replay = namedtuple("Replay", ["seed", "width", "height", "ticks"])
+
+class ReplayRecorder:
+    """Records the game an engine is playing; attach with engine.recorder = recorder"""
+
+    def __init__(self, on_finish=None):
+        # on_finish(recorder) is called when the recorded game ends
+        self.on_finish = on_finish
+        self.seed = None
+        self.ticks = bytearray()
+        self.engine = None
+        self._direction = None
+
+    def attach(self, engine):
+        engine.recorder = self
+        self.start(engine)
+        return self
+
+    def start(self, engine):
+        # Called by SnakeEngine.reset_game
+        self.engine = engine
+        self.seed = engine.seed
+        self.ticks = bytearray()
+        self._direction = engine.snake.direction
+
+    def record(self, direction):
+        # Called by SnakeEngine.update before each move
+        if direction is self._direction:
+            self.ticks.append(NO_TURN)
+        else:
+            self.ticks.append(DIRECTION_BYTES[direction])
+            self._direction = direction
+
+    def truncate(self, ticks, direction):
+        # Forget the last ticks after a rewind; direction is the snake's direction now
+        del self.ticks[len(self.ticks) - ticks:]
+        self._direction = direction
+
+    def finish(self):
+        if self.on_finish is not None:
+            self.on_finish(self)
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, VERSION, self.engine.width, self.engine.height, self.seed) + bytes(self.ticks)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+def load_replay(data):
+    if len(data) < HEADER.size:
+        raise ValueError("Replay is too short")
+    magic, version, width, height, seed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a snake replay")
+    if version != VERSION:
+        raise ValueError(f"Unsupported replay version {version}")
+    return Replay(seed, width, height, bytes(data[HEADER.size:]))
+
+def read_replay(path):
+    with open(path, "rb") as f:
+        return load_replay(f.read())
+
+def play_replay(replay, rules=DEFAULT_RULES):
+    """Re-simulate a Replay (or raw replay bytes) and return the finished engine
+
+    Passing different rules re-scores the recorded inputs under those rules.
+    """
+    if not isinstance(replay, Replay):
+        replay = load_replay(replay)
+    engine = SnakeEngine(replay.seed, rules, replay.width, replay.height)
+    snake = engine.snake
+    update = engine.update
+    for turn in replay.ticks:
+        if turn:
+            snake.direction = DIRECTIONS[turn - 1]  # Already accepted by the recorded game
+        update()
+    return engine
@@ -0,0 +1,170 @@
+"""
+Append-only replay archive
+Many replays packed into one data file, plus a fixed-width index file
+(<path>.idx) holding offset, length, seed and the final result of each game.
+Readers mmap both files, so queries scan only the index and never decode ticks.
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from replay import ReplayRecorder, load_replay, play_replay
+
+INDEX_MAGIC = b"SNKI"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sBxxxI")  # magic, version, record size
+
+# One record per game; 32 bytes, little-endian
+INDEX_RECORD = struct.Struct("<QIQIIBB2x")
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("seed", "<u8"),
+    ("score", "<u4"),
+    ("ticks", "<u4"),
+    ("level", "u1"),
+    ("cause", "u1"),
+    ("_pad", "V2"),
+])
+assert INDEX_DTYPE.itemsize == INDEX_RECORD.size
+
+# Death cause codes stored in the index
+CAUSE_NONE = 0  # Game won
+DEATH_CAUSES = {None: CAUSE_NONE, "wall": 1, "self": 2, "apple": 3}
+CAUSE_NAMES = {code: cause for cause, code in DEATH_CAUSES.items()}
+
+class ArchiveWriter:
+    """Appends finished games to an archive; safe to reopen and keep appending"""
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._data = open(path, "ab")
+        self._index = open(self.index_path, "ab")
+        if self._index.tell() == 0:
+            self._index.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, INDEX_RECORD.size))
+            self._index.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, replay_bytes, score, level, death_cause):
+        replay = load_replay(replay_bytes)
+        offset = self._data.tell()
+        self._data.write(replay_bytes)
+        # Data first, so an index record never points past the end of the data
+        self._data.flush()
+        self._index.write(INDEX_RECORD.pack(
+            offset, len(replay_bytes), replay.seed, score, len(replay.ticks),
+            level, DEATH_CAUSES[death_cause],
+        ))
+        self._index.flush()
+
+    def append_recording(self, recorder):
+        # Usable directly as ReplayRecorder(on_finish=writer.append_recording)
+        engine = recorder.engine
+        self.append(recorder.to_bytes(), engine.score, engine.level, engine.death_cause)
+
+    def record(self, engine):
+        # Archive every game the engine finishes from now on
+        return ReplayRecorder(on_finish=self.append_recording).attach(engine)
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+class ArchiveReader:
+    """Read-only, memory-mapped view of an archive"""
+
+    def __init__(self, path):
+        self.path = path
+        self._files = []
+        self._maps = []
+        self.index = self._data = None
+        try:
+            self._open(path)
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self, path):
+        index = self._map(path + ".idx")
+        if index is None or len(index) < INDEX_HEADER.size:
+            raise ValueError(f"{path} has no replay index")
+        magic, version, record_size = INDEX_HEADER.unpack_from(index)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or record_size != INDEX_RECORD.size:
+            raise ValueError(f"{path}.idx is not a supported replay index")
+
+        # Zero-copy structured view; a torn trailing record is ignored
+        count = (len(index) - INDEX_HEADER.size) // INDEX_RECORD.size
+        self.index = np.frombuffer(index, INDEX_DTYPE, count, INDEX_HEADER.size)
+        self._data = self._map(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def _map(self, path):
+        f = open(path, "rb")
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def select(self, level=None, death_cause=..., min_score=None, max_score=None):
+        """Indices of games matching every given condition, from the index only"""
+        index = self.index
+        mask = np.ones(len(index), bool)
+        if level is not None:
+            mask &= index["level"] == level
+        if death_cause is not ...:
+            mask &= index["cause"] == DEATH_CAUSES[death_cause]
+        if min_score is not None:
+            mask &= index["score"] >= min_score
+        if max_score is not None:
+            mask &= index["score"] <= max_score
+        return np.flatnonzero(mask)
+
+    def death_cause(self, i):
+        return CAUSE_NAMES[int(self.index["cause"][i])]
+
+    def replay_bytes(self, i):
+        # A memoryview into the mapped data, no copy. It outlives close(), keeping
+        # the mapping alive until it is released; bytes() of it is a plain copy
+        record = self.index[i]
+        offset, length = int(record["offset"]), int(record["length"])
+        return memoryview(self._data)[offset:offset + length]
+
+    def replay(self, i):
+        return load_replay(self.replay_bytes(i))
+
+    def play(self, i):
+        # Decode and re-simulate one game on the headless engine
+        return play_replay(self.replay(i))
+
+    def close(self):
+        # Drop numpy's view of the index before unmapping it
+        self.index = self._data = None
+        for mapped in self._maps:
+            try:
+                mapped.close()
+            except BufferError:
+                # A caller still holds a view; the mapping goes with the last one
+                pass
+        for f in self._files:
+            f.close()
+        self._maps.clear()
+        self._files.clear()
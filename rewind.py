@@ -0,0 +1,145 @@
+"""
+Rewind buffer
+Keeps the last N ticks of a game as undo records. A record holds the few
+values a tick changes and the free-cell index operations it made. Only on
+ticks that eat does it also hold the fruit layout and RNG state. Rewinding
+undoes ticks newest first, a few microseconds each, and play continues
+exactly as it did the first time: same spawns, same replay.
+"""
+
+from collections import deque, namedtuple
+
+from replay import DIRECTIONS, Replay, load_replay
+from snake_engine import DEFAULT_RULES, SnakeEngine
+
+TickRecord = namedtuple(
+    "TickRecord",
+    [
+        "direction",     # Snake direction before this tick's turn
+        "grow_pending",
+        "tail",          # Cell the move vacated, None while growing
+        "progress",      # (score, level, speed, fruits_eaten_this_level)
+        "journal",       # Free-cell index operations, oldest first
+        "fruits",        # fruit_at before the tick, only if it eats
+        "rng_state",     # Only if it eats
+    ],
+)
+
+class RewindBuffer:
+    """The last capacity ticks of an engine's current game; attach() or set engine.rewind"""
+
+    def __init__(self, capacity=600):
+        self.records = deque(maxlen=capacity)
+        self.engine = None
+        self._direction = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def attach(self, engine):
+        engine.rewind = self
+        self.start(engine)
+        return self
+
+    def detach(self):
+        self.engine.rewind = None
+        self.engine.free_cells.journal = None
+        self.records.clear()
+
+    def start(self, engine):
+        # Called by SnakeEngine.reset_game; a new game has no past
+        self.engine = engine
+        self.records.clear()
+        self._direction = engine.snake.direction
+
+    def record(self, engine):
+        # Called by SnakeEngine.update before each move
+        snake = engine.snake
+        head_x, head_y = snake.body[0]
+        dx, dy = snake.direction.value
+        fruits = rng_state = None
+        if (head_x + dx, head_y + dy) in engine.fruit_at:
+            # Only eating changes the fruit or draws from the RNG
+            fruits = dict(engine.fruit_at)
+            rng_state = engine.rng.getstate()
+        journal = []
+        engine.free_cells.journal = journal
+        self.records.append(TickRecord(
+            self._direction,
+            snake.grow_pending,
+            None if snake.grow_pending else snake.body[-1],
+            (engine.score, engine.level, engine.speed, engine.fruits_eaten_this_level),
+            journal,
+            fruits,
+            rng_state,
+        ))
+        self._direction = snake.direction
+
+    def rewind(self, ticks):
+        """Undo up to ticks ticks, newest first; returns how many were undone"""
+        engine = self.engine
+        snake, free_cells, fruit_at = engine.snake, engine.free_cells, engine.fruit_at
+        free_cells.journal = None
+        steps = min(ticks, len(self.records))
+        for _ in range(steps):
+            record = self.records.pop()
+            journal = record.journal
+            for index in range(len(journal) - 1, -1, -1):
+                free_cells.undo(journal[index])
+            snake.unmove(record.tail)
+            snake.grow_pending = record.grow_pending
+            if record.fruits is not None:
+                fruit_at.clear()
+                fruit_at.update(record.fruits)
+                engine.rng.setstate(record.rng_state)
+            engine.score, engine.level, engine.speed, engine.fruits_eaten_this_level = record.progress
+
+        if steps:
+            snake.direction = self._direction = record.direction
+            engine.game_over = engine.game_won = False
+            engine.death_cause = None
+            if engine.recorder is not None:
+                engine.recorder.truncate(steps, snake.direction)
+        return steps
+
+class ReplaySeeker:
+    """Random access to the ticks of a replay
+
+    Seeking forward re-simulates; seeking back within the buffer rewinds,
+    and only further back than that restarts from the seed.
+    """
+
+    def __init__(self, replay, rules=DEFAULT_RULES, capacity=600):
+        if not isinstance(replay, Replay):
+            replay = load_replay(replay)
+        self.replay = replay
+        self.rules = rules
+        self.buffer = RewindBuffer(capacity)
+        self.restarts = 0
+        self._restart()
+
+    def _restart(self):
+        replay = self.replay
+        self.engine = SnakeEngine(replay.seed, self.rules, replay.width, replay.height)
+        self.buffer.attach(self.engine)
+        self.tick = 0
+        self.restarts += 1
+
+    def seek(self, tick):
+        """Move to the state after tick ticks and return the engine"""
+        tick = max(0, min(tick, len(self.replay.ticks)))
+        if tick < self.tick:
+            if self.tick - tick <= len(self.buffer):
+                self.tick -= self.buffer.rewind(self.tick - tick)
+                return self.engine
+            self._restart()
+
+        engine, ticks = self.engine, self.replay.ticks
+        snake, update = engine.snake, engine.update
+        while self.tick < tick:
+            turn = ticks[self.tick]
+            if turn:
+                snake.direction = DIRECTIONS[turn - 1]  # Already accepted by the recorded game
+            update()
+            self.tick += 1
+        return engine
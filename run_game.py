@@ -7,14 +7,21 @@ Simple launcher script with dependency checking and macOS support
 import sys
 import subprocess
 import platform
+import importlib
+import importlib.util
 
 def check_pygame():
-    """Check if pygame is installed"""
+    """Check if pygame is installed, without importing it"""
+    importlib.invalidate_caches()  # Notice a pygame installed a moment ago
+    return importlib.util.find_spec("pygame") is not None
+
+def pygame_version():
+    """Installed pygame version, read from package metadata"""
+    import importlib.metadata  # Slow to import, so only after an install
     try:
-        import pygame
-        return True, pygame.version.ver
-    except ImportError:
-        return False, None
+        return importlib.metadata.version("pygame")
+    except importlib.metadata.PackageNotFoundError:
+        return "(unknown version)"
 
 def install_pygame_macos():
     """Install pygame on macOS using homebrew if available"""
@@ -50,7 +57,7 @@ def main():
     print("=" * 30)
     
     # Check pygame
-    pygame_available, version = check_pygame()
+    pygame_available = check_pygame()
     
     if not pygame_available:
         print("❌ pygame not found!")
@@ -68,9 +75,8 @@ def main():
                 success = install_pygame_generic()
             
             if success:
-                pygame_available, version = check_pygame()
-                if pygame_available:
-                    print(f"✅ pygame {version} installed successfully!")
+                if check_pygame():
+                    print(f"✅ pygame {pygame_version()} installed successfully!")
                 else:
                     print("❌ Installation completed but pygame still not available")
                     print("You may need to restart your terminal or check your Python path")
@@ -92,7 +98,7 @@ def main():
             print("❌ pygame is required to run the game.")
             return
     else:
-        print(f"✅ pygame {version} found!")
+        print("✅ pygame found!")
     
     print("\n🎮 Starting Retro Snake Game...")
     print("🍎 Remember: Eat good fruits, AVOID the apples!")
@@ -101,8 +107,8 @@ def main():
     
     # Import and run the game
     try:
-        from snake_game import SnakeGame
-        game = SnakeGame()
+        from snake_game import DEFAULT_SCORES_PATH, SnakeGame
+        game = SnakeGame(scores_path=DEFAULT_SCORES_PATH)
         game.run()
     except ImportError as e:
         print(f"❌ Error importing game: {e}")
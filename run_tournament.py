@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Retro Snake Tournament Runner
+Plays many seeded headless games across all cores for bots and balance sweeps
+
+Example:
+    python run_tournament.py --policy greedy --games 2000 \\
+        --grid fruits_needed_per_level=3,5,7 --grid max_apples=6,10
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bots import load_policy
+from snake_engine import DEFAULT_RULES, SnakeEngine, parse_seed
+
+# Per-game result fields, packed into one array per chunk
+RESULT_FIELDS = ("score", "level", "won", "ticks")
+
+def play_chunk(policy_spec, rules, first_seed, count, max_ticks):
+    """Play count games with consecutive seeds; returns results packed as bytes"""
+    policy = load_policy(policy_spec)
+    results = array("q")
+    engine = SnakeEngine(first_seed, rules)
+    for seed in range(first_seed, first_seed + count):
+        engine.reset_game(seed)
+        rng = random.Random(seed)
+        snake = engine.snake
+        ticks = 0
+        while not (engine.game_over or engine.game_won) and ticks < max_ticks:
+            direction = policy(engine, rng)
+            if direction is not None:
+                snake.change_direction(direction)
+            engine.update()
+            ticks += 1
+        results.extend((engine.score, engine.level, int(engine.game_won), ticks))
+    return results.tobytes()
+
+def parse_grid(options):
+    """Turn ["name=v1,v2", ...] into a list of Rules, one per combination"""
+    axes = []
+    for option in options:
+        name, _, values = option.partition("=")
+        if name not in DEFAULT_RULES._fields:
+            raise SystemExit(f"Unknown rule {name!r}; choose from {', '.join(DEFAULT_RULES._fields)}")
+        axes.append([(name, int(value)) for value in values.split(",")])
+    return [DEFAULT_RULES._replace(**dict(combo)) for combo in itertools.product(*axes)]
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+def summarize(rules, results):
+    scores = sorted(results["score"])
+    games = len(scores)
+    if not games:
+        # --games 0 leaves every cell empty; report zeros rather than divide by them
+        return {"rules": rules._asdict(), "games": 0, "win_rate": 0.0, "mean_score": 0.0,
+                "score_p10": 0, "score_p50": 0, "score_p90": 0, "max_score": 0,
+                "mean_level": 0.0, "mean_ticks": 0.0}
+    return {
+        "rules": rules._asdict(),
+        "games": games,
+        "win_rate": sum(results["won"]) / games,
+        "mean_score": sum(scores) / games,
+        "score_p10": percentile(scores, 0.10),
+        "score_p50": percentile(scores, 0.50),
+        "score_p90": percentile(scores, 0.90),
+        "max_score": scores[-1],
+        "mean_level": sum(results["level"]) / games,
+        "mean_ticks": sum(results["ticks"]) / games,
+    }
+
+def run_tournament(policy, rules_grid, games, seed=0, workers=None, chunk_size=100, max_ticks=20000):
+    """Fan games out over a process pool and aggregate results as chunks finish"""
+    results = [{field: [] for field in RESULT_FIELDS} for _ in rules_grid]
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for combo, rules in enumerate(rules_grid):
+            for first in range(seed, seed + games, chunk_size):
+                count = min(chunk_size, seed + games - first)
+                future = executor.submit(play_chunk, policy, rules, first, count, max_ticks)
+                futures[future] = combo
+
+        for future in as_completed(futures):
+            packed = array("q")
+            packed.frombytes(future.result())
+            combo = results[futures[future]]
+            for i, field in enumerate(RESULT_FIELDS):
+                combo[field].extend(packed[i::len(RESULT_FIELDS)])
+    elapsed = time.perf_counter() - started
+
+    summaries = [summarize(rules, combo) for rules, combo in zip(rules_grid, results)]
+    total_games = games * len(rules_grid)
+    return summaries, {"games": total_games, "seconds": elapsed, "games_per_second": total_games / elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run seeded headless Snake games across all cores")
+    parser.add_argument("--policy", default="greedy",
+                        help="built-in bot (random, greedy, autopilot, hamiltonian) or module:attribute")
+    parser.add_argument("--games", type=int, default=1000, help="games per rule combination")
+    parser.add_argument("--grid", action="append", default=[], metavar="RULE=V1,V2",
+                        help="rule values to sweep; repeat for a cartesian product")
+    parser.add_argument("--seed", type=parse_seed, default=0, help="first game seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=100, help="games per work unit")
+    parser.add_argument("--max-ticks", type=int, default=20000, help="stop a game after this many ticks")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    rules_grid = parse_grid(args.grid)
+    print(f"🐍 {args.games} games x {len(rules_grid)} rule sets, policy {args.policy!r}, {args.workers} workers")
+
+    summaries, throughput = run_tournament(
+        args.policy, rules_grid, args.games, args.seed, args.workers, args.chunk_size, args.max_ticks,
+    )
+
+    swept = [option.partition("=")[0] for option in args.grid]
+    for summary in summaries:
+        label = ", ".join(f"{name}={summary['rules'][name]}" for name in swept) or "default rules"
+        print(f"{label}: win {summary['win_rate']:.1%}  "
+              f"score mean {summary['mean_score']:.1f} "
+              f"p10/p50/p90 {summary['score_p10']}/{summary['score_p50']}/{summary['score_p90']} "
+              f"max {summary['max_score']}  level {summary['mean_level']:.2f}")
+    print(f"⏱️  {throughput['games']} games in {throughput['seconds']:.2f}s "
+          f"({throughput['games_per_second']:.0f} games/s)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"policy": args.policy, "summaries": summaries, "throughput": throughput}, f, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(main())
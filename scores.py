@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+High scores and per-game telemetry
+Finished games are queued to a background thread that owns the SQLite
+database (WAL mode) and inserts whatever has queued up in one transaction.
+After each batch it re-reads the leaderboard into an in-memory tuple, so
+the game reads high scores without touching the disk.
+
+Example:
+    python scores.py                  # leaderboard and death causes
+    python scores.py --db other.db
+"""
+
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from collections import namedtuple
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".retro-snake", "scores.db")
+
+# mode is "player", "practice" (rewinds allowed) or "autopilot"; only players rank
+GameResult = namedtuple(
+    "GameResult",
+    ["finished_at", "seed", "mode", "score", "level", "won", "death_cause", "duration", "ticks", "width", "height"],
+)
+LeaderboardEntry = namedtuple("LeaderboardEntry", ["score", "level", "won", "finished_at"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    seed INTEGER,  -- Signed: seeds from 2**63 up are stored as seed - 2**64
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    death_cause TEXT,
+    duration REAL NOT NULL,
+    ticks INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (mode, score DESC);
+"""
+INSERT = f"INSERT INTO games ({', '.join(GameResult._fields)}) VALUES ({', '.join('?' * len(GameResult._fields))})"
+LEADERBOARD = """
+SELECT score, level, won, finished_at FROM games
+WHERE mode = 'player' ORDER BY score DESC, finished_at LIMIT ?
+"""
+
+def stored(result):
+    # SQLite integers are signed 64-bit, game seeds unsigned
+    if result.seed is not None and result.seed >= 1 << 63:
+        return result._replace(seed=result.seed - (1 << 64))
+    return result
+
+def connect(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; no fsync per commit
+    connection.executescript(SCHEMA)
+    return connection
+
+class ScoreStore:
+    """record() and leaderboard are for the game thread; neither waits on the disk"""
+
+    def __init__(self, path=DEFAULT_PATH, top=10, on_refresh=None):
+        self.path = path
+        self.top = top
+        self.on_refresh = on_refresh  # Called on the writer thread after the cache changes
+        self.leaderboard = ()  # LeaderboardEntry tuple, replaced whole by the writer
+        self.version = 0       # Bumped with each new leaderboard
+        self.written = 0
+        self.failed = 0  # Games lost to a batch that could not be written
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_results, name="score-writer", daemon=True)
+        self._writer.start()
+
+    @property
+    def best(self):
+        return self.leaderboard[0].score if self.leaderboard else 0
+
+    def record(self, result):
+        self._queue.put(result)
+
+    def close(self):
+        """Write everything still queued, then stop the writer"""
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_results(self):
+        connection = connect(self.path)
+        self._refresh(connection)
+        running = True
+        while running:
+            # Everything queued so far goes into one transaction
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            running = items[-1] is not None
+            results = [stored(item) for item in items if item is not None]
+            if results:
+                try:
+                    with connection:
+                        connection.executemany(INSERT, results)
+                    self.written += len(results)
+                except (sqlite3.Error, OverflowError) as error:
+                    # Drop the batch but keep the writer alive for later games
+                    self.failed += len(results)
+                    print(f"⚠️  Could not save {len(results)} game(s): {error}", file=sys.stderr)
+                self.batches += 1
+                self._refresh(connection)
+        connection.close()
+
+    def _refresh(self, connection):
+        rows = connection.execute(LEADERBOARD, (self.top,)).fetchall()
+        self.leaderboard = tuple(LeaderboardEntry(score, level, bool(won), at) for score, level, won, at in rows)
+        self.version += 1
+        if self.on_refresh is not None:
+            self.on_refresh()
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the Snake high scores and game telemetry")
+    parser.add_argument("--db", default=DEFAULT_PATH, help=f"score database (default {DEFAULT_PATH})")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"No scores yet ({args.db})")
+        return 0
+
+    connection = connect(args.db)
+    print("🏆 High scores")
+    for rank, (score, level, won, _) in enumerate(connection.execute(LEADERBOARD, (args.top,)), 1):
+        print(f"  {rank:>2}. {score:>6}  level {level}{'  (won)' if won else ''}")
+
+    print("\n📊 Games by mode")
+    for mode, games, ticks, seconds in connection.execute(
+            "SELECT mode, COUNT(*), SUM(ticks), SUM(duration) FROM games GROUP BY mode ORDER BY mode"):
+        print(f"  {mode:<10}{games:>6} games {ticks:>9} ticks {seconds / 60:>8.1f} min")
+
+    print("\n💀 Death causes")
+    for cause, games in connection.execute(
+            "SELECT COALESCE(death_cause, 'won'), COUNT(*) FROM games GROUP BY 1 ORDER BY 2 DESC"):
+        print(f"  {cause:<10}{games:>6}")
+    connection.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
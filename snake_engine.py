@@ -0,0 +1,457 @@
+"""
+Headless Snake rules engine
+Pure game logic with no pygame dependency, for simulation, bots and tests
+"""
+
+import random
+from collections import deque, namedtuple
+from enum import Enum
+
+# Board size in cells
+GRID_WIDTH = 40
+GRID_HEIGHT = 30
+
+MAX_SEED = (1 << 64) - 1  # Replays store the seed as an unsigned 64-bit field
+
+# Colors (minimal palette)
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+ORANGE = (255, 165, 0)
+PINK = (255, 192, 203)
+PURPLE = (128, 0, 128)
+GRAY = (128, 128, 128)
+
+class FruitType(Enum):
+    APPLE = "apple"
+    ORANGE = "orange"
+    GRAPEFRUIT = "grapefruit"
+    BERRY = "berry"
+
+class Direction(Enum):
+    UP = (0, -1)
+    DOWN = (0, 1)
+    LEFT = (-1, 0)
+    RIGHT = (1, 0)
+
+# Per-type tables, shared by every instance
+FRUIT_COLORS = {
+    FruitType.APPLE: RED,
+    FruitType.ORANGE: ORANGE,
+    FruitType.GRAPEFRUIT: PINK,
+    FruitType.BERRY: PURPLE
+}
+FRUIT_SYMBOLS = {
+    FruitType.APPLE: "🍎",
+    FruitType.ORANGE: "🍊",
+    FruitType.GRAPEFRUIT: "🍇",
+    FruitType.BERRY: "🫐"
+}
+GOOD_FRUITS = (FruitType.ORANGE, FruitType.GRAPEFRUIT, FruitType.BERRY)
+OPPOSITE_DIRECTIONS = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT
+}
+
+class Fruit:
+    __slots__ = ("type", "x", "y")
+    
+    def __init__(self, fruit_type, x, y):
+        self.type = fruit_type
+        self.x = x
+        self.y = y
+    
+    @property
+    def color(self):
+        return FRUIT_COLORS[self.type]
+    
+    @property
+    def symbol(self):
+        return FRUIT_SYMBOLS[self.type]
+
+class Snake:
+    __slots__ = ("width", "height", "direction", "grow_pending", "_body", "_occupied")
+    
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.width = width
+        self.height = height
+        self.body = [(width // 2, height // 2)]
+        self.direction = Direction.RIGHT
+        self.grow_pending = 0
+    
+    @property
+    def body(self):
+        # Head-first deque; index 0 is the head
+        return self._body
+    
+    @body.setter
+    def body(self, segments):
+        self._body = deque(segments)
+        # Occupancy counts per cell so self-collision is a dict lookup
+        self._occupied = {}
+        for segment in self._body:
+            self._occupied[segment] = self._occupied.get(segment, 0) + 1
+    
+    def occupies(self, cell):
+        return cell in self._occupied
+    
+    def move(self):
+        head_x, head_y = self._body[0]
+        dx, dy = self.direction.value
+        new_head = (head_x + dx, head_y + dy)
+        
+        self._body.appendleft(new_head)
+        self._occupied[new_head] = self._occupied.get(new_head, 0) + 1
+        
+        if self.grow_pending > 0:
+            self.grow_pending -= 1
+            return None
+        
+        tail = self._body.pop()
+        count = self._occupied[tail] - 1
+        if count:
+            self._occupied[tail] = count
+        else:
+            del self._occupied[tail]
+        return tail
+    
+    def unmove(self, tail):
+        # Undo move(): drop the head and put back the tail it returned
+        head = self._body.popleft()
+        count = self._occupied[head] - 1
+        if count:
+            self._occupied[head] = count
+        else:
+            del self._occupied[head]
+        if tail is not None:
+            self._body.append(tail)
+            self._occupied[tail] = self._occupied.get(tail, 0) + 1
+    
+    def grow(self):
+        self.grow_pending += 1
+    
+    def check_collision(self):
+        head_x, head_y = self.body[0]
+        
+        # Wall collision
+        if head_x < 0 or head_x >= self.width or head_y < 0 or head_y >= self.height:
+            return True
+        
+        # Self collision: the head shares its cell with another segment
+        if self._occupied[(head_x, head_y)] > 1:
+            return True
+        
+        return False
+    
+    def change_direction(self, new_direction):
+        # Prevent reversing into itself
+        if new_direction is not OPPOSITE_DIRECTIONS[self.direction]:
+            self.direction = new_direction
+
+class FreeCellIndex:
+    """Set of empty grid cells with O(1) add, remove and uniform random pick
+    
+    Starts with every cell empty, in row-major order; removal swaps the last
+    cell into the hole. Only slots that have changed are stored, so a new
+    index costs the same on a 500x500 board as on the default one.
+    
+    With a journal list attached, every add and discard is logged so that
+    undo() can restore the exact slot layout, and with it future spawns.
+    """
+    
+    __slots__ = ("width", "height", "count", "_cells", "_slots", "journal")
+    
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.count = width * height
+        self._cells = {}  # slot -> flat cell, where it differs from the slot
+        self._slots = {}  # flat cell -> slot, or None once taken
+        self.journal = None  # (flat cell, slot removed from) per discard, (flat cell, None) per add
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        for slot in range(self.count):
+            cell = self._cells.get(slot, slot)
+            yield (cell % self.width, cell // self.width)
+    
+    def __contains__(self, cell):
+        flat = self._flat(cell)
+        return flat is not None and self._slots.get(flat, flat) is not None
+    
+    def _flat(self, cell):
+        x, y = cell
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return None
+    
+    def add(self, cell):
+        flat = self._flat(cell)
+        if flat is None or self._slots.get(flat, flat) is not None:
+            return
+        if self.journal is not None:
+            self.journal.append((flat, None))
+        self._cells[self.count] = flat
+        self._slots[flat] = self.count
+        self.count += 1
+    
+    def discard(self, cell):
+        flat = self._flat(cell)
+        if flat is None:
+            return
+        slot = self._slots.get(flat, flat)
+        if slot is None:
+            return
+        if self.journal is not None:
+            self.journal.append((flat, slot))
+        self._slots[flat] = None
+        self.count -= 1
+        last = self._cells.pop(self.count, self.count)
+        if slot < self.count:
+            self._cells[slot] = last
+            self._slots[last] = slot
+    
+    def undo(self, entry):
+        # Reverse one journal entry; entries must be undone newest first
+        flat, slot = entry
+        if slot is None:
+            self.count -= 1
+            self._cells.pop(self.count, None)
+            self._slots[flat] = None
+            return
+        if slot < self.count:
+            # Move the cell that filled the hole back to the end
+            self._place(self.count, self._cells.get(slot, slot))
+        self._place(slot, flat)
+        self.count += 1
+    
+    def _place(self, slot, flat):
+        # A cell in its own slot needs no entry in either map
+        if slot == flat:
+            self._cells.pop(slot, None)
+            self._slots.pop(flat, None)
+        else:
+            self._cells[slot] = flat
+            self._slots[flat] = slot
+    
+    def pop_random(self, rng):
+        # None means the board is full
+        if not self.count:
+            return None
+        slot = rng.randrange(self.count)
+        flat = self._cells.get(slot, slot)
+        cell = (flat % self.width, flat // self.width)
+        self.discard(cell)
+        return cell
+    
+    def take(self, count, rng):
+        # Distinct cells, fewer than count if the board fills up
+        taken = []
+        for _ in range(min(count, self.count)):
+            taken.append(self.pop_random(rng))
+        return taken
+
+# Balance settings; pass a modified copy to SnakeEngine to tune the game
+Rules = namedtuple(
+    "Rules",
+    [
+        "start_speed",              # Ticks per second on level 0
+        "speed_step",               # Speed gained per level
+        "max_speed",
+        "fruits_needed_per_level",
+        "base_apples",              # Apples on level 0, one more per level
+        "max_apples",
+        "base_good_fruits",         # Good fruits on level 0, one more per level
+        "last_level",               # Completing this level wins the game
+    ],
+)
+DEFAULT_RULES = Rules(
+    start_speed=8,
+    speed_step=1,
+    max_speed=15,
+    fruits_needed_per_level=5,
+    base_apples=2,
+    max_apples=6,
+    base_good_fruits=3,
+    last_level=5,
+)
+
+EngineState = namedtuple(
+    "EngineState",
+    ["head", "length", "score", "level", "speed", "fruits_eaten_this_level", "game_over", "game_won"],
+)
+
+def parse_seed(text):
+    """argparse type for a seed that fits in a replay"""
+    seed = int(text)
+    if not 0 <= seed <= MAX_SEED:
+        raise ValueError(f"seed must be between 0 and {MAX_SEED}")
+    return seed
+
+class SnakeEngine:
+    recorder = None  # Optional replay recorder, fed one direction per tick
+    rewind = None    # Optional rewind buffer, given the state before each tick
+    
+    def __init__(self, seed=None, rules=DEFAULT_RULES, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.rules = rules
+        # Board size in cells; nothing per tick depends on the board's area
+        self.width = width
+        self.height = height
+        # The first game uses seed; later games draw their seeds from this stream
+        self.seeds = random.Random(seed)
+        self.reset_game(seed)
+    
+    def reset_game(self, seed=None):
+        # Per-game RNG so a game's seed reproduces every spawn
+        if seed is None:
+            seed = self.seeds.getrandbits(63)
+        elif not 0 <= seed <= MAX_SEED:
+            raise ValueError(f"seed must be between 0 and {MAX_SEED}, got {seed}")
+        self.seed = seed
+        self.rng = random.Random(seed)
+        
+        self.snake = Snake(self.width, self.height)
+        self.fruit_at = {}  # (x, y) -> Fruit
+        self.free_cells = FreeCellIndex(self.width, self.height)
+        for segment in self.snake.body:
+            self.free_cells.discard(segment)
+        self.level = 0
+        self.score = 0
+        self.game_over = False
+        self.game_won = False
+        self.death_cause = None  # "wall", "self" or "apple" once the game is lost
+        self.speed = self.rules.start_speed
+        self.fruits_eaten_this_level = 0
+        self.fruits_needed_per_level = self.rules.fruits_needed_per_level
+        
+        self.spawn_fruits()
+        if self.recorder is not None:
+            self.recorder.start(self)
+        if self.rewind is not None:
+            self.rewind.start(self)
+    
+    @property
+    def fruits(self):
+        return self.fruit_at.values()
+    
+    def spawn_fruits(self):
+        # Free old fruit in row-major order so the free-cell layout is reproducible
+        for cell in sorted(self.fruit_at, key=lambda cell: (cell[1], cell[0])):
+            self.free_cells.add(cell)
+        self.fruit_at.clear()
+        
+        # Level-based fruit spawning
+        rules = self.rules
+        apple_count = min(rules.base_apples + self.level, rules.max_apples)  # More apples as level increases
+        good_fruit_count = rules.base_good_fruits + self.level  # More good fruits too
+        
+        # Draw the whole batch of cells at once, without replacement
+        cells = self.free_cells.take(apple_count + good_fruit_count, self.rng)
+        
+        # Apples (dangerous) first, then good fruits
+        for i, (x, y) in enumerate(cells):
+            if i < apple_count:
+                fruit_type = FruitType.APPLE
+            else:
+                fruit_type = self.rng.choice(GOOD_FRUITS)
+            self.fruit_at[(x, y)] = Fruit(fruit_type, x, y)
+    
+    def spawn_fruit(self, fruit_type):
+        # Only empty cells are in the index, so snake and fruits are never hit
+        cell = self.free_cells.pop_random(self.rng)
+        if cell is None:
+            return None  # Board is full
+        
+        fruit = Fruit(fruit_type, *cell)
+        self.fruit_at[cell] = fruit
+        return fruit
+    
+    def update(self):
+        if self.game_over or self.game_won:
+            return
+        
+        if self.recorder is not None:
+            self.recorder.record(self.snake.direction)
+        if self.rewind is not None:
+            self.rewind.record(self)
+        
+        vacated = self.snake.move()
+        
+        # Check wall/self collision
+        if self.snake.check_collision():
+            head_x, head_y = self.snake.body[0]
+            on_board = 0 <= head_x < self.width and 0 <= head_y < self.height
+            self.death_cause = "self" if on_board else "wall"
+            self.game_over = True
+            self.game_finished()
+            return
+        
+        # Keep the free-cell index in step with the snake
+        head_x, head_y = self.snake.body[0]
+        self.free_cells.discard((head_x, head_y))
+        if vacated is not None and not self.snake.occupies(vacated):
+            self.free_cells.add(vacated)
+        
+        # Check fruit collision
+        fruit = self.fruit_at.get((head_x, head_y))
+        if fruit is None:
+            return
+        
+        if fruit.type == FruitType.APPLE:
+            # Game over - ate an apple!
+            self.death_cause = "apple"
+            self.game_over = True
+            self.game_finished()
+            return
+        
+        # Good fruit eaten
+        del self.fruit_at[(head_x, head_y)]
+        self.snake.grow()
+        self.score += 10
+        self.fruits_eaten_this_level += 1
+        
+        # Spawn new good fruit
+        self.spawn_fruit(self.rng.choice(GOOD_FRUITS))
+        
+        # Check level completion
+        if self.fruits_eaten_this_level >= self.fruits_needed_per_level:
+            self.level += 1
+            self.fruits_eaten_this_level = 0
+            
+            if self.level > self.rules.last_level:
+                self.game_won = True
+                self.game_finished()
+                return
+            
+            # Increase speed slightly
+            self.speed = min(self.speed + self.rules.speed_step, self.rules.max_speed)
+            self.spawn_fruits()
+    
+    def game_finished(self):
+        # Called once when a game ends, won or lost
+        if self.recorder is not None:
+            self.recorder.finish()
+    
+    def step(self, action=None):
+        # Apply an optional Direction, advance one tick, report the result
+        if action is not None and action is not self.snake.direction:
+            self.snake.change_direction(action)
+        self.update()
+        return self.state()
+    
+    def state(self):
+        return EngineState(
+            self.snake.body[0],
+            len(self.snake.body),
+            self.score,
+            self.level,
+            self.speed,
+            self.fruits_eaten_this_level,
+            self.game_over,
+            self.game_won,
+        )
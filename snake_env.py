@@ -0,0 +1,156 @@
+"""
+Gym-style Snake environment
+reset() and step(action) on top of SnakeEngine, for training agents against
+the real rules. Observations are a preallocated NumPy grid patched in place
+each step, or the rendered screen pixels without a copy.
+
+The same observation array is returned every step and changes in place;
+copy it to keep one.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from snake_engine import GRID_WIDTH, GRID_HEIGHT, DEFAULT_RULES, Direction, FruitType, SnakeEngine
+
+ACTIONS = list(Direction)  # Action i turns toward ACTIONS[i]; None keeps going straight
+
+# Grid observation channels, shape (4, height, width), 1 where present
+BODY, HEAD, APPLE, GOOD_FRUIT = range(4)
+CHANNELS = 4
+
+# Reward per point scored (10 per good fruit), per level gained, and on the last tick
+Rewards = namedtuple("Rewards", ["score", "level_up", "death", "win"])
+DEFAULT_REWARDS = Rewards(score=1.0, level_up=50.0, death=-100.0, win=100.0)
+
+class SnakeEnv:
+    """reset() -> (observation, info); step(action) -> (observation, reward, terminated, truncated, info)
+
+    With pixels=True observations are the (height, width, 3) RGB screen as
+    drawn by SnakeGame, scrolled with the camera on large boards.
+    """
+
+    def __init__(self, seed=None, rules=DEFAULT_RULES, width=GRID_WIDTH, height=GRID_HEIGHT,
+                 rewards=DEFAULT_REWARDS, max_steps=None, pixels=False, cell_size=None):
+        self.width = width
+        self.height = height
+        self.rewards = rewards
+        self.max_steps = max_steps
+        self.action_count = len(ACTIONS)
+        self.grid = np.zeros((CHANNELS, height, width), np.uint8)
+        self._fruit_cells = {}  # Cells set in the fruit channels -> channel
+        self.pixels = None
+        if pixels:
+            self.engine = self._pixel_game(seed, rules, cell_size)
+        else:
+            self.engine = SnakeEngine(seed, rules, width, height)
+        self.observation_shape = self.observation().shape
+        self.steps = 0
+        self._fresh = True  # The engine's first game has not been played yet
+        self._rebuild_grid()
+
+    def _pixel_game(self, seed, rules, cell_size):
+        # Imported here so grid-only training never loads pygame
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+        from snake_game import SnakeGame
+
+        options = {} if cell_size is None else {"cell_size": cell_size}
+        game = SnakeGame(seed, incremental=True, grid_width=self.width, grid_height=self.height,
+                         rules=rules, **options)
+        # The game draws into a surface over our own array. A surfarray.pixels3d
+        # view would lock the screen for as long as the caller held the previous
+        # observation, and drawing onto a locked surface fails.
+        self.frame = np.zeros((game.screen_height, game.screen_width, 4), np.uint8)
+        game.screen = pygame.image.frombuffer(self.frame, (game.screen_width, game.screen_height), "RGBX")
+        self.pixels = self.frame[:, :, :3]
+        return game
+
+    def observation(self):
+        return self.grid if self.pixels is None else self.pixels
+
+    def info(self):
+        engine = self.engine
+        return {
+            "seed": engine.seed,
+            "score": engine.score,
+            "level": engine.level,
+            "length": len(engine.snake.body),
+            "death_cause": engine.death_cause,
+            "steps": self.steps,
+        }
+
+    def reset(self, seed=None):
+        # Without a seed the first reset plays the constructor's seed, later ones draw new seeds
+        if seed is not None or not self._fresh:
+            self.engine.reset_game(seed)
+        self._fresh = False
+        self.steps = 0
+        self._rebuild_grid()
+        if self.pixels is not None:
+            self.engine.draw()
+        return self.observation(), self.info()
+
+    def step(self, action=None):
+        engine = self.engine
+        self._fresh = False
+        if engine.game_over or engine.game_won:
+            return self.observation(), 0.0, True, False, self.info()
+
+        snake = engine.snake
+        if action is not None:
+            snake.change_direction(ACTIONS[action])
+        head, tail = snake.body[0], snake.body[-1]
+        score, level = engine.score, engine.level
+        engine.update()
+        self.steps += 1
+        self._patch_grid(head, tail, engine.score != score)
+
+        rewards = self.rewards
+        reward = (engine.score - score) * rewards.score + (engine.level - level) * rewards.level_up
+        if engine.game_over:
+            reward += rewards.death
+        elif engine.game_won:
+            reward += rewards.win
+        terminated = engine.game_over or engine.game_won
+        truncated = not terminated and self.max_steps is not None and self.steps >= self.max_steps
+
+        if self.pixels is not None:
+            engine.draw()
+        return self.observation(), reward, terminated, truncated, self.info()
+
+    def _patch_grid(self, old_head, old_tail, ate):
+        # Only the cells a tick can change: old head, vacated tail, new head, and fruit after eating
+        grid, snake = self.grid, self.engine.snake
+        if not snake.occupies(old_tail):
+            grid[BODY, old_tail[1], old_tail[0]] = 0
+        grid[HEAD, old_head[1], old_head[0]] = 0
+        x, y = snake.body[0]
+        if 0 <= x < self.width and 0 <= y < self.height:
+            grid[BODY, y, x] = 1
+            grid[HEAD, y, x] = 1
+        if ate:
+            self._paint_fruit()
+
+    def _paint_fruit(self):
+        grid = self.grid
+        for (x, y), channel in self._fruit_cells.items():
+            grid[channel, y, x] = 0
+        self._fruit_cells = {
+            cell: APPLE if fruit.type is FruitType.APPLE else GOOD_FRUIT
+            for cell, fruit in self.engine.fruit_at.items()
+        }
+        for (x, y), channel in self._fruit_cells.items():
+            grid[channel, y, x] = 1
+
+    def _rebuild_grid(self):
+        grid, snake = self.grid, self.engine.snake
+        grid.fill(0)
+        for x, y in snake.body:
+            grid[BODY, y, x] = 1
+        head_x, head_y = snake.body[0]
+        grid[HEAD, head_y, head_x] = 1
+        self._fruit_cells = {}
+        self._paint_fruit()
@@ -1,163 +1,217 @@
-import pygame
-import random
+import os
 import sys
-from enum import Enum
+import time
+from collections import OrderedDict, deque
+
+_import_started = time.perf_counter()
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
 
-# Initialize Pygame
-pygame.init()
+from snake_engine import (
+    GRID_WIDTH, GRID_HEIGHT, MAX_SEED,
+    BLACK, WHITE, GREEN, RED, ORANGE, PINK, PURPLE, GRAY,
+    DEFAULT_RULES, FRUIT_COLORS, FruitType, Direction, Fruit, Snake, FreeCellIndex, SnakeEngine, parse_seed,
+)
+from autopilot import Autopilot
+from frame_capture import FrameCapture
+from frame_profiler import FrameProfiler
+from hamiltonian import HamiltonianSolver
+from replay import ReplayRecorder
+from rewind import RewindBuffer
+from scores import DEFAULT_PATH as DEFAULT_SCORES_PATH, GameResult, ScoreStore
 
-# Constants
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
+# Constants; the window is SCREEN_WIDTH x SCREEN_HEIGHT at most, larger boards scroll
 GRID_SIZE = 20
-GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
-GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
+SCREEN_WIDTH = GRID_WIDTH * GRID_SIZE
+SCREEN_HEIGHT = GRID_HEIGHT * GRID_SIZE
 
-# Colors (minimal palette)
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-GREEN = (0, 255, 0)
-RED = (255, 0, 0)
-ORANGE = (255, 165, 0)
-PINK = (255, 192, 203)
-PURPLE = (128, 0, 128)
-GRAY = (128, 128, 128)
+# Cold start budget, from importing this module to the first frame on screen
+FIRST_FRAME_TARGET = 1.0  # Seconds
 
-class FruitType(Enum):
-    APPLE = "apple"
-    ORANGE = "orange"
-    GRAPEFRUIT = "grapefruit"
-    BERRY = "berry"
+# SnakeGame methods timed by the frame profiler, by phase
+PROFILED_METHODS = (
+    ("events", "handle_events"),
+    ("update", "update"),
+    ("draw", "draw"),
+    ("draw_ui", "draw_ui"),
+    ("flip", "present"),
+)
+PROFILER_PANEL_REFRESH = 30  # Frames between re-renders of the timing panel
 
-class Direction(Enum):
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
+PRACTICE_SECONDS = 10  # How far back practice mode can rewind
 
-class Fruit:
-    def __init__(self, fruit_type, x, y):
-        self.type = fruit_type
-        self.x = x
-        self.y = y
-        self.color = self._get_color()
-        self.symbol = self._get_symbol()
-    
-    def _get_color(self):
-        colors = {
-            FruitType.APPLE: RED,
-            FruitType.ORANGE: ORANGE,
-            FruitType.GRAPEFRUIT: PINK,
-            FruitType.BERRY: PURPLE
-        }
-        return colors[self.type]
-    
-    def _get_symbol(self):
-        symbols = {
-            FruitType.APPLE: "🍎",
-            FruitType.ORANGE: "🍊",
-            FruitType.GRAPEFRUIT: "🍇",
-            FruitType.BERRY: "🫐"
-        }
-        return symbols[self.type]
+IDLE_TIMEOUT_MS = 1000  # Longest sleep on a static screen between checks
+
+LEADERBOARD_ROWS = 5  # High scores listed on the end screens
+
+DEATH_MESSAGES = {
+    "apple": "You ate an apple!",
+    "wall": "You hit the wall!",
+    "self": "You ran into yourself!",
+}
 
-class Snake:
-    def __init__(self):
-        self.body = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]
-        self.direction = Direction.RIGHT
-        self.grow_pending = 0
+def init_pygame():
+    # Only the subsystems the game uses; pygame.init() would also start audio and joysticks
+    pygame.display.init()
+    pygame.font.init()
+
+class TextCache:
+    """Rendered text surfaces keyed by (text, font, color), least recently used evicted first"""
     
-    def move(self):
-        head_x, head_y = self.body[0]
-        dx, dy = self.direction.value
-        new_head = (head_x + dx, head_y + dy)
-        
-        self.body.insert(0, new_head)
-        
-        if self.grow_pending > 0:
-            self.grow_pending -= 1
-        else:
-            self.body.pop()
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
     
-    def grow(self):
-        self.grow_pending += 1
+    def __len__(self):
+        return len(self._surfaces)
     
-    def check_collision(self):
-        head_x, head_y = self.body[0]
-        
-        # Wall collision
-        if head_x < 0 or head_x >= GRID_WIDTH or head_y < 0 or head_y >= GRID_HEIGHT:
-            return True
-        
-        # Self collision
-        if (head_x, head_y) in self.body[1:]:
-            return True
-        
-        return False
+    def render(self, font, text, color):
+        key = (text, font, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+class SpriteAtlas:
+    """One pre-rendered tile per cell kind, laid out side by side on a single surface"""
     
-    def change_direction(self, new_direction):
-        # Prevent reversing into itself
-        opposite_directions = {
-            Direction.UP: Direction.DOWN,
-            Direction.DOWN: Direction.UP,
-            Direction.LEFT: Direction.RIGHT,
-            Direction.RIGHT: Direction.LEFT
-        }
-        
-        if new_direction != opposite_directions.get(self.direction):
-            self.direction = new_direction
+    def __init__(self, cell_size):
+        tiles = [("head", GREEN), ("body", GREEN)]
+        tiles += [(fruit_type, FRUIT_COLORS[fruit_type]) for fruit_type in FruitType]
+        
+        self.surface = pygame.Surface((cell_size * len(tiles), cell_size)).convert()
+        self.areas = {}
+        for i, (kind, color) in enumerate(tiles):
+            area = pygame.Rect(i * cell_size, 0, cell_size, cell_size)
+            pygame.draw.rect(self.surface, color, area)
+            pygame.draw.rect(self.surface, WHITE, area, 1)
+            self.areas[kind] = area
 
-class SnakeGame:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Retro Snake Game - Avoid the Apples!")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.big_font = pygame.font.Font(None, 72)
-        
-        self.reset_game()
+class Camera:
+    """The window of board cells on screen, scrolled to keep the head in view"""
     
-    def reset_game(self):
-        self.snake = Snake()
-        self.fruits = []
-        self.level = 0
-        self.score = 0
-        self.game_over = False
-        self.game_won = False
-        self.speed = 8  # Starting speed
-        self.fruits_eaten_this_level = 0
-        self.fruits_needed_per_level = 5
-        
-        self.spawn_fruits()
+    __slots__ = ("width", "height", "board_width", "board_height", "margin", "x", "y")
     
-    def spawn_fruits(self):
-        self.fruits.clear()
-        
-        # Level-based fruit spawning
-        apple_count = min(2 + self.level, 6)  # More apples as level increases
-        good_fruit_count = 3 + self.level  # More good fruits too
-        
-        # Spawn apples (dangerous)
-        for _ in range(apple_count):
-            self.spawn_fruit(FruitType.APPLE)
-        
-        # Spawn good fruits
-        good_fruits = [FruitType.ORANGE, FruitType.GRAPEFRUIT, FruitType.BERRY]
-        for _ in range(good_fruit_count):
-            fruit_type = random.choice(good_fruits)
-            self.spawn_fruit(fruit_type)
+    def __init__(self, width, height, board_width, board_height):
+        self.width = min(width, board_width)
+        self.height = min(height, board_height)
+        self.board_width = board_width
+        self.board_height = board_height
+        self.margin = min(self.width, self.height) // 4  # Cells kept between the head and the edge
+        self.x = 0  # Top-left visible cell
+        self.y = 0
     
-    def spawn_fruit(self, fruit_type):
-        while True:
-            x = random.randint(0, GRID_WIDTH - 1)
-            y = random.randint(0, GRID_HEIGHT - 1)
-            
-            # Don't spawn on snake
-            if (x, y) not in self.snake.body:
-                # Don't spawn on existing fruits
-                if not any(f.x == x and f.y == y for f in self.fruits):
-                    self.fruits.append(Fruit(fruit_type, x, y))
-                    break
+    def follow(self, cell):
+        # Scroll only once the head gets within margin cells of an edge
+        x, y = cell
+        left = min(max(self.x, x - self.width + 1 + self.margin), x - self.margin)
+        top = min(max(self.y, y - self.height + 1 + self.margin), y - self.margin)
+        left = max(0, min(left, self.board_width - self.width))
+        top = max(0, min(top, self.board_height - self.height))
+        moved = (left, top) != (self.x, self.y)
+        self.x, self.y = left, top
+        return moved
+    
+    def center_on(self, cell):
+        self.x = max(0, min(cell[0] - self.width // 2, self.board_width - self.width))
+        self.y = max(0, min(cell[1] - self.height // 2, self.board_height - self.height))
+    
+    def contains(self, cell):
+        return 0 <= cell[0] - self.x < self.width and 0 <= cell[1] - self.y < self.height
+
+class SnakeGame(SnakeEngine):
+    def __init__(self, seed=None, incremental=False, fixed_timestep=False, display_fps=60,
+                 record_dir=None, autopilot=False, grid_width=GRID_WIDTH, grid_height=GRID_HEIGHT,
+                 cell_size=GRID_SIZE, rules=DEFAULT_RULES, practice=False, scores_path=None):
+        # Boards larger than the window scroll; only the visible cells are drawn
+        self.cell_size = cell_size
+        self.camera = Camera(SCREEN_WIDTH // cell_size, SCREEN_HEIGHT // cell_size, grid_width, grid_height)
+        self.screen_width = self.camera.width * cell_size
+        self.screen_height = self.camera.height * cell_size
+        # Incremental mode repaints only changed cells with display.update(rects)
+        self.incremental = incremental
+        # Fixed-timestep mode polls and renders at display_fps and ticks at self.speed
+        self.fixed_timestep = fixed_timestep
+        self.display_fps = display_fps
+        self.pending_turns = deque()
+        self.max_pending_turns = 3
+        self.input_latencies = deque(maxlen=240)  # Seconds from keypress to frame
+        self._turns_awaiting_frame = []
+        # Every finished game is saved as a replay file in record_dir
+        self.record_dir = record_dir
+        if record_dir is not None:
+            os.makedirs(record_dir, exist_ok=True)
+            self.recorder = ReplayRecorder(on_finish=self.save_replay)
+        # Attract mode: the autopilot plays until an arrow key is pressed
+        self.autopilot = Autopilot() if autopilot else None
+        self._attract_wait = 0
+        # Static screens are drawn once, then the loop sleeps until an event
+        self.paused = False
+        self._idle_drawn = None  # idle_key() of the screen last drawn while idle
+        # Frame profiler, off unless enabled; F3 toggles it with its timing panel
+        self.profiler = None
+        self.show_profiler = False
+        self._profiler_panel = None
+        self._profiler_panel_frame = 0
+        # Video capture of every drawn frame, off unless start_capture() is called
+        self.capture = None
+        # Per-game telemetry for the high-score table, timed from reset_game()
+        self.scores = None
+        self.ticks_played = 0
+        self.assisted = False  # The autopilot drove some of this game
+        self.new_high_score = False
+        self._game_started = time.perf_counter()
+        self._practice_result = None  # A rewind can reopen a practice game, so it waits for the next reset
+        self._dirty_cells = []
+        self._dirty_rects = []  # Reused every frame, filled from _rect_pool
+        self._rect_pool = []
+        self._hud_rects = []
+        self._drawn_hud = None
+        self._drawn_screen = None
+        
+        # Seconds per startup phase, for startup_report()
+        self.startup_times = {"import": IMPORT_SECONDS}
+        started = time.perf_counter()
+        init_pygame()
+        self.startup_times["init"] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+        pygame.display.set_caption("Retro Snake Game - Avoid the Apples!")
+        self.clock = pygame.time.Clock()
+        self.startup_times["display"] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        self.font = pygame.font.Font(None, 36)
+        self._big_font = None  # Only the end screens need it
+        self._small_font = None  # Only the profiler panel needs it
+        self.text_cache = TextCache()
+        self._overlay = None
+        self._atlas = None
+        self._cell_rect = pygame.Rect(0, 0, cell_size, cell_size)  # Scratch Rect for one-off cells
+        self.startup_times["fonts"] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        super().__init__(seed, rules, grid_width, grid_height)
+        # Practice mode: BACKSPACE rewinds a second at a time, even after a crash
+        if practice:
+            RewindBuffer(PRACTICE_SECONDS * rules.max_speed).attach(self)
+        # Finished games go to a background SQLite writer; end screens read its cache
+        if scores_path is not None:
+            self.scores = ScoreStore(scores_path, on_refresh=self.scores_refreshed)
+        self._first_frame_started = time.perf_counter()
+        self.startup_times["game"] = self._first_frame_started - started
     
     def handle_events(self):
         for event in pygame.event.get():
@@ -168,82 +222,266 @@ class SnakeGame:
                 if event.key == pygame.K_ESCAPE:
                     return False
                 
-                if self.game_over or self.game_won:
+                if event.key == pygame.K_F3:
+                    self.toggle_profiler_panel()
+                    continue
+                
+                if event.key == pygame.K_BACKSPACE and self.rewind is not None:
+                    self.rewind_seconds()
+                    continue
+                
+                if self.paused:
+                    if event.key == pygame.K_p:
+                        self.paused = False
+                elif self.game_over or self.game_won:
                     if event.key == pygame.K_SPACE:
                         self.reset_game()
                 else:
                     # Direction controls
                     if event.key == pygame.K_UP:
-                        self.snake.change_direction(Direction.UP)
+                        self.steer(Direction.UP)
                     elif event.key == pygame.K_DOWN:
-                        self.snake.change_direction(Direction.DOWN)
+                        self.steer(Direction.DOWN)
                     elif event.key == pygame.K_LEFT:
-                        self.snake.change_direction(Direction.LEFT)
+                        self.steer(Direction.LEFT)
                     elif event.key == pygame.K_RIGHT:
-                        self.snake.change_direction(Direction.RIGHT)
+                        self.steer(Direction.RIGHT)
+                    elif event.key == pygame.K_p:
+                        self.paused = True
         
         return True
     
+    def steer(self, direction):
+        self.autopilot = None  # The player takes over
+        if not self.fixed_timestep:
+            self.snake.change_direction(direction)
+            return
+        
+        # Queue turns so two quick presses land on two ticks instead of one
+        if len(self.pending_turns) >= self.max_pending_turns:
+            return
+        if self.pending_turns and self.pending_turns[-1][0] == direction:
+            return
+        self.pending_turns.append((direction, time.perf_counter()))
+    
+    def apply_pending_turn(self):
+        if not self.pending_turns:
+            return
+        direction, pressed_at = self.pending_turns.popleft()
+        self.snake.change_direction(direction)
+        self._turns_awaiting_frame.append(pressed_at)
+    
+    def save_replay(self, recorder):
+        recorder.save(os.path.join(self.record_dir, f"replay-{recorder.seed}.snr"))
+    
+    @property
+    def input_latency(self):
+        # Keypress-to-screen latency in milliseconds over recent turns
+        if not self.input_latencies:
+            return None
+        samples = sorted(self.input_latencies)
+        return {
+            "count": len(samples),
+            "mean_ms": sum(samples) / len(samples) * 1000,
+            "p50_ms": samples[len(samples) // 2] * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
+    
+    def reset_game(self, seed=None):
+        self._drawn_screen = None  # Force a full repaint
+        self.pending_turns.clear()
+        self.ticks_played = 0
+        self.assisted = False
+        self.new_high_score = False
+        self._game_started = time.perf_counter()
+        self.record_practice_game()
+        super().reset_game(seed)
+        self.camera.center_on(self.snake.body[0])
+    
+    def rewind_seconds(self, seconds=1.0):
+        # Returns the ticks undone; the buffer holds PRACTICE_SECONDS at top speed
+        ticks = self.rewind.rewind(max(1, round(seconds * self.speed)))
+        self.pending_turns.clear()
+        if self.autopilot is not None:
+            self.autopilot.replan()
+        self._drawn_screen = None  # Force a full repaint
+        return ticks
+    
+    def drive_autopilot(self):
+        # Start a new demo game a few seconds after each one ends
+        if self.game_over or self.game_won:
+            self._attract_wait += 1
+            if self._attract_wait >= self.speed * 3:
+                self.reset_game()
+        else:
+            self._attract_wait = 0
+            self.assisted = True
+            self.autopilot.drive(self)
+    
     def update(self):
+        if self.paused:
+            return
+        if self.autopilot is not None:
+            self.drive_autopilot()
         if self.game_over or self.game_won:
             return
-        
-        self.snake.move()
-        
-        # Check wall/self collision
-        if self.snake.check_collision():
-            self.game_over = True
+        self.ticks_played += 1
+        if not self.incremental:
+            super().update()
             return
         
-        # Check fruit collision
-        head_x, head_y = self.snake.body[0]
-        for fruit in self.fruits[:]:  # Copy list to avoid modification during iteration
-            if fruit.x == head_x and fruit.y == head_y:
-                if fruit.type == FruitType.APPLE:
-                    # Game over - ate an apple!
-                    self.game_over = True
-                    return
-                else:
-                    # Good fruit eaten
-                    self.fruits.remove(fruit)
-                    self.snake.grow()
-                    self.score += 10
-                    self.fruits_eaten_this_level += 1
-                    
-                    # Spawn new good fruit
-                    good_fruits = [FruitType.ORANGE, FruitType.GRAPEFRUIT, FruitType.BERRY]
-                    self.spawn_fruit(random.choice(good_fruits))
-                    
-                    # Check level completion
-                    if self.fruits_eaten_this_level >= self.fruits_needed_per_level:
-                        self.level += 1
-                        self.fruits_eaten_this_level = 0
-                        
-                        if self.level > 5:
-                            self.game_won = True
-                            return
-                        
-                        # Increase speed slightly
-                        self.speed = min(self.speed + 1, 15)
-                        self.spawn_fruits()
+        # The tail may be vacated, the old head becomes body and the head moves on
+        self._dirty_cells.append(self.snake.body[-1])
+        self._dirty_cells.append(self.snake.body[0])
+        super().update()
+        self._dirty_cells.append(self.snake.body[0])
+    
+    def game_finished(self):
+        super().game_finished()
+        if self.scores is None:
+            return
+        # Only games played start to finish by a player rank on the leaderboard
+        if self.assisted:
+            mode = "autopilot"
+        elif self.rewind is not None:
+            mode = "practice"
+        else:
+            mode = "player"
+        self.new_high_score = mode == "player" and self.score > self.scores.best
+        result = GameResult(
+            time.time(), self.seed, mode, self.score, self.level, self.game_won, self.death_cause,
+            time.perf_counter() - self._game_started, self.ticks_played, self.width, self.height,
+        )
+        if mode == "practice":
+            self._practice_result = result  # Replaced if the player rewinds and dies again
+        else:
+            self.scores.record(result)
+    
+    def record_practice_game(self):
+        # One row per practice game, however often it was rewound
+        if self._practice_result is not None:
+            self.scores.record(self._practice_result)
+            self._practice_result = None
+    
+    def scores_refreshed(self):
+        # Runs on the score writer thread; the event wakes an idle end screen to redraw
+        try:
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+        except pygame.error:
+            pass  # Display already closed
+    
+    def spawn_fruit(self, fruit_type):
+        fruit = super().spawn_fruit(fruit_type)
+        if fruit is not None and self.incremental:
+            self._dirty_cells.append((fruit.x, fruit.y))
+        return fruit
     
     def draw(self):
+        # Level changes, resets, overlays and scrolling need a full repaint
+        self.camera.follow(self.snake.body[0])
+        screen_key = (self.level, self.game_over, self.game_won, self.paused, self.camera.x, self.camera.y,
+                      self.leaderboard_version())
+        if not self.incremental or screen_key != self._drawn_screen:
+            self.draw_full()
+            self._drawn_screen = screen_key
+        else:
+            self.draw_dirty()
+        
+        if self.capture is not None:
+            self.capture.grab(self.screen)
+        
+        if "first_frame" not in self.startup_times:
+            self.startup_times["first_frame"] = time.perf_counter() - self._first_frame_started
+    
+    def startup_report(self):
+        # One line per phase, then the total against FIRST_FRAME_TARGET
+        times = self.startup_times
+        lines = [f"  {phase:<12}{seconds * 1000:8.1f} ms" for phase, seconds in times.items()]
+        if "first_frame" in times:
+            total = sum(times.values())
+            verdict = "✅" if total <= FIRST_FRAME_TARGET else "⚠️  over target"
+            lines.append(f"  {'total':<12}{total * 1000:8.1f} ms "
+                         f"(target {FIRST_FRAME_TARGET * 1000:.0f} ms) {verdict}")
+        return "Startup timing:\n" + "\n".join(lines)
+    
+    def draw_dirty(self):
+        # Cell Rects come from a pool, so a steady-state frame allocates no new Rects
+        rects = self._dirty_rects
+        rects.clear()
+        pool = self._rect_pool
+        for cell in self._dirty_cells:
+            if len(rects) == len(pool):
+                pool.append(pygame.Rect(0, 0, self.cell_size, self.cell_size))
+            rect = self.draw_cell(cell, pool[len(rects)])
+            if rect is not None:
+                rects.append(rect)
+        self._dirty_cells.clear()
+        
+        if self.hud_stale(rects):
+            rects.extend(self.redraw_hud())
+        
+        if self.show_profiler:
+            rects.append(self.draw_profiler_panel())
+        
+        if rects:
+            self.present(rects)
+    
+    def hud_stale(self, rects):
+        # The HUD is drawn over the board, so repaint it if it changed or was touched
+        drawn = self._drawn_hud
+        if drawn is None or drawn[0] != self.score or drawn[1] != self.fruits_eaten_this_level:
+            return True
+        hud_rects = self._hud_rects
+        for rect in rects:
+            if rect.collidelist(hud_rects) != -1:
+                return True
+        return False
+    
+    def draw_cell(self, cell, rect=None):
+        # Paints one cell into rect (the shared scratch Rect by default) and returns it
+        camera = self.camera
+        if not camera.contains(cell):
+            return None
+        
+        if rect is None:
+            rect = self._cell_rect
+        rect.x = (cell[0] - camera.x) * self.cell_size
+        rect.y = (cell[1] - camera.y) * self.cell_size
+        self.screen.fill(BLACK, rect)
+        atlas = self.get_atlas()
+        if self.snake.occupies(cell):
+            kind = "head" if cell == self.snake.body[0] else "body"
+        else:
+            fruit = self.fruit_at.get(cell)
+            if fruit is None:
+                return rect
+            kind = fruit.type
+        self.screen.blit(atlas.surface, rect, atlas.areas[kind])
+        return rect
+    
+    def redraw_hud(self):
+        # Clear the old text, restore the cells under it, then draw the new text
+        old_rects = self._hud_rects
+        camera, size = self.camera, self.cell_size
+        for rect in old_rects:
+            self.screen.fill(BLACK, rect)
+            for y in range(max(rect.top // size, 0), min((rect.bottom - 1) // size + 1, camera.height)):
+                for x in range(max(rect.left // size, 0), min((rect.right - 1) // size + 1, camera.width)):
+                    self.draw_cell((camera.x + x, camera.y + y))
+        self.draw_ui()
+        return old_rects + self._hud_rects
+    
+    def draw_full(self):
+        self._dirty_cells.clear()
         self.screen.fill(BLACK)
+        atlas = self.get_atlas()
+        tiles, areas = atlas.surface, atlas.areas
         
-        # Draw snake
-        for segment in self.snake.body:
-            x, y = segment
-            rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-            pygame.draw.rect(self.screen, GREEN, rect)
-            pygame.draw.rect(self.screen, WHITE, rect, 1)
-        
-        # Draw fruits
-        for fruit in self.fruits:
-            x = fruit.x * GRID_SIZE
-            y = fruit.y * GRID_SIZE
-            rect = pygame.Rect(x, y, GRID_SIZE, GRID_SIZE)
-            pygame.draw.rect(self.screen, fruit.color, rect)
-            pygame.draw.rect(self.screen, WHITE, rect, 1)
+        # One batched blit for every visible cell
+        self.screen.blits(
+            [(tiles, position, areas[kind]) for position, kind in self.visible_sprites()],
+            doreturn=False,
+        )
         
         # Draw UI
         self.draw_ui()
@@ -253,87 +491,373 @@ class SnakeGame:
             self.draw_game_over()
         elif self.game_won:
             self.draw_game_won()
+        elif self.paused:
+            self.draw_paused()
         
-        pygame.display.flip()
+        if self.show_profiler:
+            self.draw_profiler_panel()
+        
+        self.present()
+    
+    def present(self, rects=None):
+        # Everything drawn reaches the display here, so the profiler can time it
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+    
+    def visible_sprites(self):
+        # (screen position, atlas kind) for every drawn cell in view: the snake
+        # head first, then body and fruit. Walks whichever is smaller, the
+        # snake and fruit or the window, so cost never grows with the board.
+        camera, size = self.camera, self.cell_size
+        body = self.snake.body
+        if len(body) + len(self.fruit_at) <= camera.width * camera.height:
+            cells = [(cell, "body") for cell in body]
+            cells[0] = (body[0], "head")
+            cells.extend(((fruit.x, fruit.y), fruit.type) for fruit in self.fruits)
+            return [
+                (((x - camera.x) * size, (y - camera.y) * size), kind)
+                for (x, y), kind in cells
+                if 0 <= x - camera.x < camera.width and 0 <= y - camera.y < camera.height
+            ]
+        
+        head = body[0]
+        sprites = []
+        for row in range(camera.height):
+            for column in range(camera.width):
+                cell = (camera.x + column, camera.y + row)
+                if self.snake.occupies(cell):
+                    kind = "head" if cell == head else "body"
+                else:
+                    fruit = self.fruit_at.get(cell)
+                    if fruit is None:
+                        continue
+                    kind = fruit.type
+                sprites.append(((column * size, row * size), kind))
+        return sprites
     
     def draw_ui(self):
+        # Remember where the text went so incremental mode can repaint it
+        hud_rects = []
+        
         # Score
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+        score_text = self.text_cache.render(self.font, f"Score: {self.score}", WHITE)
+        hud_rects.append(self.screen.blit(score_text, (10, 10)))
         
         # Level
-        level_text = self.font.render(f"Level: {self.level}", True, WHITE)
-        self.screen.blit(level_text, (10, 50))
+        level_text = self.text_cache.render(self.font, f"Level: {self.level}", WHITE)
+        hud_rects.append(self.screen.blit(level_text, (10, 50)))
         
         # Progress
-        progress_text = self.font.render(f"Progress: {self.fruits_eaten_this_level}/{self.fruits_needed_per_level}", True, WHITE)
-        self.screen.blit(progress_text, (10, 90))
+        progress_text = self.text_cache.render(self.font, f"Progress: {self.fruits_eaten_this_level}/{self.fruits_needed_per_level}", WHITE)
+        hud_rects.append(self.screen.blit(progress_text, (10, 90)))
         
         # Instructions
         if self.level == 0 and self.fruits_eaten_this_level == 0:
-            instruction_text = self.font.render("Eat good fruits, AVOID APPLES!", True, WHITE)
-            text_rect = instruction_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 30))
-            self.screen.blit(instruction_text, text_rect)
+            instruction_text = self.text_cache.render(self.font, "Eat good fruits, AVOID APPLES!", WHITE)
+            text_rect = instruction_text.get_rect(center=(self.screen_width // 2, self.screen_height - 30))
+            hud_rects.append(self.screen.blit(instruction_text, text_rect))
+        
+        self._hud_rects = hud_rects
+        self._drawn_hud = (self.score, self.fruits_eaten_this_level)
+    
+    def get_atlas(self):
+        # Built on first draw, after the display exists
+        if self._atlas is None:
+            self._atlas = SpriteAtlas(self.cell_size)
+        return self._atlas
+    
+    def get_big_font(self):
+        # Loaded the first time an end screen is shown
+        if self._big_font is None:
+            self._big_font = pygame.font.Font(None, 72)
+        return self._big_font
+    
+    def get_overlay(self):
+        # Built once and reused by both end screens
+        if self._overlay is None:
+            self._overlay = pygame.Surface((self.screen_width, self.screen_height))
+            self._overlay.set_alpha(128)
+            self._overlay.fill(BLACK)
+        return self._overlay
     
     def draw_game_over(self):
         # Semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.get_overlay(), (0, 0))
         
         # Game over text
-        game_over_text = self.big_font.render("GAME OVER!", True, RED)
-        text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
+        game_over_text = self.text_cache.render(self.get_big_font(), "GAME OVER!", RED)
+        text_rect = game_over_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 - 50))
         self.screen.blit(game_over_text, text_rect)
         
-        reason_text = self.font.render("You ate an apple!", True, WHITE)
-        text_rect = reason_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        reason_text = self.text_cache.render(self.font, DEATH_MESSAGES.get(self.death_cause, "Game over"), WHITE)
+        text_rect = reason_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2))
         self.screen.blit(reason_text, text_rect)
         
-        final_score_text = self.font.render(f"Final Score: {self.score}", True, WHITE)
-        text_rect = final_score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 30))
+        final_score_text = self.text_cache.render(self.font, f"Final Score: {self.score}", WHITE)
+        text_rect = final_score_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + 30))
         self.screen.blit(final_score_text, text_rect)
         
-        restart_text = self.font.render("Press SPACE to restart or ESC to quit", True, WHITE)
-        text_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70))
+        restart_text = self.text_cache.render(self.font, "Press SPACE to restart or ESC to quit", WHITE)
+        text_rect = restart_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + 70))
         self.screen.blit(restart_text, text_rect)
+        
+        self.draw_leaderboard(self.screen_height // 2 + 110)
     
     def draw_game_won(self):
         # Semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.get_overlay(), (0, 0))
         
         # Victory text
-        victory_text = self.big_font.render("YOU WIN!", True, GREEN)
-        text_rect = victory_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
+        victory_text = self.text_cache.render(self.get_big_font(), "YOU WIN!", GREEN)
+        text_rect = victory_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 - 50))
         self.screen.blit(victory_text, text_rect)
         
-        congrats_text = self.font.render("Congratulations! You completed all levels!", True, WHITE)
-        text_rect = congrats_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        congrats_text = self.text_cache.render(self.font, "Congratulations! You completed all levels!", WHITE)
+        text_rect = congrats_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2))
         self.screen.blit(congrats_text, text_rect)
         
-        final_score_text = self.font.render(f"Final Score: {self.score}", True, WHITE)
-        text_rect = final_score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 30))
+        final_score_text = self.text_cache.render(self.font, f"Final Score: {self.score}", WHITE)
+        text_rect = final_score_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + 30))
         self.screen.blit(final_score_text, text_rect)
         
-        restart_text = self.font.render("Press SPACE to play again or ESC to quit", True, WHITE)
-        text_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 70))
+        restart_text = self.text_cache.render(self.font, "Press SPACE to play again or ESC to quit", WHITE)
+        text_rect = restart_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + 70))
         self.screen.blit(restart_text, text_rect)
+        
+        self.draw_leaderboard(self.screen_height // 2 + 110)
+    
+    def leaderboard_version(self):
+        return self.scores.version if self.scores is not None else None
+    
+    def draw_leaderboard(self, top):
+        # From the score store's in-memory cache, as many rows as fit below top
+        if self.scores is None:
+            return
+        title = "NEW HIGH SCORE!" if self.new_high_score else "HIGH SCORES"
+        lines = [(title, GREEN if self.new_high_score else WHITE)] + [
+            (f"{rank}. {entry.score:>6}   level {entry.level}", WHITE)
+            for rank, entry in enumerate(self.scores.leaderboard[:LEADERBOARD_ROWS], 1)
+        ]
+        font = self.get_small_font()
+        for row, (line, color) in enumerate(lines[:max(0, (self.screen_height - top) // 20)]):
+            text = self.text_cache.render(font, line, color)
+            self.screen.blit(text, text.get_rect(center=(self.screen_width // 2, top + row * 20)))
+    
+    def start_capture(self, directory, image_format="raw"):
+        # Frames are copied on this thread and written on a background one
+        self.capture = FrameCapture(directory, self.screen.get_size(), image_format)
+    
+    def stop_capture(self):
+        stats = self.capture.close()
+        self.capture = None
+        return stats
+    
+    def enable_profiler(self, export_path=None):
+        # Wraps the phase methods on this instance only; off, the loop pays one None check
+        if self.profiler is not None:
+            return self.profiler
+        profiler = FrameProfiler(export_path=export_path)
+        for phase, name in PROFILED_METHODS:
+            setattr(self, name, profiler.wrap(phase, getattr(self, name)))
+        self.profiler = profiler
+        return profiler
+    
+    def disable_profiler(self):
+        if self.profiler is None:
+            return
+        for _, name in PROFILED_METHODS:
+            del self.__dict__[name]
+        self.profiler.close()
+        self.profiler = None
+    
+    def toggle_profiler_panel(self):
+        # A profiler started for --profile keeps recording when the panel is hidden
+        if self.profiler is None:
+            self.enable_profiler()
+        self.show_profiler = not self.show_profiler
+        self._profiler_panel = None
+        self._drawn_screen = None  # Repaint whatever the panel covered
+        if not self.show_profiler and self.profiler.export_path is None:
+            self.disable_profiler()
+    
+    def draw_profiler_panel(self):
+        # Rolling p50/p99/max per phase, top right; the text is re-rendered
+        # every PROFILER_PANEL_REFRESH frames into a fixed-size surface
+        profiler = self.profiler
+        panel = self._profiler_panel
+        if panel is None or profiler.frames - self._profiler_panel_frame >= PROFILER_PANEL_REFRESH:
+            if panel is None:
+                panel = self._profiler_panel = pygame.Surface((240, 8 + 18 * 8))
+            panel.fill(BLACK)
+            font = self.get_small_font()
+            rows = [("ms", "p50", "p99", "max")] + [
+                (name,) + tuple(f"{seconds * 1000:.2f}" for seconds in timings)
+                for name, timings in profiler.stats().items()
+            ]
+            for row, cells in enumerate(rows):
+                for column, text in enumerate(cells):
+                    surface = font.render(text, True, GREEN if column else WHITE)
+                    # Name column left-aligned, numbers right-aligned
+                    x = 6 if not column else 60 + column * 58 - surface.get_width()
+                    panel.blit(surface, (x, 4 + row * 18))
+            self._profiler_panel_frame = profiler.frames
+        return self.screen.blit(panel, panel.get_rect(topright=(self.screen_width - 10, 10)))
+    
+    def get_small_font(self):
+        # Loaded the first time the profiler panel or the leaderboard is shown
+        if self._small_font is None:
+            self._small_font = pygame.font.Font(None, 22)
+        return self._small_font
+    
+    def draw_paused(self):
+        self.screen.blit(self.get_overlay(), (0, 0))
+        
+        paused_text = self.text_cache.render(self.get_big_font(), "PAUSED", WHITE)
+        text_rect = paused_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 - 20))
+        self.screen.blit(paused_text, text_rect)
+        
+        resume_text = self.text_cache.render(self.font, "Press P to resume or ESC to quit", WHITE)
+        text_rect = resume_text.get_rect(center=(self.screen_width // 2, self.screen_height // 2 + 30))
+        self.screen.blit(resume_text, text_rect)
+    
+    def is_idle(self):
+        # Nothing moves while paused, or on an end screen unless attract mode will restart it
+        return self.paused or ((self.game_over or self.game_won) and self.autopilot is None)
+    
+    def idle_key(self):
+        # Everything an event can change on a static screen
+        return (self.paused, self.game_over, self.game_won, self.score, self.level,
+                len(self.snake.body), self.show_profiler, self.leaderboard_version())
+    
+    def wait_idle(self):
+        # Draw the static screen once, then block until an event or the timeout
+        if self._idle_drawn != self.idle_key():
+            self.draw()
+            self._idle_drawn = self.idle_key()
+        event = pygame.event.wait(IDLE_TIMEOUT_MS)
+        if event.type == pygame.NOEVENT:
+            return True
+        pygame.event.post(event)
+        return self.handle_events()
     
     def run(self):
+        if self.fixed_timestep:
+            self.run_fixed_timestep()
+        else:
+            running = True
+            while running:
+                if self.profiler is not None:
+                    self.profiler.next_frame()
+                if self.is_idle():
+                    running = self.wait_idle()
+                    continue
+                self._idle_drawn = None
+                running = self.handle_events()
+                self.update()
+                self.draw()
+                self.clock.tick(self.speed)
+        
+        if self.profiler is not None:
+            print("Frame timing:\n  " + "\n  ".join(self.profiler.summary()))
+            self.disable_profiler()
+        if self.capture is not None:
+            stats = self.stop_capture()
+            print(f"Captured {stats['frames']} frames ({stats['dropped']} dropped)")
+        if self.scores is not None:
+            self.record_practice_game()
+            self.scores.close()  # Writes any game still queued
+        pygame.quit()
+        sys.exit()
+    
+    def run_fixed_timestep(self):
+        # Input and rendering at display rate, game ticks from an accumulator
+        max_backlog = 5  # Ticks; avoids a spiral of catch-up after a stall
+        accumulator = 0.0
+        previous = time.perf_counter()
         running = True
         while running:
+            if self.profiler is not None:
+                self.profiler.next_frame()
+            if self.is_idle():
+                running = self.wait_idle()
+                previous = time.perf_counter()  # No catching up on time spent idle
+                continue
+            self._idle_drawn = None
             running = self.handle_events()
-            self.update()
+            
+            now = time.perf_counter()
+            accumulator = min(accumulator + now - previous, max_backlog / self.speed)
+            previous = now
+            while accumulator >= 1.0 / self.speed:
+                accumulator -= 1.0 / self.speed
+                self.apply_pending_turn()
+                self.update()
+            
             self.draw()
-            self.clock.tick(self.speed)
+            if self._turns_awaiting_frame:
+                shown = time.perf_counter()
+                self.input_latencies.extend(shown - pressed for pressed in self._turns_awaiting_frame)
+                self._turns_awaiting_frame.clear()
+            
+            self.clock.tick(self.display_fps)
         
-        pygame.quit()
-        sys.exit()
+        latency = self.input_latency
+        if latency:
+            print(f"Input latency: mean {latency['mean_ms']:.1f} ms, "
+                  f"p50 {latency['p50_ms']:.1f} ms, max {latency['max_ms']:.1f} ms "
+                  f"over {latency['count']} turns")
+
+# Module import time, including pygame and the engine, for startup_report()
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
 if __name__ == "__main__":
-    game = SnakeGame()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Retro Snake Game - Avoid the Apples!")
+    parser.add_argument("--incremental", action="store_true",
+                        help="repaint only changed cells (for low-power displays)")
+    parser.add_argument("--fixed-timestep", action="store_true",
+                        help="poll input and render at display rate, tick the game at its own rate")
+    parser.add_argument("--seed", type=parse_seed, help=f"seed for the first game (0 to {MAX_SEED})")
+    parser.add_argument("--record", metavar="DIR", help="save a replay of every game to DIR")
+    parser.add_argument("--grid", default=f"{GRID_WIDTH}x{GRID_HEIGHT}", metavar="WxH",
+                        help="board size in cells; boards larger than the window scroll")
+    parser.add_argument("--cell-size", type=int, default=GRID_SIZE, help="cell size in pixels")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print import, init, font and first-frame timings, then quit")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="attract mode: the computer plays until an arrow key is pressed")
+    parser.add_argument("--solver", action="store_true",
+                        help="attract mode played by the Hamiltonian-cycle solver instead of the autopilot")
+    parser.add_argument("--practice", action="store_true",
+                        help=f"BACKSPACE rewinds one second, up to {PRACTICE_SECONDS} seconds back")
+    parser.add_argument("--capture", metavar="DIR", help="record every frame to DIR in the background")
+    parser.add_argument("--capture-format", choices=("raw", "png"), default="raw",
+                        help="raw RGB video (frames.rgb) or a PNG sequence (default raw)")
+    parser.add_argument("--scores", metavar="PATH", default=DEFAULT_SCORES_PATH,
+                        help=f"high-score and telemetry database (default {DEFAULT_SCORES_PATH})")
+    parser.add_argument("--no-scores", action="store_true", help="don't record games or show high scores")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="time every frame's phases into PATH (.csv, or .json for a trace-event file)")
+    args = parser.parse_args()
+    grid_width, grid_height = (int(size) for size in args.grid.lower().split("x"))
+    
+    game = SnakeGame(seed=args.seed, incremental=args.incremental,
+                     fixed_timestep=args.fixed_timestep, record_dir=args.record,
+                     autopilot=args.autopilot or args.solver, grid_width=grid_width, grid_height=grid_height,
+                     cell_size=args.cell_size, practice=args.practice,
+                     scores_path=None if args.no_scores or args.startup_report else args.scores)
+    if args.solver:
+        game.autopilot = HamiltonianSolver()
+    if args.profile:
+        game.enable_profiler(args.profile)
+    if args.capture:
+        game.start_capture(args.capture, args.capture_format)
+    if args.startup_report:
+        game.draw()
+        print(game.startup_report())
+        pygame.quit()
+        sys.exit(0)
     game.run()
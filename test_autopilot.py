@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for the pathfinding autopilot
+Runs without pygame or any mocking
+"""
+
+import sys
+import time
+
+from autopilot import Autopilot, UNREACHABLE
+from bots import load_policy
+from snake_engine import SnakeEngine, Direction, Fruit, FruitType
+
+def place(engine, fruit_type, cell):
+    engine.fruit_at[cell] = Fruit(fruit_type, *cell)
+
+def test_path_avoids_apples():
+    """Test that the planned path goes around an apple instead of through it"""
+    print("🧪 Testing Apple Avoidance...")
+
+    engine = SnakeEngine(1)
+    engine.fruit_at.clear()
+    head_x, head_y = engine.snake.body[0]
+    place(engine, FruitType.APPLE, (head_x + 1, head_y))
+    place(engine, FruitType.ORANGE, (head_x + 2, head_y))
+
+    autopilot = Autopilot()
+    for _ in range(4):
+        autopilot.drive(engine)
+        engine.update()
+    assert not engine.game_over
+    assert engine.score == 10
+    assert autopilot.dist[head_y * autopilot.width + head_x + 1] == UNREACHABLE
+    print("✅ Apple avoidance working correctly")
+
+def test_field_patches_match_rebuild():
+    """Test that the incrementally patched distance field equals a fresh one"""
+    print("🧪 Testing Incremental Distance Field...")
+
+    engine = SnakeEngine(7)
+    autopilot = Autopilot()
+    while engine.level < 2 and not engine.game_over:
+        autopilot.drive(engine)
+        engine.update()
+        fresh = Autopilot()
+        fresh._sync(engine)
+        fresh._run_jobs()
+        autopilot._sync(engine)
+        autopilot._run_jobs()
+        assert autopilot.dist == fresh.dist
+    assert autopilot.stats["field_patches"] > 0
+    # Planning happens per fruit, not per tick
+    assert autopilot.stats["plans"] < engine.score
+    print("✅ Incremental distance field working correctly")
+
+def test_autopilot_wins():
+    """Test that the autopilot clears the game on default rules"""
+    print("🧪 Testing Autopilot Games...")
+
+    for seed in range(3):
+        engine = SnakeEngine(seed)
+        autopilot = load_policy("autopilot")
+        assert isinstance(autopilot, Autopilot)
+        ticks = 0
+        while not (engine.game_over or engine.game_won) and ticks < 5000:
+            direction = autopilot(engine, None)
+            if direction is not None:
+                engine.snake.change_direction(direction)
+            engine.update()
+            ticks += 1
+        assert engine.game_won, (seed, engine.death_cause)
+    print("✅ Autopilot games working correctly")
+
+def test_autopilot_skips_dead_ends():
+    """Test that fruit which would seal the head away from the tail is refused"""
+    print("🧪 Testing Tail Reachability...")
+
+    engine = SnakeEngine(3)
+    engine.fruit_at.clear()
+    # The only way into the corner cuts the head off from the tail
+    engine.snake.body = [(0, 1), (1, 1), (1, 0)] + [(x, 0) for x in range(2, 11)] + [(10, 1), (10, 2), (10, 3)]
+    engine.snake.direction = Direction.LEFT
+    place(engine, FruitType.BERRY, (0, 0))
+
+    autopilot = Autopilot()
+    assert autopilot(engine, None) == Direction.DOWN
+    assert autopilot.stats["fallbacks"] == 1
+    print("✅ Tail reachability working correctly")
+
+def test_large_board_tick_budget():
+    """Test that no tick on a huge board waits for the whole field"""
+    print("🧪 Testing Large Board Budget...")
+
+    engine = SnakeEngine(1, width=400, height=400)
+    autopilot = Autopilot()
+    slowest = 0.0
+    for _ in range(600):
+        started = time.perf_counter()
+        autopilot.drive(engine)
+        slowest = max(slowest, time.perf_counter() - started)
+        engine.update()
+        if engine.game_over:
+            break
+    assert not engine.game_over, engine.death_cause
+    assert engine.score > 0
+    assert autopilot.stats["greedy"] > 0 and autopilot.stats["field_rebuilds"] > 0
+    assert slowest < 0.1, slowest
+    print("✅ Large board budget working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Autopilot Tests")
+    print("=" * 40)
+
+    try:
+        test_path_avoids_apples()
+        test_field_patches_match_rebuild()
+        test_autopilot_wins()
+        test_autopilot_skips_dead_ends()
+        test_large_board_tick_budget()
+
+        print("\n🎉 All tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched NumPy engine
+Checks every board against SnakeEngine with the same seed
+"""
+
+import random
+import sys
+
+import numpy as np
+
+from snake_engine import SnakeEngine, Direction, FruitType, GRID_WIDTH, GRID_HEIGHT
+from batch_engine import BatchSnakeEngine
+
+def pick_action(engine, rng):
+    """Head for the nearest good fruit, avoiding walls, apples and the body"""
+    head_x, head_y = engine.snake.body[0]
+    targets = [(f.x, f.y) for f in engine.fruits if f.type != FruitType.APPLE]
+    options = []
+    for direction in Direction:
+        x, y = head_x + direction.value[0], head_y + direction.value[1]
+        if not (0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT) or engine.snake.occupies((x, y)):
+            continue
+        fruit = engine.fruit_at.get((x, y))
+        if fruit is not None and fruit.type == FruitType.APPLE:
+            continue
+        distance = min((abs(x - tx) + abs(y - ty) for tx, ty in targets), default=0)
+        options.append((distance, rng.random(), direction))
+    if not options or rng.random() < 0.02:
+        return rng.choice(list(Direction) + [None])
+    return min(options)[2]
+
+def test_batch_matches_engine():
+    """Test that each board reproduces SnakeEngine for the same seed"""
+    print("🧪 Testing Batch Engine Against SnakeEngine...")
+    
+    seeds = list(range(16))
+    engines = [SnakeEngine(seed) for seed in seeds]
+    batch = BatchSnakeEngine(seeds)
+    rng = random.Random(0)
+    best_level = 0
+    
+    for tick in range(600):
+        actions = [pick_action(engine, rng) for engine in engines]
+        for engine, action in zip(engines, actions):
+            engine.step(action)
+        batch.step(actions)
+        
+        for i, engine in enumerate(engines):
+            assert engine.score == batch.score[i], (tick, i)
+            assert engine.level == batch.level[i], (tick, i)
+            assert engine.speed == batch.speed[i], (tick, i)
+            assert engine.game_over == batch.game_over[i], (tick, i)
+            assert engine.game_won == batch.game_won[i], (tick, i)
+            assert {(f.x, f.y): f.type for f in engine.fruits} == batch.fruits(i), (tick, i)
+            if not engine.game_over:
+                assert list(engine.snake.body) == batch.snake_body(i), (tick, i)
+            best_level = max(best_level, engine.level)
+        
+        # Restart finished boards on both sides; the RNG streams carry on
+        done = batch.game_over | batch.game_won
+        for i in np.flatnonzero(done):
+            engines[i].reset_game()
+        batch.reset(done)
+    
+    assert best_level >= 1  # Level-ups were exercised
+    print("✅ Batch engine matches SnakeEngine")
+
+def test_batch_integer_actions():
+    """Test direction codes, reversal rule and wall deaths"""
+    print("🧪 Testing Batch Integer Actions...")
+    
+    batch = BatchSnakeEngine([1, 2, 3])
+    batch.fruit[:] = 0  # Empty boards so only walls matter
+    
+    # Board 0 turns up, board 1 tries to reverse, board 2 keeps going
+    up, left = 0, 2
+    batch.step(np.array([up, left, -1]))
+    assert list(batch.direction) == [up, 3, 3]
+    
+    for _ in range(GRID_WIDTH):
+        batch.step()
+    assert batch.game_over.all()
+    print("✅ Batch integer actions working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Batch Engine Tests")
+    print("=" * 40)
+    
+    try:
+        test_batch_matches_engine()
+        test_batch_integer_actions()
+        
+        print("\n🎉 All tests passed!")
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
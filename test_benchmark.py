@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark suite
+Runs tiny benchmark sizes; drawing runs in a subprocess with SDL's dummy driver
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmark import bench_long_snake, bench_move_collision, bench_spawn, bench_update, compare, result
+
+def test_engine_benchmarks():
+    """Test that engine benchmarks report one entry per size"""
+    print("🧪 Testing Engine Benchmarks...")
+
+    results = bench_move_collision((10, 1000), moves=500, repeat=1)
+    assert list(results) == ["move_collision/length=10", "move_collision/length=1000"]
+    assert all(entry["unit"] == "ns/op" and entry["value"] > 0 for entry in results.values())
+
+    results = bench_spawn((0.5, 0.99), width=50, height=50, spawns=500, repeat=1)
+    assert list(results) == ["spawn_fruit/fill=50%", "spawn_fruit/fill=99%"]
+
+    results = bench_update(games=2, repeat=1)
+    assert results["update/ticks_per_second"]["better"] == "higher"
+    assert results["update/ticks_per_second"]["value"] > 0
+
+    results = bench_long_snake(width=10, height=10, repeat=1)
+    assert results["long_snake/ticks_per_second"]["value"] > 0
+    print("✅ Engine benchmarks working correctly")
+
+def test_compare_flags_regressions():
+    """Test regression detection in both directions of 'better'"""
+    print("🧪 Testing Baseline Comparison...")
+
+    baseline = {"results": {
+        "spawn": result(100.0, "ns/op", "lower"),
+        "ticks": result(1000.0, "ticks/s", "higher"),
+        "draw": result(60.0, "fps", "higher"),
+    }}
+    current = {"results": {
+        "spawn": result(130.0, "ns/op", "lower"),   # 30% slower
+        "ticks": result(1100.0, "ticks/s", "higher"),  # Faster
+        "draw": result(50.0, "fps", "higher"),      # 20% slower
+        "new": result(1.0, "ns/op", "lower"),       # Not in the baseline
+    }}
+    rows = {row[0]: row for row in compare(current, baseline, tolerance=0.25)}
+    assert set(rows) == {"spawn", "ticks", "draw"}
+    assert rows["spawn"][4] and not rows["ticks"][4] and not rows["draw"][4]
+    assert abs(rows["draw"][3] - 0.2) < 1e-9
+    print("✅ Baseline comparison working correctly")
+
+def test_draw_benchmark_json():
+    """Test the command line: dummy-driver draw benchmark written as JSON"""
+    print("🧪 Testing Benchmark JSON Output...")
+
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.json")
+        subprocess.check_call(
+            [sys.executable, "benchmark.py", "--quick", "--only", "draw", "--json", path],
+            env=environment, cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.DEVNULL,
+        )
+        with open(path) as f:
+            data = json.load(f)
+
+        assert set(data["results"]) == {"draw/full", "draw/incremental"}
+        assert data["results"]["draw/full"]["unit"] == "fps"
+        assert "python" in data["meta"]
+
+        # Comparing a run with itself never regresses
+        code = subprocess.call(
+            [sys.executable, "benchmark.py", "--quick", "--only", "draw/incremental",
+             "--compare", path, "--tolerance", "10"],
+            env=environment, cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.DEVNULL,
+        )
+        assert code == 0
+    print("✅ Benchmark JSON output working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Benchmark Tests")
+    print("=" * 40)
+
+    try:
+        test_engine_benchmarks()
+        test_compare_flags_regressions()
+        test_draw_benchmark_json()
+
+        print("\n🎉 All tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for background frame capture
+Needs real pygame, so each test runs in a subprocess with SDL's dummy driver
+"""
+
+import os
+import subprocess
+import sys
+
+def run_with_pygame(code):
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    subprocess.check_call([sys.executable, "-c", code], env=environment,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+
+def test_capture_formats():
+    """Test that raw and PNG output match the frames that were drawn"""
+    print("🧪 Testing Capture Formats...")
+
+    run_with_pygame("""
+import json, os, tempfile
+import numpy as np, pygame
+from snake_game import SnakeGame
+
+for image_format in ("raw", "png"):
+    directory = tempfile.mkdtemp()
+    game = SnakeGame(seed=1, incremental=True, autopilot=True, grid_width=30, grid_height=20)
+    game.start_capture(directory, image_format)
+    frames = []
+    for _ in range(12):
+        game.update()
+        game.draw()
+        frames.append(pygame.surfarray.array3d(game.screen).transpose(1, 0, 2))
+    stats = game.stop_capture()
+    assert stats["frames"] + stats["dropped"] == 12 and stats["width"] == 600
+    with open(os.path.join(directory, "capture.json")) as f:
+        assert json.load(f) == stats
+
+    numbers = [int(line.split(",")[0]) for line in open(os.path.join(directory, "frames.csv")).readlines()[1:]]
+    if image_format == "raw":
+        video = np.fromfile(os.path.join(directory, "frames.rgb"), np.uint8).reshape(-1, 400, 600, 3)
+        saved = list(video)
+    else:
+        saved = [pygame.surfarray.array3d(pygame.image.load(os.path.join(directory, f"frame_{n:06d}.png")))
+                 .transpose(1, 0, 2) for n in numbers]
+    assert len(saved) == stats["frames"]
+    for number, frame in zip(numbers, saved):
+        assert (frame == frames[number]).all(), (image_format, number)
+""")
+    print("✅ Capture formats working correctly")
+
+def test_slow_writer_drops_frames():
+    """Test that a stalled writer drops and counts frames instead of blocking grab()"""
+    print("🧪 Testing Frame Drops...")
+
+    run_with_pygame("""
+import tempfile, time
+import pygame
+from frame_capture import FrameCapture
+
+class SlowCapture(FrameCapture):
+    def _write_png(self, path):
+        time.sleep(0.05)
+
+surface = pygame.Surface((64, 48), 0, 32)
+capture = SlowCapture(tempfile.mkdtemp(), surface.get_size(), "png", pool_size=2)
+slowest = 0.0
+for _ in range(20):
+    started = time.perf_counter()
+    capture.grab(surface)
+    slowest = max(slowest, time.perf_counter() - started)
+stats = capture.close()
+assert stats["dropped"] >= 10, stats
+assert stats["frames"] + stats["dropped"] == 20
+assert slowest < 0.02, slowest
+""")
+    print("✅ Frame drops working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Frame Capture Tests")
+    print("=" * 40)
+
+    try:
+        test_capture_formats()
+        test_slow_writer_drops_frames()
+
+        print("\n🎉 All tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-phase frame profiler
+Uses a fake clock, so timings are exact; runs without pygame
+"""
+
+import csv
+import json
+import os
+import sys
+import tempfile
+
+from frame_profiler import FrameProfiler, PHASES
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+def play_frame(profiler, clock, draw_ui=0.002):
+    # events 1 ms, update 3 ms, draw 5 ms of which draw_ui is nested, flip 1 ms, wait 6 ms
+    steps = (("events", 0.001), ("update", 0.003))
+    for phase, seconds in steps:
+        profiler.wrap(phase, clock.advance)(seconds)
+    
+    def draw():
+        clock.advance(0.003)
+        profiler.wrap("draw_ui", clock.advance)(draw_ui)
+        profiler.wrap("flip", clock.advance)(0.001)
+    
+    profiler.wrap("draw", draw)()
+    clock.advance(0.006)
+    profiler.next_frame()
+
+def test_exclusive_phase_times():
+    """Test that nested phases are not counted in their parent"""
+    print("🧪 Testing Exclusive Phase Times...")
+    
+    clock = FakeClock()
+    profiler = FrameProfiler(size=8, clock=clock)
+    profiler.next_frame()
+    play_frame(profiler, clock)
+    
+    timings = {phase: profiler.samples[index][0] for index, phase in enumerate(PHASES)}
+    expected = {"events": 0.001, "update": 0.003, "draw": 0.003, "draw_ui": 0.002, "flip": 0.001, "wait": 0.006}
+    for phase, seconds in expected.items():
+        assert abs(timings[phase] - seconds) < 1e-12, (phase, timings[phase])
+    assert abs(profiler.totals[0] - 0.016) < 1e-12
+    print("✅ Exclusive phase times working correctly")
+
+def test_rolling_percentiles():
+    """Test that the ring buffer keeps only the last frames for p50, p99 and max"""
+    print("🧪 Testing Rolling Percentiles...")
+    
+    clock = FakeClock()
+    profiler = FrameProfiler(size=100, clock=clock)
+    profiler.next_frame()
+    # One slow draw_ui frame, then 150 normal ones push it out of the window
+    play_frame(profiler, clock, draw_ui=0.100)
+    assert profiler.stats()["draw_ui"][2] > 0.099
+    for _ in range(150):
+        play_frame(profiler, clock)
+    
+    assert profiler.frames == 151
+    p50, p99, peak = profiler.stats()["draw_ui"]
+    assert abs(p50 - 0.002) < 1e-9 and abs(peak - 0.002) < 1e-9
+    assert len(profiler.summary()) == len(PHASES) + 2
+    print("✅ Rolling percentiles working correctly")
+
+def test_exports():
+    """Test the per-frame CSV and trace-event exports"""
+    print("🧪 Testing Profiler Exports...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("frames.csv", "frames.json"):
+            clock = FakeClock()
+            profiler = FrameProfiler(size=4, export_path=os.path.join(directory, name), clock=clock)
+            profiler.next_frame()
+            for _ in range(10):
+                play_frame(profiler, clock)
+            profiler.close()
+        
+        # Every frame is exported, not just the ones still in the ring
+        with open(os.path.join(directory, "frames.csv")) as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 10
+        assert float(rows[-1]["draw_ms"]) == 3.0 and float(rows[-1]["total_ms"]) == 16.0
+        
+        with open(os.path.join(directory, "frames.json")) as f:
+            events = json.load(f)
+        assert len(events) == 10 * 6
+        draw = next(event for event in events if event["name"] == "draw")
+        # Trace events carry inclusive durations, so nesting shows in the viewer
+        assert abs(draw["dur"] - 6000) < 1e-6 and draw["ph"] == "X"
+    print("✅ Profiler exports working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Frame Profiler Tests")
+    print("=" * 40)
+    
+    try:
+        test_exclusive_phase_times()
+        test_rolling_percentiles()
+        test_exports()
+        
+        print("\n🎉 All tests passed!")
+        return True
+    
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -4,6 +4,7 @@ Test script for game logic validation
 Tests core game mechanics without requiring pygame
 """
 
+import os
 import sys
 from enum import Enum
 
@@ -13,6 +14,8 @@ class MockPygame:
     def quit(self): pass
     
     class display:
+        @staticmethod
+        def init(): pass
         @staticmethod
         def set_mode(size): return None
         @staticmethod
@@ -25,6 +28,9 @@ class MockPygame:
             def tick(self, fps): pass
     
     class font:
+        @staticmethod
+        def init(): pass
+        
         class Font:
             def __init__(self, font, size): pass
             def render(self, text, antialias, color): 
@@ -55,7 +61,8 @@ class MockPygame:
 sys.modules['pygame'] = MockPygame()
 
 # Now import our game classes
-from snake_game import FruitType, Direction, Snake, Fruit, SnakeGame
+from snake_game import FruitType, Direction, Snake, Fruit, SnakeGame, TextCache, Camera
+from autopilot import Autopilot
 
 def test_fruit_types():
     """Test fruit type enumeration"""
@@ -129,6 +136,27 @@ def test_collision_detection():
     assert snake.check_collision() == True
     print("✅ Wall collision detection working")
 
+def test_self_collision():
+    """Test self collision against the occupancy index"""
+    print("🧪 Testing Self Collision...")
+    
+    # Head turning back into its own body
+    snake = Snake()
+    snake.body = [(5, 5), (6, 5), (6, 6), (5, 6), (4, 6)]
+    snake.direction = Direction.DOWN
+    snake.move()
+    assert snake.check_collision() == True
+    
+    # Chasing the tail is safe because the tail moves away first
+    snake = Snake()
+    snake.body = [(5, 5), (6, 5), (6, 6), (5, 6)]
+    snake.direction = Direction.DOWN
+    snake.move()
+    assert snake.check_collision() == False
+    assert list(snake.body) == [(5, 6), (5, 5), (6, 5), (6, 6)]
+    assert not snake.occupies((5, 7))
+    print("✅ Self collision detection working")
+
 def test_game_initialization():
     """Test game initialization"""
     print("🧪 Testing Game Initialization...")
@@ -157,6 +185,258 @@ def test_game_initialization():
     
     print("✅ Game initialization working correctly")
 
+def test_free_cell_spawning():
+    """Test fruit spawning from the free-cell index"""
+    print("🧪 Testing Free-Cell Spawning...")
+    
+    game = SnakeGame()
+    occupied = set(game.snake.body) | {(f.x, f.y) for f in game.fruits}
+    assert len(occupied) == len(game.snake.body) + len(game.fruits)
+    assert not any(cell in game.free_cells for cell in occupied)
+    
+    # Leave a single empty cell: the next spawn must land on it
+    last_cell = next(iter(game.free_cells))
+    for cell in list(game.free_cells):
+        if cell != last_cell:
+            game.free_cells.discard(cell)
+    fruit = game.spawn_fruit(FruitType.BERRY)
+    assert (fruit.x, fruit.y) == last_cell
+    
+    # Full board: no fruit and no endless retry loop
+    assert game.spawn_fruit(FruitType.BERRY) is None
+    print("✅ Free-cell spawning working correctly")
+
+def test_fruit_lookup():
+    """Test eating fruit through the position-to-fruit map"""
+    print("🧪 Testing Fruit Lookup...")
+    
+    game = SnakeGame()
+    head_x, head_y = game.snake.body[0]
+    target = (head_x + 1, head_y)
+    
+    # Put a berry directly in front of the snake
+    if target in game.fruit_at:
+        game.free_cells.add(target)
+        del game.fruit_at[target]
+    game.free_cells.discard(target)
+    game.fruit_at[target] = Fruit(FruitType.BERRY, *target)
+    fruit_count = len(game.fruits)
+    
+    game.update()
+    
+    assert game.score == 10
+    assert game.snake.grow_pending == 1
+    assert game.fruit_at.get(target) is None
+    assert len(game.fruits) == fruit_count  # Eaten fruit was replaced
+    print("✅ Fruit lookup working correctly")
+
+def test_dirty_cell_tracking():
+    """Test that incremental mode records the cells a tick changes"""
+    print("🧪 Testing Dirty Cell Tracking...")
+    
+    game = SnakeGame(incremental=True)
+    game._dirty_cells.clear()
+    tail = game.snake.body[-1]
+    
+    game.update()
+    
+    assert tail in game._dirty_cells
+    assert game.snake.body[0] in game._dirty_cells
+    
+    # Full mode keeps no dirty list
+    game = SnakeGame()
+    game.update()
+    assert game._dirty_cells == []
+    print("✅ Dirty cell tracking working correctly")
+
+def test_text_cache():
+    """Test text surface caching and LRU eviction"""
+    print("🧪 Testing Text Cache...")
+    
+    class CountingFont:
+        def __init__(self):
+            self.renders = 0
+        def render(self, text, antialias, color):
+            self.renders += 1
+            return object()
+    
+    font = CountingFont()
+    cache = TextCache(maxsize=2)
+    
+    first = cache.render(font, "Score: 0", (255, 255, 255))
+    assert cache.render(font, "Score: 0", (255, 255, 255)) is first
+    assert font.renders == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    
+    # A different color is a different surface
+    cache.render(font, "Score: 0", (255, 0, 0))
+    assert font.renders == 2
+    
+    # "Score: 0" in white was used least recently, so it is evicted
+    cache.render(font, "Score: 10", (255, 255, 255))
+    assert len(cache) == 2
+    cache.render(font, "Score: 0", (255, 255, 255))
+    assert font.renders == 4
+    print("✅ Text cache working correctly")
+
+def test_turn_queue():
+    """Test that quick turns are queued and applied one per tick"""
+    print("🧪 Testing Turn Queue...")
+    
+    game = SnakeGame(fixed_timestep=True)
+    game.fruit_at.clear()
+    
+    # UP then LEFT within one tick: both must take effect, in order
+    game.steer(Direction.UP)
+    game.steer(Direction.LEFT)
+    assert game.snake.direction == Direction.RIGHT  # Nothing applied yet
+    
+    game.apply_pending_turn()
+    game.update()
+    assert game.snake.direction == Direction.UP
+    game.apply_pending_turn()
+    game.update()
+    assert game.snake.direction == Direction.LEFT
+    assert len(game.input_latencies) == 0  # Measured only once a frame is shown
+    
+    # The queue is bounded
+    for direction in [Direction.UP, Direction.LEFT, Direction.DOWN, Direction.RIGHT, Direction.UP]:
+        game.steer(direction)
+    assert len(game.pending_turns) == game.max_pending_turns
+    print("✅ Turn queue working correctly")
+
+def test_camera():
+    """Test that the camera scrolls near the edges and stays on the board"""
+    print("🧪 Testing Camera...")
+    
+    camera = Camera(40, 30, 500, 500)
+    camera.center_on((250, 250))
+    assert (camera.x, camera.y) == (230, 235)
+    
+    # Moving inside the middle of the window does not scroll
+    assert not camera.follow((255, 250))
+    # Within the margin of the right edge it scrolls just enough
+    assert camera.follow((270, 250))
+    assert camera.contains((270, 250))
+    assert camera.x + camera.width - 1 - 270 == camera.margin
+    
+    # Clamped at the board edges
+    camera.center_on((0, 499))
+    assert (camera.x, camera.y) == (0, 470)
+    
+    # A board smaller than the window never scrolls
+    small = Camera(40, 30, 20, 10)
+    assert (small.width, small.height) == (20, 10)
+    assert not small.follow((19, 9))
+    
+    game = SnakeGame(seed=1, grid_width=500, grid_height=500)
+    assert (game.screen_width, game.screen_height) == (800, 600)
+    assert game.camera.contains(game.snake.body[0])
+    print("✅ Camera working correctly")
+
+def test_lazy_pygame_init():
+    """Test that importing the game starts no pygame subsystem"""
+    print("🧪 Testing Lazy Pygame Init...")
+    
+    import subprocess
+    code = ("import sys, snake_game, pygame; "
+            "sys.exit(pygame.display.get_init() or pygame.mixer.get_init() is not None)")
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    assert subprocess.call([sys.executable, "-c", code], env=environment) == 0
+    
+    game = SnakeGame()
+    assert list(game.startup_times) == ["import", "init", "display", "fonts", "game"]
+    assert "first_frame" not in game.startup_report()
+    print("✅ Lazy pygame init working correctly")
+
+def test_profiler_hooks():
+    """Test that the profiler wraps phases only while enabled"""
+    print("🧪 Testing Profiler Hooks...")
+    
+    game = SnakeGame(seed=1)
+    assert game.profiler is None and "update" not in game.__dict__
+    
+    profiler = game.enable_profiler()
+    for _ in range(3):
+        profiler.next_frame()
+        game.update()
+        game.present()
+    profiler.next_frame()
+    assert profiler.frames == 3
+    assert set(profiler.stats()) == {"frame", "events", "update", "draw", "draw_ui", "flip", "wait"}
+    
+    # Disabled again, the class methods are back with no wrapper left behind
+    game.disable_profiler()
+    assert game.profiler is None
+    assert not any(name in game.__dict__ for name in ("handle_events", "update", "draw", "draw_ui", "present"))
+    print("✅ Profiler hooks working correctly")
+
+def test_practice_rewind():
+    """Test that practice mode rewinds a crash"""
+    print("🧪 Testing Practice Rewind...")
+    
+    game = SnakeGame(seed=1, practice=True)
+    start = list(game.snake.body)
+    while not game.game_over:
+        game.update()
+    ticks = len(game.rewind)
+    
+    assert game.rewind_seconds(1.0) == game.speed
+    assert not game.game_over and game.death_cause is None
+    assert game.rewind_seconds(60) == ticks - game.speed
+    assert list(game.snake.body) == start
+    
+    # The autopilot drops the path it planned before the rewind
+    game = SnakeGame(seed=1, autopilot=True, practice=True)
+    for _ in range(6):
+        game.update()
+    game.rewind_seconds(0.4)
+    for _ in range(20):
+        game.update()
+    assert not game.game_over
+    
+    # Plain games keep no history
+    assert SnakeGame(seed=1).rewind is None
+    print("✅ Practice rewind working correctly")
+
+def test_idle_screens():
+    """Test pause, and that static screens send the loop to sleep"""
+    print("🧪 Testing Idle Screens...")
+    
+    game = SnakeGame(seed=1)
+    assert not game.is_idle()
+    game.paused = True
+    body = list(game.snake.body)
+    game.update()
+    assert list(game.snake.body) == body and game.is_idle()
+    
+    game.paused = False
+    game.game_over = True
+    assert game.is_idle()
+    game.autopilot = Autopilot()  # Attract mode restarts on its own
+    assert not game.is_idle()
+    
+    # A real loop on the game-over screen draws once, then waits for events
+    import subprocess
+    code = """
+import pygame
+from snake_game import SnakeGame
+game = SnakeGame(seed=1, fixed_timestep=True)
+game.game_over = True
+frames = []
+draw = game.draw
+game.draw = lambda: frames.append(draw())
+pygame.time.set_timer(pygame.QUIT, 500, 1)
+try:
+    game.run()
+except SystemExit:
+    pass
+assert len(frames) == 1, len(frames)
+"""
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    assert subprocess.call([sys.executable, "-c", code], env=environment) == 0
+    print("✅ Idle screens working correctly")
+
 def test_level_progression():
     """Test level progression logic"""
     print("🧪 Testing Level Progression...")
@@ -214,7 +494,18 @@ def run_all_tests():
         test_snake_movement()
         test_snake_growth()
         test_collision_detection()
+        test_self_collision()
         test_game_initialization()
+        test_free_cell_spawning()
+        test_fruit_lookup()
+        test_dirty_cell_tracking()
+        test_text_cache()
+        test_turn_queue()
+        test_camera()
+        test_lazy_pygame_init()
+        test_profiler_hooks()
+        test_practice_rewind()
+        test_idle_screens()
         test_level_progression()
         test_win_condition()
         
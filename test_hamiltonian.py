@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the Hamiltonian-cycle solver
+Runs without pygame or any mocking
+"""
+
+import sys
+import time
+
+from bots import load_policy
+from hamiltonian import CycleCache, HamiltonianSolver, build_cycle
+from snake_engine import DEFAULT_RULES, FruitType, SnakeEngine
+
+def check_cycle(cycle, width, apples):
+    order, position = cycle
+    assert len(set(order)) == len(order)
+    for index, cell in enumerate(order):
+        following = order[(index + 1) % len(order)]
+        assert abs(following - cell) == width or (abs(following - cell) == 1 and following // width == cell // width)
+        assert position[cell] == index and cell not in apples
+
+def test_cycle_covers_board():
+    """Test that cycles cover every cell on even boards and avoid apples"""
+    print("🧪 Testing Cycle Construction...")
+
+    for width, height in ((40, 30), (7, 6), (2, 2)):
+        cycle = build_cycle(width, height)
+        check_cycle(cycle, width, ())
+        assert len(cycle.order) == width * height
+
+    # Each apple costs at most its own cell and one more for parity
+    apples = frozenset({0, 41, 599, 1199, 630, 631})
+    cycle = build_cycle(40, 30, apples)
+    check_cycle(cycle, 40, apples)
+    assert len(cycle.order) >= 1200 - 2 * len(apples)
+    print("✅ Cycle construction working correctly")
+
+def test_cycles_cached_per_layout():
+    """Test that restarting a level reuses its cycle"""
+    print("🧪 Testing Cycle Cache...")
+
+    cache = CycleCache()
+    engine = SnakeEngine(5)
+    solver = HamiltonianSolver(cache)
+    solver.drive(engine)
+    engine.reset_game(5)
+    solver.drive(engine)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert solver.stats["cycles"] == 2
+
+    engine.reset_game(6)
+    solver.drive(engine)
+    assert cache.misses == 2 and len(cache) == 2
+    print("✅ Cycle cache working correctly")
+
+def test_large_cycle_built_over_ticks():
+    """Test that a cycle too big for one tick is built over several while the autopilot drives"""
+    print("🧪 Testing Budgeted Cycle Build...")
+
+    engine = SnakeEngine(1, width=300, height=300)
+    solver = HamiltonianSolver(CycleCache())
+    slowest = 0.0
+    while solver.cycle is None:
+        started = time.perf_counter()
+        solver.drive(engine)
+        slowest = max(slowest, time.perf_counter() - started)
+        engine.update()
+        assert not engine.game_over, engine.death_cause
+    assert solver.stats["build_ticks"] > 1
+    assert slowest < 0.1, slowest
+
+    apples = frozenset(y * 300 + x for (x, y), fruit in engine.fruit_at.items() if fruit.type == FruitType.APPLE)
+    assert solver.cycle == build_cycle(300, 300, apples)
+    assert solver.cache.lookup(300, 300, apples) is solver.cycle
+    print("✅ Budgeted cycle build working correctly")
+
+def test_solver_wins():
+    """Test that the solver clears the game on default rules, via the bot registry"""
+    print("🧪 Testing Solver Games...")
+
+    for seed in range(3):
+        engine = SnakeEngine(seed)
+        solver = load_policy("hamiltonian")
+        assert isinstance(solver, HamiltonianSolver)
+        ticks = 0
+        while not (engine.game_over or engine.game_won) and ticks < 10000:
+            solver.drive(engine)
+            engine.update()
+            ticks += 1
+        assert engine.game_won, (seed, engine.death_cause)
+        assert solver.stats["shortcuts"] > 0
+    print("✅ Solver games working correctly")
+
+def test_solver_fills_board():
+    """Test that one endless level ends with the snake filling its whole cycle"""
+    print("🧪 Testing Long Snake...")
+
+    rules = DEFAULT_RULES._replace(fruits_needed_per_level=10 ** 6, last_level=0)
+    engine = SnakeEngine(2, rules, 12, 10)
+    solver = HamiltonianSolver()
+    ticks = 0
+    while engine.free_cells and ticks < 50000:
+        solver.drive(engine)
+        engine.update()
+        ticks += 1
+        assert not engine.game_over, (ticks, engine.death_cause)
+    assert not engine.free_cells
+    assert len(engine.snake.body) + engine.snake.grow_pending >= len(solver.cycle.order) - 1
+    assert solver.stats["fallbacks"] == 0
+    print("✅ Long snake working correctly")
+
+def test_solver_fetches_off_cycle_fruit():
+    """Test that fruit on cells the cycle misses is still eaten on an odd-sized board"""
+    print("🧪 Testing Off-Cycle Fruit...")
+
+    rules = DEFAULT_RULES._replace(fruits_needed_per_level=10 ** 6, last_level=0)
+    for seed in (1, 3):
+        engine = SnakeEngine(seed, rules, 21, 15)
+        solver = HamiltonianSolver()
+        ticks = 0
+        while ticks < 30000:
+            solver.drive(engine)
+            engine.update()
+            ticks += 1
+            assert not engine.game_over, (seed, ticks, engine.death_cause)
+            if len(engine.snake.body) >= len(solver.cycle.order) - 1:
+                break
+        assert len(engine.snake.body) >= len(solver.cycle.order) - 1, (seed, len(engine.snake.body))
+        assert solver.stats["detours"] > 0
+    print("✅ Off-cycle fruit working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Hamiltonian Solver Tests")
+    print("=" * 40)
+
+    try:
+        test_cycle_covers_board()
+        test_cycles_cached_per_layout()
+        test_large_cycle_built_over_ticks()
+        test_solver_wins()
+        test_solver_fills_board()
+        test_solver_fetches_off_cycle_fruit()
+
+        print("\n🎉 All tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
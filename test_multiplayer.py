@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Test script for the multiplayer server
+Engine and codec tests run headless; the server tests use localhost sockets
+"""
+
+import asyncio
+import random
+import sys
+
+from multiplayer import (
+    DELTA, SNAPSHOT, BoardView, Client, MultiSnakeEngine, SnakeClient, SnakeServer,
+    decode_frame, encode_frame, run_bots, LENGTH,
+)
+from snake_engine import DEFAULT_RULES, Direction, Fruit, FruitType
+
+NO_FRUIT = DEFAULT_RULES._replace(max_apples=0, base_good_fruits=0)
+
+def place(engine, body, direction):
+    # A new snake moved onto the given cells
+    snake_id = engine.add_snake()
+    snake = engine.snakes[snake_id]
+    for cell in snake.body:
+        engine._vacate(cell)
+    snake.body = body
+    snake.direction = direction
+    for cell in body:
+        engine._occupy(cell)
+    return snake_id
+
+def test_engine_collisions():
+    """Test snake-vs-snake, tail-following, apple and fruit rules"""
+    print("🧪 Testing Multiplayer Rules...")
+
+    engine = MultiSnakeEngine(1, rules=NO_FRUIT, width=40, height=40, respawn_ticks=3)
+    engine.good_fruit_count = 1 << 30  # Nothing topped up
+    left = place(engine, [(5, 5)], Direction.RIGHT)
+    right = place(engine, [(7, 5)], Direction.LEFT)
+    leader = place(engine, [(20, 20), (21, 20)], Direction.LEFT)
+    follower = place(engine, [(22, 20)], Direction.LEFT)
+    loop = place(engine, [(10, 10), (11, 10), (11, 11), (10, 11)], Direction.DOWN)
+    eater = place(engine, [(30, 30)], Direction.UP)
+    victim = place(engine, [(30, 5)], Direction.UP)
+    engine.fruit_at[(30, 29)] = Fruit(FruitType.BERRY, 30, 29)
+    engine.fruit_at[(30, 4)] = Fruit(FruitType.APPLE, 30, 4)
+    engine.take_events()
+
+    engine.tick()
+    # Head to head kills both; following a tail, even your own, is fine
+    assert set(engine.snakes) == {leader, follower, loop, eater}
+    assert engine.scores[eater] == 10 and (30, 29) not in engine.fruit_at
+    assert (30, 4) in engine.fruit_at and (30, 4) not in engine.free_cells
+    assert (6, 5) not in engine.occupied and (6, 5) in engine.free_cells
+    engine.tick()
+    assert len(engine.snakes[eater].body) == 2
+
+    # Every occupied cell is out of the free-cell index, every other empty cell is in it
+    assert not any(cell in engine.free_cells for cell in engine.occupied)
+    assert len(engine.free_cells) + len(engine.occupied) + len(engine.fruit_at) == 40 * 40
+
+    # The dead respawn after respawn_ticks
+    engine.tick()
+    assert {left, right, victim} <= set(engine.snakes)
+    print("✅ Multiplayer rules working correctly")
+
+def test_view_follows_deltas():
+    """Test that snapshot plus encoded deltas rebuild the engine's board exactly"""
+    print("🧪 Testing Delta Frames...")
+
+    engine = MultiSnakeEngine(3, width=30, height=30, respawn_ticks=5)
+    ids = [engine.add_snake() for _ in range(20)]
+    view = BoardView()
+    view.apply(*decode_frame(encode_frame(SNAPSHOT, 0, engine.snapshot_events())[LENGTH.size:]))
+    engine.take_events()
+    rng = random.Random(3)
+    sizes = []
+    for tick in range(300):
+        for snake_id in ids:
+            if rng.random() < 0.3:
+                engine.steer(snake_id, rng.choice(list(Direction)))
+        if tick == 150:
+            engine.remove_snake(ids.pop())
+            ids.append(engine.add_snake())
+        engine.tick()
+        frame = encode_frame(DELTA, engine.tick_count, engine.take_events())
+        sizes.append(len(frame))
+        view.apply(*decode_frame(frame[LENGTH.size:]))
+
+        assert {i: list(body) for i, body in view.snakes.items()} == \
+            {i: list(snake.body) for i, snake in engine.snakes.items()}
+        assert view.fruit_at == {cell: fruit.type for cell, fruit in engine.fruit_at.items()}
+        assert view.occupied == engine.occupied
+        assert all(view.scores[i] == engine.scores[i] for i in engine.snakes)
+    # Deltas stay small: a few events per snake, not the board
+    assert max(sizes) < 20 * 7 * 8
+    print("✅ Delta frames working correctly")
+
+class FakeTransport:
+    def __init__(self):
+        self.buffered = 0
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+class FakeWriter:
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.frames = []
+
+    def write(self, data):
+        self.frames.append(decode_frame(data[LENGTH.size:])[0])
+
+def test_slow_client_skips_and_resyncs():
+    """Test that a backed-up client skips deltas, then gets a snapshot"""
+    print("🧪 Testing Slow Client Handling...")
+
+    server = SnakeServer(MultiSnakeEngine(5), max_buffer=1000)
+    fast, slow = FakeWriter(), FakeWriter()
+    for writer in (fast, slow):
+        snake_id = server.engine.add_snake()
+        server.clients[snake_id] = Client(snake_id, writer)
+
+    slow.transport.buffered = 5000
+    for _ in range(3):
+        server.tick()
+    slow.transport.buffered = 700  # Still above half of max_buffer
+    server.tick()
+    slow.transport.buffered = 0
+    server.tick()
+    server.tick()
+    assert fast.frames == [DELTA] * 6
+    assert slow.frames == [SNAPSHOT, DELTA]
+    assert server.stats["frames_skipped"] == 4 and server.stats["resyncs"] == 1
+    print("✅ Slow client handling working correctly")
+
+def test_failed_welcome_cleans_up():
+    """Test that a client failing during setup leaves no snake behind"""
+    print("🧪 Testing Setup Cleanup...")
+
+    class BrokenWriter(FakeWriter):
+        def write(self, data):
+            raise ConnectionResetError
+
+        def get_extra_info(self, name):
+            return None
+
+        def close(self):
+            self.closed = True
+
+    server = SnakeServer(MultiSnakeEngine(5))
+    writer = BrokenWriter()
+    try:
+        asyncio.run(server.handle_client(None, writer))
+    except ConnectionResetError:
+        pass
+    assert writer.closed
+    assert not server.clients and not server.engine.snakes and not server.engine.scores
+    server.tick()
+    print("✅ Setup cleanup working correctly")
+
+def test_big_snapshot_and_broken_client():
+    """Test snapshots past 65,535 events, and a client whose writes fail"""
+    print("🧪 Testing Big Snapshots...")
+
+    engine = MultiSnakeEngine(3, rules=NO_FRUIT, width=300, height=300)
+    engine.good_fruit_count = 1 << 30
+    rows = 240
+    body = [(x if y % 2 else 299 - x, y) for y in range(rows - 1, -1, -1) for x in range(300)]
+    snake_id = place(engine, body, Direction.DOWN)
+    server = SnakeServer(engine)
+    kind, tick, events = decode_frame(server.snapshot()[LENGTH.size:])
+    assert kind == SNAPSHOT and len(events) > 65535
+    view = BoardView()
+    view.apply(kind, tick, events)
+    assert list(view.snakes[snake_id]) == body
+
+    class BrokenWriter(FakeWriter):
+        def write(self, data):
+            raise RuntimeError("transport closed")
+
+        def close(self):
+            self.closed = True
+
+    broken, healthy = BrokenWriter(), FakeWriter()
+    server.clients[snake_id] = Client(snake_id, broken)
+    other = engine.add_snake()
+    server.clients[other] = Client(other, healthy)
+    asyncio.run(server.run_ticks(3))
+    assert broken.closed and snake_id not in server.clients
+    assert healthy.frames == [DELTA] * 3
+    assert server.stats["dropped_clients"] == 1 and server.stats["failed_ticks"] == 0
+    print("✅ Big snapshots working correctly")
+
+def test_server_round_trip():
+    """Test many clients over localhost: welcome, snapshot, deltas and steering"""
+    print("🧪 Testing Server Round Trip...")
+
+    async def scenario():
+        server = SnakeServer(MultiSnakeEngine(7, width=60, height=60), tick_rate=50)
+        server.engine._next_id = 1 << 16  # As after 65,536 earlier connections
+        listener = await server.start("127.0.0.1", 0)
+        clients = [await SnakeClient.connect("127.0.0.1", server.port) for _ in range(100)]
+        for client in clients:
+            await client.receive()  # Snapshot
+        while len(server.clients) < 100:
+            await asyncio.sleep(0.01)
+
+        # A quarter turn is always accepted
+        first = clients[0]
+        heading = server.engine.snakes[first.snake_id].direction
+        direction = Direction.UP if heading in (Direction.LEFT, Direction.RIGHT) else Direction.LEFT
+        first.steer(direction)
+        while first.snake_id not in server.turns:
+            await asyncio.sleep(0.01)
+
+        for _ in range(5):
+            server.tick()
+        for client in clients:
+            for _ in range(5):
+                await client.receive()
+        engine = server.engine
+        for client in clients:
+            assert client.view.tick == engine.tick_count
+            assert {i: list(body) for i, body in client.view.snakes.items()} == \
+                {i: list(snake.body) for i, snake in engine.snakes.items()}
+        if first.snake_id in engine.snakes:
+            assert engine.snakes[first.snake_id].direction is direction
+
+        for client in clients:
+            client.close()
+        while server.clients:
+            await asyncio.sleep(0.01)
+        listener.close()
+        await listener.wait_closed()
+        return engine
+
+    engine = asyncio.run(scenario())
+    assert not engine.snakes and not engine.occupied
+    print("✅ Server round trip working correctly")
+
+def test_bots_without_clients():
+    """Test that the bot load test copes with no bots, or none connecting"""
+    print("🧪 Testing Bots Without Clients...")
+
+    assert asyncio.run(run_bots("127.0.0.1", 0, 0, 0)) == (0, 0)
+
+    async def refused():
+        # A listener that is closed again leaves a port nobody answers on
+        listener = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        listener.close()
+        await listener.wait_closed()
+        return await run_bots("127.0.0.1", port, 3, 0)
+
+    assert asyncio.run(refused()) == (0, 0)
+    print("✅ Bots without clients working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Multiplayer Tests")
+    print("=" * 40)
+
+    try:
+        test_engine_collisions()
+        test_view_follows_deltas()
+        test_slow_client_skips_and_resyncs()
+        test_failed_welcome_cleans_up()
+        test_big_snapshot_and_broken_client()
+        test_server_round_trip()
+        test_bots_without_clients()
+
+        print("\n🎉 All tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for replay recording and playback
+Runs headlessly against the rules engine
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+from snake_engine import MAX_SEED, SnakeEngine, Direction, parse_seed
+from replay import ReplayRecorder, HEADER, load_replay, play_replay, read_replay
+from rewind import ReplaySeeker
+
+def play_random_game(seed, turn_seed):
+    """Play one game with random turns while recording it"""
+    finished = []
+    engine = SnakeEngine(seed)
+    ReplayRecorder(on_finish=finished.append).attach(engine)
+    rng = random.Random(turn_seed)
+    while not (engine.game_over or engine.game_won):
+        if rng.random() < 0.3:
+            engine.snake.change_direction(rng.choice(list(Direction)))
+        engine.update()
+    return engine, finished
+
+def test_seeded_games_repeat():
+    """Test that a seed reproduces the fruit layout"""
+    print("🧪 Testing Seeded Games...")
+    
+    first = SnakeEngine(1234)
+    second = SnakeEngine(1234)
+    assert first.seed == 1234
+    assert set(first.fruit_at) == set(second.fruit_at)
+    
+    # Restarts draw fresh but reproducible seeds
+    first.reset_game()
+    second.reset_game()
+    assert first.seed == second.seed != 1234
+    assert set(first.fruit_at) == set(second.fruit_at)
+    
+    # Only seeds that fit the replay header are accepted
+    for seed in (-1, MAX_SEED + 1):
+        try:
+            SnakeEngine(seed)
+            assert False, seed
+        except ValueError:
+            pass
+        try:
+            parse_seed(str(seed))
+            assert False, seed
+        except ValueError:
+            pass
+    _, finished = play_random_game(MAX_SEED, 0)
+    assert play_replay(finished[0].to_bytes()).seed == MAX_SEED
+    print("✅ Seeded games working correctly")
+
+def test_replay_round_trip():
+    """Test that playing a replay reproduces the recorded game"""
+    print("🧪 Testing Replay Round Trip...")
+    
+    for seed in range(20):
+        engine, finished = play_random_game(seed, seed + 100)
+        assert len(finished) == 1
+        recorder = finished[0]
+        data = recorder.to_bytes()
+        assert len(data) == HEADER.size + len(recorder.ticks)  # One byte per tick
+        
+        replayed = play_replay(data)
+        assert replayed.game_over == engine.game_over
+        assert replayed.score == engine.score
+        assert replayed.level == engine.level
+        assert list(replayed.snake.body) == list(engine.snake.body)
+    print("✅ Replay round trip working correctly")
+
+def test_two_turns_in_one_tick():
+    """Test that a quarter turn and a second one before the next tick replay exactly"""
+    print("🧪 Testing Double Turns...")
+    
+    engine = SnakeEngine(11)
+    recorder = ReplayRecorder().attach(engine)
+    engine.snake.direction = Direction.RIGHT
+    recorder.start(engine)
+    for tick in range(12):
+        if tick in (2, 7):
+            # UP then LEFT is recorded as LEFT, a reversal of RIGHT on its own
+            engine.snake.change_direction(Direction.UP)
+            engine.snake.change_direction(Direction.LEFT)
+        elif tick == 5:
+            engine.snake.change_direction(Direction.RIGHT)
+        engine.update()
+    
+    data = recorder.to_bytes()
+    assert list(play_replay(data).snake.body) == list(engine.snake.body)
+    seeker = ReplaySeeker(load_replay(data))
+    assert list(seeker.seek(12).snake.body) == list(engine.snake.body)
+    print("✅ Double turns working correctly")
+
+def test_replay_files():
+    """Test saving, loading and rejecting bad replays"""
+    print("🧪 Testing Replay Files...")
+    
+    engine, finished = play_random_game(7, 8)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.snr")
+        finished[0].save(path)
+        replay = read_replay(path)
+    assert replay.seed == 7
+    assert play_replay(replay).score == engine.score
+    
+    # The grid size travels with the replay
+    engine = SnakeEngine(9, width=120, height=90)
+    recorder = ReplayRecorder().attach(engine)
+    for _ in range(50):
+        engine.update()
+    replay = load_replay(recorder.to_bytes())
+    assert (replay.width, replay.height) == (120, 90)
+    assert play_replay(replay).snake.body == engine.snake.body
+    
+    try:
+        load_replay(b"XXXX" + bytes(HEADER.size))
+        assert False, "Bad magic accepted"
+    except ValueError:
+        pass
+    print("✅ Replay files working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Replay Tests")
+    print("=" * 40)
+    
+    try:
+        test_seeded_games_repeat()
+        test_replay_round_trip()
+        test_two_turns_in_one_tick()
+        test_replay_files()
+        
+        print("\n🎉 All tests passed!")
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
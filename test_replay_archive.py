@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test script for the memory-mapped replay archive
+Runs headlessly against the rules engine
+"""
+
+import gc
+import os
+import random
+import sys
+import tempfile
+import warnings
+
+from snake_engine import SnakeEngine, Direction
+from replay_archive import ArchiveWriter, ArchiveReader, INDEX_RECORD
+
+def record_games(path, count, seed):
+    """Archive count games of random play, returning (score, level, cause) per game"""
+    results = []
+    with ArchiveWriter(path) as writer:
+        engine = SnakeEngine(seed)
+        writer.record(engine)
+        rng = random.Random(seed)
+        while len(results) < count:
+            if rng.random() < 0.3:
+                engine.snake.change_direction(rng.choice(list(Direction)))
+            engine.update()
+            if engine.game_over or engine.game_won:
+                results.append((engine.score, engine.level, engine.death_cause))
+                engine.reset_game()
+    return results
+
+def test_archive_index():
+    """Test that the index matches the recorded games"""
+    print("🧪 Testing Archive Index...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.snra")
+        results = record_games(path, 100, seed=1)
+        
+        with ArchiveReader(path) as archive:
+            assert len(archive) == 100
+            for i, (score, level, cause) in enumerate(results):
+                assert archive.index["score"][i] == score
+                assert archive.index["level"][i] == level
+                assert archive.death_cause(i) == cause
+            
+            # Filtering uses the index only
+            apples = archive.select(death_cause="apple")
+            expected = [i for i, result in enumerate(results) if result[2] == "apple"]
+            assert list(apples) == expected
+    print("✅ Archive index working correctly")
+
+def test_archive_playback():
+    """Test that archived games replay to the indexed result"""
+    print("🧪 Testing Archive Playback...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.snra")
+        record_games(path, 30, seed=2)
+        record_games(path, 30, seed=3)  # Reopen and keep appending
+        
+        with ArchiveReader(path) as archive:
+            assert len(archive) == 60
+            for i in range(len(archive)):
+                engine = archive.play(i)
+                assert engine.score == archive.index["score"][i]
+                assert engine.level == archive.index["level"][i]
+                assert engine.death_cause == archive.death_cause(i)
+    print("✅ Archive playback working correctly")
+
+def test_torn_index_record():
+    """Test that a partially written index record is ignored"""
+    print("🧪 Testing Torn Index Record...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.snra")
+        record_games(path, 5, seed=4)
+        with open(path + ".idx", "ab") as f:
+            f.write(bytes(INDEX_RECORD.size // 2))
+        
+        with ArchiveReader(path) as archive:
+            assert len(archive) == 5
+    print("✅ Torn index record ignored")
+
+def test_close_with_live_views():
+    """Test that closing keeps handed-out views valid and a bad index leaks no files"""
+    print("🧪 Testing Archive Close...")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.snra")
+        record_games(path, 3, seed=5)
+        
+        archive = ArchiveReader(path)
+        view = archive.replay_bytes(1)
+        index = archive.index
+        expected = bytes(view)
+        archive.close()
+        assert bytes(view) == expected and len(index) == 3
+        view.release()
+        del index
+        
+        with open(path + ".idx", "r+b") as f:
+            f.write(b"JUNK")
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            try:
+                ArchiveReader(path)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("A bad index should be rejected")
+            gc.collect()
+        assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+    print("✅ Archive close working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Replay Archive Tests")
+    print("=" * 40)
+    
+    try:
+        test_archive_index()
+        test_archive_playback()
+        test_torn_index_record()
+        test_close_with_live_views()
+        
+        print("\n🎉 All tests passed!")
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the rewind buffer and replay seeking
+Runs without pygame or any mocking
+"""
+
+import random
+import sys
+
+from benchmark import record_greedy_games
+from bots import greedy_policy
+from replay import DIRECTIONS, ReplayRecorder, load_replay, play_replay
+from rewind import ReplaySeeker, RewindBuffer
+from snake_engine import SnakeEngine
+
+def full_state(engine):
+    # Everything a rewind must restore, including what decides future spawns
+    return (
+        list(engine.snake.body), engine.snake.direction, engine.snake.grow_pending,
+        {cell: fruit.type for cell, fruit in engine.fruit_at.items()},
+        engine.score, engine.level, engine.speed, engine.fruits_eaten_this_level,
+        engine.game_over, engine.game_won, engine.death_cause,
+        engine.rng.getstate(), list(engine.free_cells),
+    )
+
+def test_seek_restores_exact_state():
+    """Test that seeking back and forth through replays restores every tick exactly"""
+    print("🧪 Testing Exact Rewind...")
+
+    rng = random.Random(5)
+    for replay in record_greedy_games(2, seed=20):
+        engine = SnakeEngine(replay.seed)
+        states = [full_state(engine)]
+        for turn in replay.ticks:
+            if turn:
+                engine.snake.direction = DIRECTIONS[turn - 1]
+            engine.update()
+            states.append(full_state(engine))
+
+        seeker = ReplaySeeker(replay, capacity=len(replay.ticks))
+        for _ in range(40):
+            tick = rng.randrange(len(replay.ticks) + 1)
+            assert full_state(seeker.seek(tick)) == states[tick], tick
+        assert seeker.restarts == 1  # The buffer covered every backward seek
+        assert engine.level > 0  # Level-ups respawn every fruit, so they were rewound too
+    print("✅ Exact rewind working correctly")
+
+def test_capacity_bounds_history():
+    """Test that only the last capacity ticks are kept"""
+    print("🧪 Testing Rewind Capacity...")
+
+    replay = record_greedy_games(1, seed=3)[0]
+    seeker = ReplaySeeker(replay, capacity=50)
+    seeker.seek(200)
+    assert len(seeker.buffer) == 50
+    # Only the newest record's journal is still being written
+    assert seeker.engine.free_cells.journal is seeker.buffer.records[-1].journal
+    seeker.seek(150)
+    assert seeker.restarts == 1 and len(seeker.buffer) == 0
+    seeker.seek(100)  # Further back than the buffer reaches
+    assert seeker.restarts == 2 and seeker.tick == 100
+    print("✅ Rewind capacity working correctly")
+
+def test_rewind_rewrites_replay():
+    """Test that a recording made across a rewind replays to the same game"""
+    print("🧪 Testing Recording Across Rewinds...")
+
+    engine = SnakeEngine(11)
+    recorder = ReplayRecorder().attach(engine)
+    buffer = RewindBuffer(100).attach(engine)
+    rng = random.Random(11)
+    for ticks in (60, 40, 80):
+        for _ in range(ticks):
+            direction = greedy_policy(engine, rng)
+            if direction is not None:
+                engine.snake.change_direction(direction)
+            engine.update()
+        buffer.rewind(25)
+
+    assert not engine.game_over and engine.score > 0
+    assert len(recorder.ticks) == 180 - 75
+    replayed = play_replay(load_replay(recorder.to_bytes()))
+    assert full_state(replayed) == full_state(engine)
+    print("✅ Recording across rewinds working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Rewind Tests")
+    print("=" * 40)
+
+    try:
+        test_seek_restores_exact_state()
+        test_capacity_bounds_history()
+        test_rewind_rewrites_replay()
+
+        print("\n🎉 All tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test script for the high-score table and game telemetry
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from scores import GameResult, ScoreStore
+from snake_engine import MAX_SEED
+
+def result(score, mode="player", death_cause="apple", won=False):
+    return GameResult(time.time(), 1, mode, score, score // 100, won, death_cause, 12.5, 90, 30, 20)
+
+def test_leaderboard_cache():
+    """Test that the cached leaderboard ranks only player games and survives a restart"""
+    print("🧪 Testing Leaderboard Cache...")
+
+    path = os.path.join(tempfile.mkdtemp(), "nested", "scores.db")
+    refreshed = threading.Event()
+    store = ScoreStore(path, top=3, on_refresh=refreshed.set)
+    for score, mode in [(300, "player"), (900, "autopilot"), (500, "player"), (800, "practice"),
+                        (100, "player"), (400, "player")]:
+        store.record(result(score, mode))
+    store.close()
+    assert store.written == 6
+    assert [entry.score for entry in store.leaderboard] == [500, 400, 300]
+    assert store.best == 500 and refreshed.is_set()
+
+    # A new store reads the table back before its first game
+    store = ScoreStore(path)
+    store.close()
+    assert [entry.score for entry in store.leaderboard] == [500, 400, 300, 100]
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    rows = connection.execute("SELECT mode, death_cause, duration, ticks FROM games").fetchall()
+    assert len(rows) == 6 and rows[0] == ("player", "apple", 12.5, 90)
+    connection.close()
+    print("✅ Leaderboard cache working correctly")
+
+def test_batched_writes():
+    """Test that record() never waits for the disk and queued games share a transaction"""
+    print("🧪 Testing Batched Writes...")
+
+    store = ScoreStore(os.path.join(tempfile.mkdtemp(), "scores.db"))
+    slowest = 0.0
+    for score in range(500):
+        started = time.perf_counter()
+        store.record(result(score))
+        slowest = max(slowest, time.perf_counter() - started)
+    store.close()
+    assert store.written == 500
+    assert store.batches < 500, store.batches
+    assert slowest < 0.01, slowest
+    print("✅ Batched writes working correctly")
+
+def test_bad_batch_keeps_writer():
+    """Test that 64-bit seeds are stored and a failed batch does not stop the writer"""
+    print("🧪 Testing Writer Errors...")
+
+    path = os.path.join(tempfile.mkdtemp(), "scores.db")
+    store = ScoreStore(path)
+    store.record(result(100)._replace(seed=MAX_SEED))
+    store.close()
+    assert store.written == 1 and store.failed == 0
+
+    store = ScoreStore(path)
+    store.record(result(200)._replace(score=object()))  # Cannot be bound
+    while not store.failed:
+        time.sleep(0.01)
+    store.record(result(300))
+    store.close()
+    assert store.failed == 1 and store.written == 1
+    assert [entry.score for entry in store.leaderboard] == [300, 100]
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT seed FROM games ORDER BY id").fetchall() == [(-1,), (1,)]
+    connection.close()
+    print("✅ Writer errors handled correctly")
+
+def test_game_records_telemetry():
+    """Test that a finished game is recorded and shown on the game over screen"""
+    print("🧪 Testing Game Telemetry...")
+
+    code = """
+import sqlite3, sys
+from autopilot import Autopilot
+from snake_game import Direction, SnakeGame
+path = sys.argv[1]
+
+# Straight ahead into the wall
+game = SnakeGame(seed=3, scores_path=path)
+while not game.game_over:
+    game.update()
+assert game.death_cause == "wall" and game.ticks_played == 20
+ticks, score = game.ticks_played, game.score
+game.draw()
+
+# Attract-mode games are kept as telemetry but never ranked, even once the player takes over
+game.reset_game(5)
+game.autopilot = Autopilot()
+for _ in range(30):
+    game.update()
+game.steer(Direction.UP if game.snake.direction in (Direction.LEFT, Direction.RIGHT) else Direction.LEFT)
+assert game.autopilot is None
+while not game.game_over:
+    game.update()
+assert not game.new_high_score
+game.scores.close()
+assert [entry.score for entry in game.scores.leaderboard] == [score]
+
+connection = sqlite3.connect(path)
+rows = connection.execute("SELECT mode, death_cause, ticks, seed FROM games ORDER BY id").fetchall()
+assert rows[0] == ("player", "wall", ticks, 3), rows
+assert len(rows) == 2 and rows[1][0] == "autopilot" and rows[1][3] == 5, rows
+"""
+    path = os.path.join(tempfile.mkdtemp(), "scores.db")
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    subprocess.check_call([sys.executable, "-c", code, path], env=environment,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    print("✅ Game telemetry working correctly")
+
+def test_practice_game_recorded_once():
+    """Test that a practice game rewound after a crash is recorded once, with its last finish"""
+    print("🧪 Testing Practice Telemetry...")
+
+    code = """
+import sqlite3, sys
+from snake_game import SnakeGame
+path = sys.argv[1]
+
+game = SnakeGame(seed=3, practice=True, scores_path=path)
+# Crash, rewind and crash again, twice
+for attempt in range(3):
+    if attempt:
+        game.rewind_seconds(0.5)
+    while not game.game_over:
+        game.update()
+ticks = game.ticks_played
+game.reset_game(4)
+game.scores.close()
+
+connection = sqlite3.connect(path)
+rows = connection.execute("SELECT mode, seed, ticks FROM games").fetchall()
+assert rows == [("practice", 3, ticks)], rows
+"""
+    path = os.path.join(tempfile.mkdtemp(), "scores.db")
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    subprocess.check_call([sys.executable, "-c", code, path], env=environment,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    print("✅ Practice telemetry working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🏆 Running Score Tests")
+    print("=" * 40)
+
+    try:
+        test_leaderboard_cache()
+        test_batched_writes()
+        test_bad_batch_keeps_writer()
+        test_game_records_telemetry()
+        test_practice_game_recorded_once()
+
+        print("\n🎉 All tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
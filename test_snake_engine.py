@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless rules engine
+Runs without pygame or any mocking
+"""
+
+import subprocess
+import sys
+import tracemalloc
+
+from snake_engine import SnakeEngine, EngineState, Direction, Fruit, FruitType
+
+def test_engine_has_no_pygame():
+    """Test that importing the engine never pulls in pygame"""
+    print("🧪 Testing Engine Imports...")
+    
+    code = "import sys, snake_engine; sys.exit('pygame' in sys.modules)"
+    assert subprocess.call([sys.executable, "-c", code]) == 0
+    print("✅ Engine imports without pygame")
+
+def test_engine_step():
+    """Test the step(action) -> state API"""
+    print("🧪 Testing Engine Step...")
+    
+    engine = SnakeEngine()
+    engine.fruit_at.clear()  # Empty board so the snake only hits walls
+    head_x, head_y = engine.snake.body[0]
+    
+    state = engine.step(Direction.UP)
+    assert isinstance(state, EngineState)
+    assert state.head == (head_x, head_y - 1)
+    assert state.length == 1
+    assert state.game_over == False
+    
+    # Reversing is ignored, so the snake keeps going up into the wall
+    for _ in range(head_y):
+        state = engine.step(Direction.DOWN)
+    assert state.game_over == True
+    print("✅ Engine step working correctly")
+
+def test_engine_level_up():
+    """Test level progression through the engine rules"""
+    print("🧪 Testing Engine Level Up...")
+    
+    engine = SnakeEngine()
+    engine.fruits_eaten_this_level = engine.fruits_needed_per_level - 1
+    head_x, head_y = engine.snake.body[0]
+    target = (head_x + 1, head_y)
+    engine.free_cells.discard(target)
+    engine.fruit_at[target] = Fruit(FruitType.ORANGE, *target)
+    
+    state = engine.step()
+    assert state.level == 1
+    assert state.speed == 9
+    assert state.fruits_eaten_this_level == 0
+    apples = sum(1 for f in engine.fruits if f.type == FruitType.APPLE)
+    assert apples == 3
+    print("✅ Engine level up working correctly")
+
+def test_large_board():
+    """Test that a 2000x2000 board plays without touching every cell"""
+    print("🧪 Testing Large Board...")
+    
+    engine = SnakeEngine(3, width=2000, height=2000)
+    assert engine.snake.body[0] == (1000, 1000)
+    assert len(engine.free_cells) == 2000 * 2000 - 1 - len(engine.fruits)
+    # Only the cells that changed are stored by the free-cell index
+    assert len(engine.free_cells._slots) < 20
+    assert all(0 <= f.x < 2000 and 0 <= f.y < 2000 for f in engine.fruits)
+    
+    engine.fruit_at.clear()
+    state = None
+    for _ in range(1000):
+        state = engine.step(Direction.RIGHT)
+    assert state.game_over and engine.death_cause == "wall"
+    assert state.head == (2000, 1000)
+    print("✅ Large board working correctly")
+
+def test_tick_allocations():
+    """Test that steady-state ticks allocate almost nothing"""
+    print("🧪 Testing Tick Allocations...")
+    
+    engine = SnakeEngine(1)
+    engine.fruit_at.clear()
+    engine.snake.grow_pending = 12
+    square = [Direction.RIGHT] * 5 + [Direction.DOWN] * 5 + [Direction.LEFT] * 5 + [Direction.UP] * 5
+    for direction in square * 3:  # Warm up: reach full length and visit every cell
+        engine.snake.change_direction(direction)
+        engine.update()
+    
+    # Bytes live at once during each tick, on top of what existed before it
+    directions = square * 20
+    peaks = [0] * len(directions)
+    tracemalloc.start()
+    try:
+        for i, direction in enumerate(directions):
+            if i == len(directions) // 2:
+                # Tables allocated before tracing are untracked, so compare two traced points
+                halfway = tracemalloc.get_traced_memory()[0]
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            engine.snake.change_direction(direction)
+            engine.update()
+            peaks[i] = tracemalloc.get_traced_memory()[1] - start
+        growth = tracemalloc.get_traced_memory()[0] - halfway
+    finally:
+        tracemalloc.stop()
+    
+    assert not engine.game_over
+    peaks.sort()
+    # A typical tick allocates only the new head cell; dicts occasionally compact
+    assert peaks[len(peaks) // 2] <= 64, f"median tick peak {peaks[len(peaks) // 2]} bytes"
+    assert sum(peak > 128 for peak in peaks) <= len(peaks) // 10
+    assert growth < 1024, f"{growth} bytes retained over {len(peaks) // 2} ticks"
+    assert not hasattr(Fruit(FruitType.BERRY, 0, 0), "__dict__")
+    assert not hasattr(engine.snake, "__dict__")
+    print("✅ Tick allocations bounded")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Snake Engine Tests")
+    print("=" * 40)
+    
+    try:
+        test_engine_has_no_pygame()
+        test_engine_step()
+        test_engine_level_up()
+        test_large_board()
+        test_tick_allocations()
+        
+        print("\n🎉 All tests passed!")
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for the Gym-style environment
+Grid observations need only NumPy; the pixel observation runs in a
+subprocess with SDL's dummy driver
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from autopilot import Autopilot
+from snake_engine import Fruit, FruitType, Direction
+from snake_env import ACTIONS, APPLE, BODY, GOOD_FRUIT, HEAD, DEFAULT_REWARDS, SnakeEnv
+
+def expected_grid(env):
+    # A from-scratch grid to compare the in-place one against
+    grid = np.zeros_like(env.grid)
+    engine = env.engine
+    for x, y in engine.snake.body:
+        if 0 <= x < env.width and 0 <= y < env.height:
+            grid[BODY, y, x] = 1
+    head_x, head_y = engine.snake.body[0]
+    if 0 <= head_x < env.width and 0 <= head_y < env.height:
+        grid[HEAD, head_y, head_x] = 1
+    for (x, y), fruit in engine.fruit_at.items():
+        grid[APPLE if fruit.type is FruitType.APPLE else GOOD_FRUIT, y, x] = 1
+    return grid
+
+def test_grid_updates_in_place():
+    """Test that the patched grid matches a rebuild on every step of a whole game"""
+    print("🧪 Testing In-Place Grid Observations...")
+
+    env = SnakeEnv(seed=2)
+    observation, info = env.reset()
+    assert observation is env.grid and observation.shape == (4, env.height, env.width)
+    assert info["seed"] == 2
+
+    autopilot = Autopilot()
+    total, terminated = 0.0, False
+    while not terminated:
+        action = ACTIONS.index(autopilot(env.engine, None))
+        result, reward, terminated, truncated, info = env.step(action)
+        assert result is observation  # Same array, no new allocation
+        assert (observation == expected_grid(env)).all(), info
+        total += reward
+
+    # The autopilot wins: every point, every level gained, then the win bonus
+    assert env.engine.game_won
+    levels = env.engine.level
+    assert total == info["score"] * DEFAULT_REWARDS.score + levels * DEFAULT_REWARDS.level_up + DEFAULT_REWARDS.win
+    assert env.step(0)[1:4] == (0.0, True, False)
+    print("✅ In-place grid observations working correctly")
+
+def test_apple_death_and_truncation():
+    """Test the death penalty for an apple and truncation at max_steps"""
+    print("🧪 Testing Rewards and Truncation...")
+
+    env = SnakeEnv(seed=4)
+    env.reset()
+    head_x, head_y = env.engine.snake.body[0]
+    env.engine.fruit_at[(head_x + 1, head_y)] = Fruit(FruitType.APPLE, head_x + 1, head_y)
+    _, reward, terminated, truncated, info = env.step(ACTIONS.index(Direction.RIGHT))
+    assert reward == DEFAULT_REWARDS.death and terminated and not truncated
+    assert info["death_cause"] == "apple"
+
+    env = SnakeEnv(seed=5, max_steps=3)
+    first, _ = env.reset()
+    first = first.copy()
+    outcomes = [env.step()[2:4] for _ in range(3)]
+    assert outcomes == [(False, False), (False, False), (False, True)]
+
+    # reset(seed) replays a game exactly; a plain reset starts a different one
+    assert (env.reset(seed=5)[0] == first).all()
+    assert env.reset()[1]["seed"] != 5
+    print("✅ Rewards and truncation working correctly")
+
+def test_pixel_observations():
+    """Test that pixel observations are the drawn screen, without copying"""
+    print("🧪 Testing Pixel Observations...")
+
+    code = """
+import pygame
+from snake_env import SnakeEnv
+env = SnakeEnv(seed=1, pixels=True, width=100, height=100, cell_size=10)
+observation, _ = env.reset()
+assert observation.shape == (600, 800, 3) and observation.base is env.frame
+for _ in range(50):
+    step = env.step()
+    assert step[0] is observation
+screen = pygame.surfarray.array3d(env.engine.screen).transpose(1, 0, 2)
+assert (screen == observation).all() and observation[:, :, 1].any()
+"""
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    subprocess.check_call([sys.executable, "-c", code], env=environment,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    print("✅ Pixel observations working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Environment Tests")
+    print("=" * 40)
+
+    try:
+        test_grid_updates_in_place()
+        test_apple_death_and_truncation()
+        test_pixel_observations()
+
+        print("\n🎉 All tests passed!")
+        return True
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
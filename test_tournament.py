@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the tournament runner and bot policies
+"""
+
+import sys
+from array import array
+
+from bots import load_policy, greedy_policy
+from run_tournament import RESULT_FIELDS, parse_grid, play_chunk, run_tournament
+from snake_engine import DEFAULT_RULES
+
+def test_parse_grid():
+    """Test that rule sweeps expand to every combination"""
+    print("🧪 Testing Parameter Grid...")
+    
+    grid = parse_grid(["fruits_needed_per_level=3,5", "max_apples=6,8,10"])
+    assert len(grid) == 6
+    assert grid[0].fruits_needed_per_level == 3 and grid[0].max_apples == 6
+    assert grid[-1].fruits_needed_per_level == 5 and grid[-1].max_apples == 10
+    assert grid[0].start_speed == DEFAULT_RULES.start_speed
+    assert parse_grid([]) == [DEFAULT_RULES]
+    print("✅ Parameter grid working correctly")
+
+def test_play_chunk_is_deterministic():
+    """Test that a chunk of seeded games always gives the same results"""
+    print("🧪 Testing Seeded Chunks...")
+    
+    first = play_chunk("greedy", DEFAULT_RULES, 10, 5, 5000)
+    assert first == play_chunk("greedy", DEFAULT_RULES, 10, 5, 5000)
+    
+    results = array("q")
+    results.frombytes(first)
+    assert len(results) == 5 * len(RESULT_FIELDS)
+    assert load_policy("greedy") is greedy_policy
+    print("✅ Seeded chunks working correctly")
+
+def test_run_tournament():
+    """Test aggregation across a process pool"""
+    print("🧪 Testing Tournament Run...")
+    
+    rules_grid = parse_grid(["fruits_needed_per_level=1,5"])
+    summaries, throughput = run_tournament("greedy", rules_grid, games=20, workers=2, chunk_size=7)
+    assert [s["games"] for s in summaries] == [20, 20]
+    assert throughput["games"] == 40
+    # One fruit per level is far easier to win
+    assert summaries[0]["win_rate"] >= summaries[1]["win_rate"]
+    print("✅ Tournament run working correctly")
+
+def test_empty_tournament():
+    """Test that zero games per rule set summarizes to zeros"""
+    print("🧪 Testing Empty Tournament...")
+    
+    summaries, throughput = run_tournament("greedy", parse_grid([]), games=0, workers=1)
+    assert throughput["games"] == 0
+    assert summaries[0]["games"] == 0 and summaries[0]["mean_score"] == 0 and summaries[0]["max_score"] == 0
+    print("✅ Empty tournament working correctly")
+
+def run_all_tests():
+    """Run all tests"""
+    print("🎮 Running Tournament Tests")
+    print("=" * 40)
+    
+    try:
+        test_parse_grid()
+        test_play_chunk_is_deterministic()
+        test_run_tournament()
+        test_empty_tournament()
+        
+        print("\n🎉 All tests passed!")
+        return True
+        
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)